@@ -1,54 +1,626 @@
-# Written by Joshua Fernandez
-# Database for Scrumdogs
-# Created 1/27/2025
-
-
-import csv
-
-
-# The class for our database. 
-class Database:
-    def __init__(self,file = None)->None:
-        # self.file is the only required attribute for this class.
-        # the file attribute has to be a ".csv" file.
-        self.file = file
-
-
-    # This method allows us to input any list of dictionaries into our Scrumabase. 
-    def excel(self, studentlist)->None:
-        """ This method will take a list of dictionary items and
-        write each dictionary item into a row in a CSV File.
-        
-        Takes 1 argument. Requires a list of dictionary items.
-        """
-
-        file = self.file
-
-        # This bit of code opens the file math in the mode we need as well as the character style encoding.
-        with open(file, mode= 'w', newline = '', encoding = 'utf-8') as file:
-            # writer is a variable for the csv.DictWriter function that creates a csv file and takes an argument for th file and the fieldnames.
-            writer = csv.DictWriter(file, fieldnames= studentlist[0].keys())
-            # This is a method from the csv library DictWriter Class.
-            writer.writeheader()
-            # Method to write multiple rows of dictionary items.
-            writer.writerows(studentlist)
-
-
-    # This bit of code allows to to extract the information from the csv into a list of dictionaries.
-    def csv_to_dict(self)-> None:
-        """
-        This function takes each row in a CSV file and makes dictionaries.
-
-        Does not need to take in any arguments. 
-        """
-        file = self.file
-
-        with open(file, mode='r', encoding='utf-8') as file:
-            # The "DictReader" class automatically uses the Headers of the CSV files as keys.
-            csv_reader = csv.DictReader(file)
-            data = [dict(row) for row in csv_reader]  # Convert each row into a dictionary
-        
-        return print(data)
-
-
-
+# Written by Joshua Fernandez
+# Database for Scrumdogs
+# Created 1/27/2025
+
+
+import csv
+import json
+import os
+import sqlite3
+from contextlib import nullcontext
+from itertools import chain
+
+
+# Keeps count, sum, mean, variance, min and max of a stream of numbers without storing them.
+class RunningStats:
+    def __init__(self)->None:
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared differences from the mean (Welford's method)
+        self.min = None
+        self.max = None
+
+
+    def add(self, value)->None:
+        """ Adds one value to the running statistics. """
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+
+    def merge(self, other)->None:
+        """ Folds another RunningStats into this one, as if every value had been added here. """
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.total, self.mean, self.m2 = other.count, other.total, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+
+    def add_zeros(self, count)->None:
+        """ Adds count values of zero in one step, such as the signs a sparse row leaves out. """
+        zeros = RunningStats()
+        zeros.count, zeros.min, zeros.max = count, 0.0, 0.0
+        self.merge(zeros)
+
+
+    def variance(self)->float:
+        """ Population variance of the values added so far. """
+        return self.m2 / self.count if self.count else 0.0
+
+
+    def summary(self)->dict:
+        """ Returns the statistics as a dictionary. """
+        return {
+            "mean": self.mean,
+            "sum": self.total,
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "variance": self.variance(),
+        }
+
+
+# Turns the text of a days_attended column, like "['Monday', 'Friday']", back into a list of days.
+def parse_days(text)->list:
+    return [day.strip(" '\"") for day in text.strip("[]").split(",") if day.strip(" '\"")]
+
+
+# Turns the text of a signs_seen column, like "{3: 1.5, 17: 2.0}", back into {sign number: seconds}.
+def parse_signs_seen(text)->dict:
+    seen = {}
+    for entry in text.strip("{}").split(","):
+        if entry.strip():
+            sign, seconds = entry.split(":")
+            seen[int(sign)] = float(seconds)
+    return seen
+
+
+# True for columns that hold the seconds a student spent on one sign (sign1, sign2, ...).
+def is_sign_column(name)->bool:
+    return name.startswith("sign") and name[4:].isdigit()
+
+
+# Picks how a result column's text is turned back into a value.
+def column_type(name):
+    if name in ("speed", "view_time") or is_sign_column(name):
+        return float
+    if name == "num_days_attended":
+        return int
+    if name == "days_attended":
+        return parse_days
+    if name == "signs_seen":
+        return parse_signs_seen
+    return str
+
+
+# Stores result rows in a SQLite file, split into students, visits and per-sign exposure.
+class SqliteStore:
+    """ Tables:
+        columns(position, name)                     column order of the rows that were written
+        students(student_id, speed, num_days_attended, days_attended)
+        visits(visit_id, student_id, day, view_time, extras)   one per result row, in order; day is
+                                                                NULL only for rows covering a whole week
+        exposures(visit_id, sign, seconds)          only signs with time above zero, from either
+                                                    sign{i} columns or a sparse signs_seen column
+
+    visits is indexed on student_id and day, exposures on sign and visit_id, so a question like
+    "students who saw sign 7 for more than X seconds on Tuesdays" is an indexed join:
+
+        SELECT v.student_id FROM exposures e JOIN visits v USING (visit_id)
+        WHERE e.sign = 7 AND e.seconds > ? AND v.day = 'Tuesday'
+    """
+
+    # Columns that have their own place in the schema; anything else goes into visits.extras as JSON.
+    STUDENT_COLUMNS = ("student_id", "speed", "num_days_attended", "days_attended")
+    VISIT_COLUMNS = ("day", "view_time")
+
+    def __init__(self, file, batch_size=10000)->None:
+        self.file = file
+        self.batch_size = batch_size
+
+
+    def connect(self):
+        return sqlite3.connect(self.file)
+
+
+    def write(self, rows, fieldnames=None)->int:
+        """ Replaces the stored results with rows, committing every batch_size rows. """
+        rows = iter(rows)
+        if fieldnames is None:
+            # Peek at the first row to fix the schema, then put it back at the front.
+            first_row = next(rows, None)
+            fieldnames = list(first_row.keys()) if first_row is not None else []
+            if first_row is not None:
+                rows = chain([first_row], rows)
+        signs = [(name, int(name[4:])) for name in fieldnames if is_sign_column(name)]
+        extras = [name for name in fieldnames
+                  if name not in self.STUDENT_COLUMNS and name not in self.VISIT_COLUMNS
+                  and not is_sign_column(name) and name != "signs_seen"]
+        schema = (set(fieldnames), signs, extras)
+
+        connection = self.connect()
+        try:
+            with connection:
+                connection.executescript("""
+                    DROP TABLE IF EXISTS columns;
+                    DROP TABLE IF EXISTS students;
+                    DROP TABLE IF EXISTS visits;
+                    DROP TABLE IF EXISTS exposures;
+                    CREATE TABLE columns (position INTEGER PRIMARY KEY, name TEXT NOT NULL);
+                    CREATE TABLE students (student_id TEXT PRIMARY KEY, speed REAL,
+                                           num_days_attended INTEGER, days_attended TEXT);
+                    CREATE TABLE visits (visit_id INTEGER PRIMARY KEY, student_id TEXT NOT NULL,
+                                         day TEXT, view_time REAL, extras TEXT);
+                    CREATE TABLE exposures (visit_id INTEGER NOT NULL, sign INTEGER NOT NULL, seconds REAL NOT NULL);
+                """)
+                connection.executemany("INSERT INTO columns VALUES (?, ?)", enumerate(fieldnames))
+
+            count = 0
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self.insert_batch(connection, batch, count, schema)
+                    count += len(batch)
+                    batch = []
+            self.insert_batch(connection, batch, count, schema)
+            count += len(batch)
+
+            # Build the indexes once at the end, which is faster than keeping them up to date per insert.
+            with connection:
+                connection.executescript("""
+                    CREATE INDEX visits_student ON visits (student_id);
+                    CREATE INDEX visits_day ON visits (day);
+                    CREATE INDEX exposures_sign ON exposures (sign, seconds);
+                    CREATE INDEX exposures_visit ON exposures (visit_id);
+                """)
+        finally:
+            connection.close()
+        return count
+
+
+    def insert_batch(self, connection, batch, first_visit, schema)->None:
+        """ Inserts one batch of rows in a single transaction.
+
+        schema is (set of column names, [(sign column, sign number)], [extra column names]).
+        """
+        fieldnames, signs, extras = schema
+        students = []
+        visits = []
+        exposures = []
+        for visit_id, row in enumerate(batch, start=first_visit):
+            unknown = [name for name in row if name not in fieldnames]
+            if unknown:
+                raise ValueError(f"Row has columns outside the schema: {unknown}")
+            days = row.get("days_attended")
+            if isinstance(days, str):
+                days = parse_days(days)  # The text form a CSV holds, like "['Monday', 'Friday']"
+            students.append((str(row["student_id"]), row.get("speed"), row.get("num_days_attended"),
+                             ",".join(days) if days is not None else None))
+            visits.append((visit_id, str(row["student_id"]), row.get("day"), row.get("view_time"),
+                           json.dumps({name: row.get(name) for name in extras}) if extras else None))
+            for name, sign in signs:
+                seconds = float(row.get(name) or 0)
+                if seconds:
+                    exposures.append((visit_id, sign, seconds))
+            seen = row.get("signs_seen")
+            if isinstance(seen, str):
+                seen = parse_signs_seen(seen)
+            for sign, seconds in (seen or {}).items():
+                if seconds:
+                    exposures.append((visit_id, sign, float(seconds)))
+
+        with connection:
+            connection.executemany("INSERT OR REPLACE INTO students VALUES (?, ?, ?, ?)", students)
+            connection.executemany("INSERT INTO visits VALUES (?, ?, ?, ?, ?)", visits)
+            connection.executemany("INSERT INTO exposures VALUES (?, ?, ?)", exposures)
+
+
+    def read(self, columns=None):
+        """ Generator that rebuilds the stored rows in the order they were written.
+
+        Values are typed like Database.read_rows, and columns picks which ones to keep.
+        """
+        connection = self.connect()
+        try:
+            fieldnames = [name for (name,) in connection.execute("SELECT name FROM columns ORDER BY position")]
+            if columns is None:
+                columns = fieldnames
+            missing = [name for name in columns if name not in fieldnames]
+            if missing:
+                raise KeyError(f"Columns not in {self.file}: {missing}")
+            signs = [(name, int(name[4:])) for name in fieldnames if is_sign_column(name)]
+
+            visits = connection.execute("""
+                SELECT v.visit_id, v.student_id, v.day, v.view_time, v.extras,
+                       s.speed, s.num_days_attended, s.days_attended
+                FROM visits v JOIN students s USING (student_id) ORDER BY v.visit_id""")
+            # Walk exposures alongside visits; both are ordered by visit_id.
+            exposures = connection.execute("SELECT visit_id, sign, seconds FROM exposures ORDER BY visit_id")
+            exposure = next(exposures, None)
+
+            for visit_id, student_id, day, view_time, extras, speed, num_days_attended, days_attended in visits:
+                row = {
+                    "student_id": student_id,
+                    "speed": speed,
+                    "view_time": view_time,
+                    "num_days_attended": num_days_attended,
+                    "days_attended": days_attended.split(",") if days_attended else [],
+                    "day": day,
+                }
+                if extras:
+                    row.update(json.loads(extras))
+                seen = {}
+                while exposure is not None and exposure[0] == visit_id:
+                    seen[exposure[1]] = exposure[2]
+                    exposure = next(exposures, None)
+                for name, sign in signs:
+                    row[name] = seen.get(sign, 0.0)
+                row["signs_seen"] = seen
+                yield {name: row[name] for name in columns}
+        finally:
+            connection.close()
+
+
+    def query(self, sql, params=())->list:
+        """ Runs an SQL query against the stored results and returns the rows as tuples. """
+        connection = self.connect()
+        try:
+            return connection.execute(sql, params).fetchall()
+        finally:
+            connection.close()
+
+
+# The class for our database. 
+class Database:
+    def __init__(self,file = None, backend = None, instrumentation = None)->None:
+        # self.file is the only required attribute for this class.
+        # the file attribute has to be a ".csv" file, or a ".db"/".sqlite" file for the SQLite backend.
+        self.file = file
+        # backend is "csv" or "sqlite"; if it is left out it is picked from the file extension.
+        if backend is None:
+            backend = "sqlite" if file and file.endswith((".db", ".sqlite", ".sqlite3")) else "csv"
+        if backend not in ("csv", "sqlite"):
+            raise ValueError(f"Unknown backend {backend!r}")
+        self.backend = backend
+        self.store = SqliteStore(file) if backend == "sqlite" else None
+        # instrumentation is an optional scrumdog_instrument.Instrumentation that times the writes.
+        self.instrumentation = instrumentation
+
+
+    # This method times a block of code as the csv_write phase when instrumentation is turned on.
+    def instrumented(self):
+        """ Returns a context manager for a with block. It does nothing without instrumentation.
+        """
+        if self.instrumentation is None:
+            return nullcontext()
+        return self.instrumentation.phase("csv_write")
+
+
+    # This method adds the rows just written to the rows_written counter and hands the number back.
+    def count_rows(self, count)->int:
+        if self.instrumentation is not None:
+            self.instrumentation.count("rows_written", count)
+        return count
+
+
+    # This method allows us to input any list of dictionaries into our Scrumabase. 
+    def excel(self, studentlist)->None:
+        """ This method will take a list of dictionary items and
+        write each dictionary item into a row in a CSV File.
+        
+        Takes 1 argument. Requires a list of dictionary items.
+        """
+
+        with self.instrumented():
+            if self.store is not None:
+                self.count_rows(self.store.write(studentlist))
+                return
+
+            file = self.file
+
+            # This bit of code opens the file math in the mode we need as well as the character style encoding.
+            with open(file, mode= 'w', newline = '', encoding = 'utf-8') as file:
+                # writer is a variable for the csv.DictWriter function that creates a csv file and takes an argument for th file and the fieldnames.
+                writer = csv.DictWriter(file, fieldnames= studentlist[0].keys())
+                # This is a method from the csv library DictWriter Class.
+                writer.writeheader()
+                # Method to write multiple rows of dictionary items.
+                writer.writerows(studentlist)
+            self.count_rows(len(studentlist))
+
+
+    # This method writes rows to the CSV as they arrive instead of needing the whole list first.
+    def excel_stream(self, rows, fieldnames=None, chunk_size=10000)->int:
+        """ This method will take any iterable of dictionary items, such as a generator,
+        and write them into a CSV File in buffered chunks.
+
+        Takes 1 required argument, the rows. fieldnames fixes the column order;
+        if it is left out the keys of the first row are used.
+        chunk_size is how many rows are buffered before each write.
+
+        Returns the number of rows written. With no rows at all nothing is written,
+        so an existing file is left as it was. The rows go to a temporary file that
+        only replaces the real one once the last row is in, so a run that fails or is
+        cancelled part way leaves the previous file in place.
+        """
+
+        with self.instrumented():
+            # Peek at the first row before touching the file, then put it back at the front.
+            rows = iter(rows)
+            first_row = next(rows, None)
+            if first_row is None:
+                return self.count_rows(0)
+            rows = chain([first_row], rows)
+            if fieldnames is None:
+                # The keys of the first row fix the schema.
+                fieldnames = list(first_row.keys())
+
+            temporary = f"{self.file}.{os.getpid()}.tmp"
+            try:
+                if self.store is not None:
+                    count = SqliteStore(temporary, batch_size=chunk_size).write(rows, fieldnames)
+                else:
+                    count = 0
+                    with open(temporary, mode= 'w', newline = '', encoding = 'utf-8') as file:
+                        # Rows with columns outside the schema raise a ValueError instead of silently shifting columns.
+                        writer = csv.DictWriter(file, fieldnames= fieldnames)
+                        writer.writeheader()
+
+                        buffer = []
+                        for row in rows:
+                            buffer.append(row)
+                            if len(buffer) >= chunk_size:
+                                writer.writerows(buffer)
+                                count += len(buffer)
+                                buffer.clear()
+                        writer.writerows(buffer)
+                        count += len(buffer)
+                os.replace(temporary, self.file)
+            except BaseException:
+                # Drop the unfinished file, whatever stopped the rows coming.
+                if os.path.exists(temporary):
+                    os.remove(temporary)
+                raise
+
+            return self.count_rows(count)
+
+
+    # This method works out where the quantile sketches for this file are kept, right next to it.
+    def sketch_file(self)->str:
+        """ Returns the file name with its extension swapped for ".sketch.npz",
+        so "results.csv" keeps its sketches in "results.sketch.npz".
+        """
+        return os.path.splitext(self.file)[0] + ".sketch.npz"
+
+
+    # This method saves quantile sketches built during the run next to the results.
+    def save_sketches(self, sketches)->str:
+        """ This method writes a scrumdog_sketch.ExposureSketches to sketch_file().
+
+        Takes 1 argument, the sketches. Returns the file they were written to.
+        """
+
+        path = self.sketch_file()
+        with self.instrumented():
+            sketches.save(path)
+        return path
+
+
+    # This method reads back the sketches saved with save_sketches.
+    def load_sketches(self, seed = None):
+        """ This method returns the scrumdog_sketch.ExposureSketches saved next to the file,
+        ready for quantiles() or to merge with sketches from other runs.
+
+        seed is passed on to ExposureSketches.load. Raises FileNotFoundError if none were saved.
+        """
+
+        # Imported here so reading and writing CSVs does not need NumPy.
+        from scrumdog_sketch import ExposureSketches
+        return ExposureSketches.load(self.sketch_file(), seed)
+
+
+    # This method works out per-sign statistics in one pass over the CSV without loading it.
+    def aggregate(self, group_by=None)->dict:
+        """ This method reads the CSV one row at a time and keeps running statistics
+        for every sign column (sign1, sign2, ...), or for every sign in a sparse
+        signs_seen column, where the signs a row leaves out count as zero.
+
+        group_by can be None for one overall group, "num_days_attended" to split by
+        how many days a week students attend, or "day" to split by weekday. Grouping
+        by day uses a "day" column when the file has one, otherwise each row counts
+        towards every day in its days_attended column.
+
+        Returns a dictionary of group -> {sign number -> statistics dictionary} where each
+        statistics dictionary has mean, sum, count, min, max and variance.
+        """
+
+        if group_by not in (None, "num_days_attended", "day"):
+            raise ValueError(f"Cannot group by {group_by!r}")
+
+        groups = {}
+        sizes = {}  # Rows in each group, for the zeros of signs_seen columns
+
+        if self.store is not None:
+            # The SQLite store rebuilds the same rows, so aggregate over those in one pass.
+            for row in self.store.read():
+                if group_by is None:
+                    keys = [None]
+                elif group_by == "day" and row.get("day") is None:
+                    keys = row["days_attended"]
+                else:
+                    keys = [row[group_by]]
+                for key in keys:
+                    group = groups.get(key)
+                    if group is None:
+                        group = groups[key] = {}
+                    sizes[key] = sizes.get(key, 0) + 1
+                    for name, value in row.items():
+                        if is_sign_column(name):
+                            group.setdefault(int(name[4:]), RunningStats()).add(value)
+                        elif name == "signs_seen":
+                            for sign, seconds in value.items():
+                                group.setdefault(sign, RunningStats()).add(seconds)
+            return self.summarize_groups(groups, sizes)
+
+        with open(self.file, mode='r', newline='', encoding='utf-8') as file:
+            csv_reader = csv.reader(file)
+            header = next(csv_reader, None)
+            if header is None:
+                return {}
+
+            # Column position of each sign, keyed by sign number.
+            sign_columns = [(int(name[4:]), position) for position, name in enumerate(header) if is_sign_column(name)]
+            seen_column = header.index("signs_seen") if "signs_seen" in header else None
+
+            if group_by == "num_days_attended":
+                key_column = header.index("num_days_attended")
+            elif group_by == "day":
+                key_column = header.index("day") if "day" in header else header.index("days_attended")
+
+            for row in csv_reader:
+                if group_by is None:
+                    keys = [None]
+                elif group_by == "num_days_attended":
+                    keys = [int(row[key_column])]
+                elif header[key_column] == "day":
+                    keys = [row[key_column]]
+                else:
+                    keys = parse_days(row[key_column])
+
+                for key in keys:
+                    group = groups.get(key)
+                    if group is None:
+                        group = groups[key] = {sign: RunningStats() for sign, _ in sign_columns}
+                    sizes[key] = sizes.get(key, 0) + 1
+                    for sign, position in sign_columns:
+                        group[sign].add(float(row[position]))
+                    if seen_column is not None:
+                        for sign, seconds in parse_signs_seen(row[seen_column]).items():
+                            group.setdefault(sign, RunningStats()).add(seconds)
+
+        return self.summarize_groups(groups, sizes)
+
+
+    def summarize_groups(self, groups, sizes)->dict:
+        """ Turns aggregate's running statistics into summaries, counting a zero for every row
+        of a group that left a sign out. Only sparse signs_seen rows leave signs out, and a sign
+        no row saw at all is left out of every group.
+        """
+        signs = sorted({sign for group in groups.values() for sign in group})
+        summaries = {}
+        for key, group in groups.items():
+            summary = summaries[key] = {}
+            for sign in signs:
+                stats = group.get(sign) or RunningStats()
+                stats.add_zeros(sizes[key] - stats.count)
+                summary[sign] = stats.summary()
+        return summaries
+
+
+    # This method gives the average time each sign was seen by students attending a number of days a week.
+    def averages(self, num_days)->list:
+        """ This method returns the average seconds each sign was seen by the rows
+        whose num_days_attended matches num_days.
+
+        Takes 1 argument, the number of days attended (1 to 5).
+
+        Returns a list of dictionaries with "Sign" and "Average_Seconds_Seen" keys,
+        or an empty list when no rows match.
+        """
+
+        group = self.aggregate(group_by="num_days_attended").get(int(num_days), {})
+        return [{"Sign": sign, "Average_Seconds_Seen": round(stats["mean"], 2)}
+                for sign, stats in sorted(group.items())]
+
+
+    # This bit of code allows to to extract the information from the csv into a list of dictionaries.
+    def csv_to_dict(self)-> list:
+        """
+        This function takes each row in a CSV file and makes dictionaries.
+
+        Does not need to take in any arguments. 
+        Returns the list of dictionaries, with every value left as text.
+        For large files use read_rows or read_chunks instead.
+        """
+        if self.store is not None:
+            # Hand the stored values back as text, the same as reading them from a CSV.
+            return [{name: str(value) for name, value in row.items()} for row in self.store.read()]
+
+        file = self.file
+
+        with open(file, mode='r', encoding='utf-8') as file:
+            # The "DictReader" class automatically uses the Headers of the CSV files as keys.
+            csv_reader = csv.DictReader(file)
+            data = [dict(row) for row in csv_reader]  # Convert each row into a dictionary
+        
+        return data
+
+
+    # This method hands back rows one at a time, with numbers already converted.
+    def read_rows(self, columns=None):
+        """ This method is a generator that reads the CSV lazily, one row at a time.
+
+        columns is an optional list of column names to keep; the rest are skipped.
+        speed, view_time and the signN columns come back as floats, num_days_attended
+        as an int, days_attended as a list of days and signs_seen as a dictionary of
+        sign number -> seconds. Anything else stays text.
+
+        Yields one dictionary per row.
+        """
+
+        if self.store is not None:
+            yield from self.store.read(columns)
+            return
+
+        with open(self.file, mode='r', newline='', encoding='utf-8') as file:
+            csv_reader = csv.reader(file)
+            header = next(csv_reader, None)
+            if header is None:
+                return
+
+            if columns is None:
+                columns = header
+            missing = [name for name in columns if name not in header]
+            if missing:
+                raise KeyError(f"Columns not in {self.file}: {missing}")
+
+            # Work out the position and converter of each requested column once, not per row.
+            picks = [(name, header.index(name), column_type(name)) for name in columns]
+
+            for row in csv_reader:
+                yield {name: convert(row[position]) for name, position, convert in picks}
+
+
+    # This method hands back rows in lists of a set size, for processing a file in batches.
+    def read_chunks(self, chunk_size, columns=None):
+        """ This method is a generator that yields lists of up to chunk_size rows.
+
+        Rows are typed and projected the same way as read_rows.
+        """
+
+        chunk = []
+        for row in self.read_rows(columns):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
@@ -1,25 +1,42 @@
 import tkinter as tk
 from tkinter import messagebox
 import os
-from PIL import Image, ImageTk
+from scrumdog_worker import WorkerControls
 
-class ScrumGui:
+# Window size, which the background photo is resized to
+WINDOW_SIZE = (520, 290)
+directory_path = os.path.dirname(os.path.abspath(__file__))
+# The resized background is saved here so it only has to be resampled once
+BACKGROUND_CACHE = os.path.join(directory_path, ".gui_cache", f"Red_{WINDOW_SIZE[0]}x{WINDOW_SIZE[1]}.png")
+
+
+def cached_background():
+    # Returns the path of the resized background, making it first if it is missing or older than Red.png.
+    # PIL is only imported when the cache has to be built; Tk reads the cached PNG by itself.
+    original_path = os.path.join(directory_path, "Red.png")
+    if (not os.path.exists(BACKGROUND_CACHE)
+            or os.path.getmtime(BACKGROUND_CACHE) < os.path.getmtime(original_path)):
+        from PIL import Image
+        os.makedirs(os.path.dirname(BACKGROUND_CACHE), exist_ok=True)
+        Image.open(original_path).resize(WINDOW_SIZE).save(BACKGROUND_CACHE)
+    return BACKGROUND_CACHE
+
+
+class ScrumGui(WorkerControls):
     # Creates Gui
     def __init__(self, window, on_submit=None):
         self.window = window
         self.window.title("Columbia College Sign Statistics Calculator")
-        self.window.geometry("520x250")
+        self.window.geometry(f"{WINDOW_SIZE[0]}x{WINDOW_SIZE[1]}")
         self.window.resizable(False, False)
         # External callback for processing data, help from AI with this
         self.on_submit = on_submit
 
-        # Create and resize background photo
-        directory_path = os.path.dirname(__file__)
-        original_img = Image.open(os.path.join(directory_path, "Red.png"))
-        resized_image = original_img.resize((520, 250))
-        self.new_image = ImageTk.PhotoImage(resized_image)
-        self.background_label = tk.Label(window, image=self.new_image)
+        # Background photo label; the photo itself is loaded once the window is on screen
+        self.new_image = None
+        self.background_label = tk.Label(window)
         self.background_label.place(relwidth=1, relheight=1)
+        self.window.after_idle(self.load_background)
 
         # Frame for the entry boxes
         entry_frame = tk.Frame(window)
@@ -52,9 +69,8 @@ class ScrumGui:
         self.results = tk.Text(window, height=6, width=60)
         self.results.pack(padx=5, pady=5)
 
-        # Submit button
-        self.submit_button = tk.Button(window, text="Submit", width=20, command=self.submit)
-        self.submit_button.pack(pady=10)
+        # Progress bar with the Submit and Cancel buttons, which run the calculation in the background
+        self.add_worker_controls(window)
 
     # Function for submit button to collect data into a dictionary, also has user validation
     def submit(self):
@@ -101,6 +117,13 @@ class ScrumGui:
         self.results.delete(1.0, tk.END)
         self.results.insert(tk.END, message)
 
+    def load_background(self):
+        """
+        Puts the cached, pre-resized background photo behind the widgets.
+        """
+        self.new_image = tk.PhotoImage(file=cached_background())
+        self.background_label.config(image=self.new_image)
+
 class UserValidation:
     def validate_not_empty(self, values):
         # Check if all of the entry boxes are filled
@@ -122,16 +145,18 @@ class UserValidation:
 if __name__ == "__main__":
     def external_processing(data, gui):
         # Process the data, has temporary text, will be replaced
-        message = (
-            f"Data received:\n"
-            f"  Number of Students: {data['Number of Students']}\n"
-            f"  Car Speed: {data['Car Speed']} mph\n"
-            f"  Time of Sign Display: {data['Time of Sign Display']}s\n"
-            f"  # of Signs to Display: {data['# of Signs to Display']}\n"
-            "Calculations complete."
-        )
-        # Display the message in the results text widget.
-        gui.display_message(message)
+        def job(progress):
+            progress(0.5, "Reading inputs")
+            return (
+                f"Data received:\n"
+                f"  Number of Students: {data['Number of Students']}\n"
+                f"  Car Speed: {data['Car Speed']} mph\n"
+                f"  Time of Sign Display: {data['Time of Sign Display']}s\n"
+                f"  # of Signs to Display: {data['# of Signs to Display']}\n"
+                "Calculations complete."
+            )
+        # Run the job in the background and display the message in the results text widget when it is done.
+        gui.run_in_background(job, gui.display_message)
 
     root = tk.Tk()
     app = ScrumGui(root, on_submit=external_processing)
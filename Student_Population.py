@@ -0,0 +1,486 @@
+import numpy as np
+from Student_Class import Student, OneDayStudent, TwoDayStudent, ThreeDayStudent, FourDayStudent, FiveDayStudent
+
+
+# Student types in order of days attended, as generated by generate_population
+STUDENT_TYPES = [OneDayStudent, TwoDayStudent, ThreeDayStudent, FourDayStudent, FiveDayStudent]
+
+# Speed range used by Student when no speed distribution is given (mph)
+SPEED_RANGE = (10, 20)
+# Spread used with a mean speed when no standard deviation is given, same as the default range
+DEFAULT_SPEED_STD = (SPEED_RANGE[1] - SPEED_RANGE[0]) / 12 ** 0.5
+# Slowest speed a sampled student is allowed, so view times stay finite (mph)
+MIN_SPEED = 1.0
+
+# Bit assigned to each weekday in an attendance mask (Monday is bit 0)
+DAY_BITS = {day: 1 << bit for bit, day in enumerate(Student.Days)}
+
+# Attendance lists and day counts for every possible 5-bit mask, shared by all students
+MASK_DAYS = [[day for day in Student.Days if mask & DAY_BITS[day]] for mask in range(1 << len(Student.Days))]
+MASK_DAY_COUNTS = np.array([len(days) for days in MASK_DAYS], dtype=np.uint8)
+
+
+def days_to_mask(days):
+    """Convert a list of weekday names into an attendance bitmask."""
+    mask = 0
+    for day in days:
+        mask |= DAY_BITS[day]
+    return mask
+
+
+# Schedules each student type picks from (FiveDayStudent always attends every weekday)
+TYPE_SCHEDULES = [getattr(student_type, "Possible_Schedules", [Student.Days]) for student_type in STUDENT_TYPES]
+SCHEDULE_COUNTS = np.array([len(schedules) for schedules in TYPE_SCHEDULES])
+# Attendance mask of every schedule, one row per student type, padded with zeros to the longest list
+SCHEDULE_MASKS = np.zeros((len(STUDENT_TYPES), SCHEDULE_COUNTS.max()), dtype=np.uint8)
+for row, schedules in enumerate(TYPE_SCHEDULES):
+    SCHEDULE_MASKS[row, :len(schedules)] = [days_to_mask(days) for days in schedules]
+
+
+def calculate_times(speeds):
+    """Vectorized Student.calculate_time: seconds to cover 550 feet at each speed."""
+    distance_in_miles = 550 / 5280
+    return np.round(distance_in_miles / speeds * 3600, 4)
+
+
+def generate_population(num_students, seed=None, speed_mean=None, speed_std=None, num_signs=20, sparse=False):
+    """
+    Generate num_students students in one batched draw from a single random generator.
+
+    Student types are picked uniformly like random.choice over the five Student subclasses,
+    and each student's schedule uniformly from that type's Possible_Schedules.
+
+    Args:
+        num_students (int): Number of students to generate. Identifiers run from 1 to num_students.
+        seed (int): Seed for the generator. The same seed always gives the same population.
+        speed_mean (float): Mean speed in mph. If None, speeds are uniform over SPEED_RANGE like Student.
+        speed_std (float): Standard deviation of speed in mph, used with speed_mean.
+            Defaults to DEFAULT_SPEED_STD.
+        num_signs (int): Number of signs the viewership store starts with. SignProcessingSystem
+            resizes it to its own signs.
+        sparse (bool): Keep viewership in a SparseViewership instead of a dense matrix.
+
+    Returns:
+        StudentPopulation: The generated students.
+    """
+    rng = np.random.default_rng(seed)
+
+    if speed_mean is None:
+        speeds = rng.uniform(SPEED_RANGE[0], SPEED_RANGE[1], num_students)
+    else:
+        if speed_std is None:
+            speed_std = DEFAULT_SPEED_STD
+        speeds = np.maximum(rng.normal(speed_mean, speed_std, num_students), MIN_SPEED)
+
+    student_types = rng.integers(0, len(STUDENT_TYPES), num_students)
+    # Pick a schedule index below each student's own type's schedule count
+    schedules = (rng.random(num_students) * SCHEDULE_COUNTS[student_types]).astype(np.intp)
+
+    return StudentPopulation(
+        np.arange(1, num_students + 1),
+        speeds,
+        calculate_times(speeds),
+        SCHEDULE_MASKS[student_types, schedules],
+        num_signs,
+        sparse,
+    )
+
+
+class StudentPopulation:
+    """
+    Stores a whole population of students in contiguous arrays instead of one object each.
+
+    Attributes:
+        identifiers (ndarray): Student identifiers (int32).
+        speeds (ndarray): Travel speed of each student in mph (float64).
+        times (ndarray): View time of each student in seconds (float64).
+        attendance (ndarray): Days attended as a 5-bit mask, Monday in bit 0 (uint8).
+        viewership (ndarray or SparseViewership): Seconds each student spent on each sign, one column
+            per sign in sign_ids (float32). Dense unless the population was set up as sparse.
+        sign_ids (list): Sign index of each viewership column.
+        columns (dict): Viewership column of each sign index.
+        day_index (dict): Students attending each weekday, as a StudentSubset of sorted positions.
+    """
+
+    def __init__(self, identifiers, speeds, times, attendance, num_signs=20, sparse=False):
+        """Wrap existing per-student arrays. The viewership store starts with signs 1 to num_signs."""
+        self.identifiers = np.ascontiguousarray(identifiers, dtype=np.int32)
+        self.speeds = np.ascontiguousarray(speeds, dtype=np.float64)
+        self.times = np.ascontiguousarray(times, dtype=np.float64)
+        self.attendance = np.ascontiguousarray(attendance, dtype=np.uint8)
+        self.set_signs(range(1, num_signs + 1), sparse)
+        self.day_index = {day: StudentSubset(self, np.flatnonzero(self.attendance & bit))
+                          for day, bit in DAY_BITS.items()}
+
+    @classmethod
+    def from_students(cls, students, num_signs=20):
+        """Build a population from a list of Student objects."""
+        return cls(
+            [student.identifier for student in students],
+            [student.speed for student in students],
+            [student.time for student in students],
+            [days_to_mask(student.attendance_days) for student in students],
+            num_signs,
+        )
+
+    def __len__(self):
+        return len(self.identifiers)
+
+    def __getitem__(self, position):
+        """Return a lightweight view of the student at the given position."""
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("student position out of range")
+        return StudentView(self, position)
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield StudentView(self, position)
+
+    def num_days_attended(self):
+        """Return the number of days each student attends, as an array."""
+        return MASK_DAY_COUNTS[self.attendance]
+
+    def attending(self, day):
+        """Return a boolean array marking the students who attend on the given day."""
+        return (self.attendance & DAY_BITS[day]) != 0
+
+    def set_signs(self, sign_ids, sparse=False):
+        """
+        Size the viewership store to a set of signs, with every student's time zeroed.
+
+        Args:
+            sign_ids (iterable): Sign indices, one column each, in column order.
+            sparse (bool): Keep only the nonzero times, for many signs that each student sees few of.
+        """
+        self.sign_ids = list(sign_ids)
+        self.columns = {index: column for column, index in enumerate(self.sign_ids)}
+        if sparse:
+            self.viewership = SparseViewership(len(self.identifiers), len(self.sign_ids))
+        else:
+            self.viewership = np.zeros((len(self.identifiers), len(self.sign_ids)), dtype=np.float32)
+
+    @property
+    def sparse(self):
+        return isinstance(self.viewership, SparseViewership)
+
+    def reset_viewership(self, sign_ids=None, sparse=None):
+        """
+        Zero every student's viewership statistics in one step.
+
+        Args:
+            sign_ids (iterable): Resize the store to these signs first. Defaults to the current ones.
+            sparse (bool): Switch between a sparse and a dense store. Defaults to the current kind.
+        """
+        sparse = self.sparse if sparse is None else sparse
+        sign_ids = self.sign_ids if sign_ids is None else list(sign_ids)
+        if sign_ids != self.sign_ids or sparse != self.sparse:
+            self.set_signs(sign_ids, sparse)
+        elif sparse:
+            self.viewership.clear()
+        else:
+            self.viewership[:] = 0
+
+    def add_exposure(self, positions, columns, exposure):
+        """
+        Add a block of exposure to the viewership store.
+
+        Args:
+            positions (ndarray): Student positions, one per row of exposure. Each appears once.
+            columns (ndarray): Viewership column of each column of exposure.
+            exposure (ndarray): Seconds, shape (len(positions), len(columns)).
+        """
+        if self.sparse:
+            self.viewership.add_block(positions, columns, exposure)
+        else:
+            self.viewership[positions[:, None], columns] += exposure
+
+    def sign_column(self, index):
+        """Return the seconds every student spent on one sign, as a dense array."""
+        if self.sparse:
+            return self.viewership.column(self.columns[index])
+        return self.viewership[:, self.columns[index]]
+
+    def nbytes(self):
+        """Return the memory used by the population's arrays, in bytes."""
+        viewership = self.viewership.nbytes() if self.sparse else self.viewership.nbytes
+        return (self.identifiers.nbytes + self.speeds.nbytes + self.times.nbytes
+                + self.attendance.nbytes + viewership)
+
+
+class StudentSubset:
+    """Some of a population's students, in position order, iterated as StudentView objects."""
+
+    def __init__(self, population, positions):
+        self.population = population
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, key):
+        """Return the student at a position in the subset, or a slice of the subset as a StudentSubset."""
+        if isinstance(key, slice):
+            return StudentSubset(self.population, self.positions[key])
+        return StudentView(self.population, int(self.positions[key]))
+
+    def __iter__(self):
+        population = self.population
+        for position in self.positions.tolist():
+            yield StudentView(population, position)
+
+
+class StudentView:
+    """
+    Stand-in for a Student object backed by one row of a StudentPopulation.
+
+    Has the attributes SignProcessingSystem and the result code read from a Student,
+    so existing code keeps working, but holds nothing except the row position.
+    """
+    __slots__ = ("population", "position")
+
+    def __init__(self, population, position):
+        self.population = population
+        self.position = position
+
+    @property
+    def identifier(self):
+        return int(self.population.identifiers[self.position])
+
+    @property
+    def speed(self):
+        return float(self.population.speeds[self.position])
+
+    @property
+    def time(self):
+        return float(self.population.times[self.position])
+
+    @property
+    def attendance_days(self):
+        return MASK_DAYS[self.population.attendance[self.position]]
+
+    @property
+    def attendance_schedule(self):
+        mask = self.population.attendance[self.position]
+        return {day: bool(mask & bit) for day, bit in DAY_BITS.items()}
+
+    def is_attending_today(self, day):
+        """Check if the student is attending college on a given day."""
+        return bool(self.population.attendance[self.position] & DAY_BITS.get(day, 0))
+
+    @property
+    def viewership_stats(self):
+        population = self.population
+        if population.sparse:
+            return SparseViewershipRow(population.viewership, self.position, population.columns, population.sign_ids)
+        return ViewershipRow(population.viewership[self.position], population.columns)
+
+    @viewership_stats.setter
+    def viewership_stats(self, stats):
+        """Overwrite the student's viewership row from a {sign index: seconds} dict."""
+        population = self.population
+        columns = population.columns
+        values = {columns[index]: seconds for index, seconds in stats.items() if index in columns}
+        if population.sparse:
+            population.viewership.set_row(self.position, values)
+            return
+        row = population.viewership[self.position]
+        row[:] = 0
+        for column, seconds in values.items():
+            row[column] = seconds
+
+
+class ViewershipRow:
+    """Dict-like access to one student's row of a dense viewership matrix, keyed by sign index."""
+    __slots__ = ("row", "columns")
+
+    def __init__(self, row, columns):
+        self.row = row
+        self.columns = columns
+
+    def __getitem__(self, index):
+        return float(self.row[self.columns[index]])
+
+    def __setitem__(self, index, seconds):
+        self.row[self.columns[index]] = seconds
+
+    def get(self, index, default=None):
+        column = self.columns.get(index)
+        if column is None:
+            return default
+        return float(self.row[column])
+
+    def add_seconds(self, seen):
+        """Add a visit's {sign index: seconds} to the row."""
+        columns = self.columns
+        row = self.row
+        for index, seconds in seen.items():
+            column = columns[index]
+            row[column] = float(row[column]) + seconds  # Added in double precision, as add_exposure does
+
+    def items(self):
+        return [(index, float(self.row[column])) for index, column in self.columns.items()]
+
+    def __len__(self):
+        return len(self.columns)
+
+
+class SparseViewershipRow:
+    """
+    Dict-like access to one student's row of a SparseViewership, keyed by sign index.
+
+    Reads come from a copy of the row taken when it is created; writes go to both.
+    """
+    __slots__ = ("store", "position", "columns", "sign_ids", "values")
+
+    def __init__(self, store, position, columns, sign_ids):
+        self.store = store
+        self.position = position
+        self.columns = columns
+        self.sign_ids = sign_ids  # Sign index of each column
+        self.values = store.row(position)  # Seconds by column, only where nonzero
+
+    def __getitem__(self, index):
+        return self.values.get(self.columns[index], 0.0)
+
+    def __setitem__(self, index, seconds):
+        column = self.columns[index]
+        self.store.add_row(self.position, {column: seconds - self.values.get(column, 0.0)})
+        self.values[column] = seconds
+
+    def get(self, index, default=None):
+        column = self.columns.get(index)
+        if column is None:
+            return default
+        return self.values.get(column, 0.0)
+
+    def add_seconds(self, seen):
+        """Add a visit's {sign index: seconds} to the row."""
+        added = {self.columns[index]: seconds for index, seconds in seen.items()}
+        self.store.add_row(self.position, added)
+        for column, seconds in added.items():
+            self.values[column] = self.values.get(column, 0.0) + seconds
+
+    def items(self):
+        return [(index, self.values.get(column, 0.0)) for index, column in self.columns.items()]
+
+    def seen_items(self):
+        """Return (sign index, seconds) for only the signs the student has seen."""
+        sign_ids = self.sign_ids
+        return [(sign_ids[column], seconds) for column, seconds in self.values.items() if seconds]
+
+    def __len__(self):
+        return len(self.columns)
+
+
+class SparseViewership:
+    """
+    Viewership matrix that keeps only the nonzero times, for many signs that each student sees few of.
+
+    Settled values are held row by row in compressed sparse row form (indptr, indices, data).
+    New additions wait in a buffer: per student for one-at-a-time updates, or as whole blocks
+    from the vectorized engine. The buffer is folded in once it holds compact_at entries, or as
+    many as are already settled if that is more, so folding costs O(log n) per entry overall;
+    or earlier when a read needs it.
+
+    Attributes:
+        shape (tuple): (students, columns).
+        indptr (ndarray): Where each student's entries start in indices and data (int64).
+        indices (ndarray): Column of each entry, sorted within a student (int32).
+        data (ndarray): Seconds of each entry (float32).
+    """
+    compact_at = 1 << 20
+
+    def __init__(self, num_students, num_columns):
+        self.shape = (num_students, num_columns)
+        self.clear()
+
+    def clear(self):
+        """Zero every entry."""
+        self.indptr = np.zeros(self.shape[0] + 1, dtype=np.int64)
+        self.indices = np.empty(0, dtype=np.int32)
+        self.data = np.empty(0, dtype=np.float32)
+        self.pending_rows = {}  # Position -> {column: seconds} waiting to be folded in
+        self.pending_blocks = []  # (rows, columns, seconds) arrays waiting to be folded in
+        self.pending_count = 0
+
+    def add_row(self, position, values):
+        """Add {column: seconds} to one student's row."""
+        row = self.pending_rows.setdefault(position, {})
+        for column, seconds in values.items():
+            row[column] = row.get(column, 0.0) + seconds
+        self.pending_count += len(values)
+        if self.pending_count >= max(self.compact_at, len(self.data)):
+            self.compact()
+
+    def add_block(self, positions, columns, exposure):
+        """Add a (students x columns) block of seconds, keeping only its nonzero entries."""
+        rows, cols = np.nonzero(exposure)
+        self.pending_blocks.append((np.asarray(positions)[rows], np.asarray(columns)[cols], exposure[rows, cols]))
+        self.pending_count += len(rows)
+        if self.pending_count >= max(self.compact_at, len(self.data)):
+            self.compact()
+
+    def set_row(self, position, values):
+        """Replace one student's row with {column: seconds}."""
+        current = self.row(position)
+        changes = {column: values.get(column, 0.0) - current.get(column, 0.0) for column in set(current) | set(values)}
+        self.add_row(position, changes)
+
+    def compact(self):
+        """Fold the buffered additions into the settled rows, dropping entries that sum to zero."""
+        if not self.pending_count:
+            return
+        rows = [np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))]
+        cols = [self.indices]
+        values = [self.data.astype(np.float64)]
+        for block_rows, block_cols, block_values in self.pending_blocks:
+            rows.append(block_rows)
+            cols.append(block_cols)
+            values.append(block_values)
+        for position, row in self.pending_rows.items():
+            rows.append(np.full(len(row), position))
+            cols.append(np.fromiter(row.keys(), dtype=np.int64, count=len(row)))
+            values.append(np.fromiter(row.values(), dtype=np.float64, count=len(row)))
+
+        keys = np.concatenate(rows).astype(np.int64) * self.shape[1] + np.concatenate(cols)
+        keys, inverse = np.unique(keys, return_inverse=True)
+        sums = np.bincount(inverse, weights=np.concatenate(values).astype(np.float64))
+        keep = sums != 0
+        keys, sums = keys[keep], sums[keep]
+
+        self.indptr = np.concatenate(([0], np.cumsum(np.bincount(keys // self.shape[1], minlength=self.shape[0]))))
+        self.indices = (keys % self.shape[1]).astype(np.int32)
+        self.data = sums.astype(np.float32)
+        self.pending_rows = {}
+        self.pending_blocks = []
+        self.pending_count = 0
+
+    def row(self, position):
+        """Return one student's nonzero entries as {column: seconds}."""
+        if self.pending_blocks:
+            self.compact()
+        low, high = self.indptr[position], self.indptr[position + 1]
+        values = dict(zip(self.indices[low:high].tolist(), self.data[low:high].tolist()))
+        for column, seconds in self.pending_rows.get(position, {}).items():
+            values[column] = values.get(column, 0.0) + seconds
+        return {column: seconds for column, seconds in values.items() if seconds}  # Buffered changes can cancel out
+
+    def column(self, column):
+        """Return one column as a dense array over all students."""
+        self.compact()
+        rows = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+        mask = self.indices == column
+        return np.bincount(rows[mask], weights=self.data[mask], minlength=self.shape[0]).astype(np.float32)
+
+    def toarray(self):
+        """Return the whole matrix as a dense array."""
+        self.compact()
+        dense = np.zeros(self.shape, dtype=np.float32)
+        dense[np.repeat(np.arange(self.shape[0]), np.diff(self.indptr)), self.indices] = self.data
+        return dense
+
+    def nbytes(self):
+        """Return the memory used by the settled entries, in bytes."""
+        return self.indptr.nbytes + self.indices.nbytes + self.data.nbytes
@@ -0,0 +1,104 @@
+import json
+import os
+import subprocess
+import sys
+
+# Longest a GUI may take from interpreter start to its first drawn frame. This is the target the
+# check enforces; it only holds once check_startup has passed on a machine with a display.
+STARTUP_BUDGET_SECONDS = 0.5
+
+# Modules that should not be imported before the first frame
+HEAVY_MODULES = ["numpy", "PIL", "scrumdog_queue", "Student_Population", "Database3"]
+
+# The GUIs to check, as (module, class)
+GUIS = [("Gui", "ScrumGui"), ("Testin_Gui_1", "Scrum_Gui")]
+
+# Runs in a fresh interpreter so the import time is included. Work a GUI defers with after_idle,
+# like loading the background photo, is held back until the first frame has been timed, as
+# window.update() would otherwise run it before that frame is counted.
+PROBE = """
+import time
+start = time.perf_counter()
+import sys
+import tkinter as tk
+import {module}
+window = tk.Tk()
+deferred = []
+window.after_idle = lambda callback, *args: deferred.append((callback, args))
+gui = {module}.{cls}(window)
+window.update()
+first_frame = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+for callback, args in deferred:
+    callback(*args)
+window.update()
+settled = time.perf_counter() - start
+window.destroy()
+print(json.dumps({{"first_frame": first_frame, "settled": settled, "heavy_modules": heavy}}))
+"""
+
+
+class StartupCheckUnavailable(Exception):
+    """Raised when a GUI cannot be started here at all, e.g. without a display."""
+
+
+def measure(module, cls, runs=3):
+    """
+    Measures a GUI's time to first frame in fresh interpreters.
+
+    Args:
+        module (str): Module that defines the GUI.
+        cls (str): Name of the GUI class, constructed with the Tk root window.
+        runs (int): Number of fresh starts. The fastest is reported, since the first start
+            may also be building caches.
+
+    Returns:
+        dict: "first_frame" in seconds, "settled" in seconds once the deferred after_idle work
+            has run too, and "heavy_modules" already imported by the first frame.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    code = "import json\n" + PROBE.format(module=module, cls=cls, heavy=HEAVY_MODULES)
+    best = None
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", code], cwd=directory, capture_output=True, text=True)
+        if output.returncode:
+            error = output.stderr.strip().splitlines()
+            raise StartupCheckUnavailable(f"{module}.{cls} did not start: {error[-1] if error else output.returncode}")
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        if best is None or result["first_frame"] < best["first_frame"]:
+            best = result
+    return best
+
+
+def check_startup(budget=STARTUP_BUDGET_SECONDS, runs=3):
+    """
+    Checks every GUI against the startup budget and prints a report.
+
+    Args:
+        budget (float): Allowed seconds to first frame.
+        runs (int): Fresh starts per GUI.
+
+    Returns:
+        bool: True if every GUI is within budget and imports none of HEAVY_MODULES before its first
+            frame, or None if the GUIs could not be started here, so nothing was measured.
+    """
+    passed = True
+    for module, cls in GUIS:
+        try:
+            result = measure(module, cls, runs)
+        except StartupCheckUnavailable as error:
+            print(f"Cannot check the startup budget here: {error}")
+            return None
+        ok = result["first_frame"] <= budget and not result["heavy_modules"]
+        passed = passed and ok
+        print(f"{module}.{cls}: first frame in {result['first_frame'] * 1000:.0f} ms "
+              f"(budget {budget * 1000:.0f} ms) {'OK' if ok else 'OVER BUDGET'}, "
+              f"background in by {result['settled'] * 1000:.0f} ms")
+        if result["heavy_modules"]:
+            print(f"  imported before first frame: {', '.join(result['heavy_modules'])}")
+    return passed
+
+
+if __name__ == "__main__":
+    passed = check_startup()
+    sys.exit(2 if passed is None else 0 if passed else 1)
@@ -0,0 +1,338 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from queue import Queue
+import numpy as np
+import scrumdog_queue
+import Student_Population
+from Database3 import Database
+from scrumdog_engines import ENGINES
+
+
+# Population sizes and sign counts covered by a full run
+STUDENT_COUNTS = [1_000, 10_000, 100_000, 1_000_000]
+SIGN_COUNTS = [5, 20, 100, 1000]
+
+# Smaller grid for a quick check before committing
+QUICK_STUDENT_COUNTS = [1_000, 10_000]
+QUICK_SIGN_COUNTS = [5, 100]
+
+# Engines run when none are asked for. The walk engine is the only one that calls
+# CircularLinkedList.rotate, so it stays in to catch regressions there.
+DEFAULT_ENGINES = ("walk", "timeline", "vectorized")
+
+# Largest population each engine is timed on; bigger cases are skipped. The walk engine would
+# take hours on the largest populations with many signs.
+ENGINE_MAX_STUDENTS = {"walk": 100_000}
+
+# Largest students x sign columns CSV a case may write; bigger CSV cases are skipped. Sparse
+# runs write only the signs each student saw, in one signs_seen column, so they are never skipped.
+MAX_CELLS = 1 << 27
+
+# Database.excel needs every row in memory as a dict first, so its case stops at fewer cells
+LIST_MAX_CELLS = 1 << 24
+
+# Seconds each sign is displayed, as in the GUI's default
+SIGN_TIME = 5
+
+# Sign count above which populations keep sparse viewership, as SignProcessingSystem does
+SPARSE_ABOVE = scrumdog_queue.SignProcessingSystem.dense_sign_limit
+
+
+def build_system(num_students, num_signs, engine="vectorized", seed=0):
+    """
+    Builds a population and a sign rotation the same way on every run.
+
+    Args:
+        num_students (int): Number of students generated.
+        num_signs (int): Number of signs in the rotation.
+        engine (str): Key of ENGINES.
+        seed (int): Seed for the population, and for engines with their own random stream.
+
+    Returns:
+        SignProcessingSystem: The system, ready to run.
+    """
+    signs = scrumdog_queue.CircularLinkedList()
+    for i in range(1, num_signs + 1):
+        signs.append(i, SIGN_TIME)
+    signs.finalize_signs()
+    students = Student_Population.generate_population(num_students, seed=seed, num_signs=num_signs,
+                                                      sparse=num_signs > SPARSE_ABOVE)
+    return ENGINES[engine](students, signs, seed)
+
+
+# Each setup builds everything a case needs outside the timed region and returns
+# (run, items): a callable doing the measured work and the number of students it handles.
+
+def setup_generate(num_students, num_signs, engine, workdir):
+    """Student generation: one batched draw of the whole population."""
+    def run():
+        Student_Population.generate_population(num_students, seed=0, num_signs=num_signs,
+                                               sparse=num_signs > SPARSE_ABOVE)
+    return run, num_students
+
+
+def setup_daily_queue(num_students, num_signs, engine, workdir):
+    """Daily queue processing: Monday's students drained through process_queue_and_signs."""
+    system = build_system(num_students, num_signs, engine)
+    student_queue = Queue()
+    for student in system.day_index["Monday"]:
+        student_queue.put(student)
+    items = student_queue.qsize()
+
+    def run():
+        system.process_queue_and_signs(student_queue, "Monday")
+    return run, items
+
+
+def setup_week(num_students, num_signs, engine, workdir):
+    """Full-week processing: every weekday simulated into the students' viewership stats."""
+    system = build_system(num_students, num_signs, engine)
+    items = sum(len(system.day_index[day]) for day in system.DAYS_OF_WEEK)
+
+    def run():
+        system.simulate_week()
+    return run, items
+
+
+def setup_csv_write(num_students, num_signs, engine, workdir):
+    """CSV write: one weekly row per student streamed through Database.excel_stream."""
+    system = build_system(num_students, num_signs)
+    system.simulate_week()
+    database = Database(os.path.join(workdir, "bench.csv"))
+
+    def run():
+        database.excel_stream(system.build_student_data(student) for student in system.students)
+    return run, num_students
+
+
+def setup_csv_write_list(num_students, num_signs, engine, workdir):
+    """CSV write: the same weekly rows built up front as a list and written through Database.excel."""
+    system = build_system(num_students, num_signs)
+    system.simulate_week()
+    rows = [system.build_student_data(student) for student in system.students]
+    database = Database(os.path.join(workdir, "bench.csv"))
+
+    def run():
+        database.excel(rows)
+    return run, num_students
+
+
+def setup_csv_read(num_students, num_signs, engine, workdir):
+    """CSV read: the weekly rows read back through Database.read_chunks."""
+    run_write, items = setup_csv_write(num_students, num_signs, engine, workdir)
+    run_write()
+    database = Database(os.path.join(workdir, "bench.csv"))
+
+    def run():
+        for _ in database.read_chunks(10000):
+            pass
+    return run, items
+
+
+# Benchmarks by name, as (setup, uses_engine, max_cells), where max_cells is the largest dense CSV
+# the case may write, or None when it writes none. The CSV rows do not depend on the engine.
+BENCHMARKS = {
+    "generate": (setup_generate, False, None),
+    "daily_queue": (setup_daily_queue, True, None),
+    "week": (setup_week, True, None),
+    "csv_write": (setup_csv_write, False, MAX_CELLS),
+    "csv_write_list": (setup_csv_write_list, False, LIST_MAX_CELLS),
+    "csv_read": (setup_csv_read, False, MAX_CELLS),
+}
+
+
+def time_case(setup, num_students, num_signs, engine, repeats=3, memory=True):
+    """
+    Times one benchmark case, with fresh state for every repeat.
+
+    Peak memory comes from a separate run under tracemalloc, so the tracing overhead
+    never ends up in the wall times.
+
+    Args:
+        setup (callable): One of the setup_* functions.
+        num_students (int): Population size.
+        num_signs (int): Number of signs.
+        engine (str): Key of ENGINES.
+        repeats (int): Timed runs; the fastest is reported.
+        memory (bool): Also measure peak memory.
+
+    Returns:
+        dict: Wall times, throughput and peak memory of the case.
+    """
+    times = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(repeats):
+            run, items = setup(num_students, num_signs, engine, workdir)
+            gc.collect()
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+            del run
+
+        peak = None
+        if memory:
+            run, items = setup(num_students, num_signs, engine, workdir)
+            gc.collect()
+            tracemalloc.start()
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            del run
+
+    best = min(times)
+    return {
+        "students": items,
+        "wall_seconds": best,
+        "wall_seconds_median": statistics.median(times),
+        "students_per_second": items / best if best > 0 else None,
+        "peak_memory_mb": peak / 2 ** 20 if peak is not None else None,
+    }
+
+
+def case_key(result):
+    """Identifies a case so the same case can be matched up between two runs."""
+    return (result["benchmark"], result["engine"], result["population"], result["signs"])
+
+
+def run_benchmarks(benchmarks=None, student_counts=STUDENT_COUNTS, sign_counts=SIGN_COUNTS,
+                   engines=DEFAULT_ENGINES, repeats=3, memory=True, log=print):
+    """
+    Runs every benchmark over the grid of population sizes, sign counts and engines.
+
+    Args:
+        benchmarks (list): Names from BENCHMARKS. Defaults to all of them.
+        student_counts (list): Population sizes.
+        sign_counts (list): Sign counts.
+        engines (list): Keys of ENGINES for the simulation benchmarks. Each is only timed up to
+            its population in ENGINE_MAX_STUDENTS.
+        repeats (int): Timed runs per case.
+        memory (bool): Also measure peak memory.
+        log (callable): Called with a line of text as each case finishes, or None.
+
+    Returns:
+        dict: "environment" describing the machine and code, and "results" with one dict per case.
+    """
+    results = []
+    for name in benchmarks or BENCHMARKS:
+        setup, uses_engine, max_cells = BENCHMARKS[name]
+        for num_students in student_counts:
+            for num_signs in sign_counts:
+                for engine in engines if uses_engine else [None]:
+                    result = {"benchmark": name, "engine": engine, "population": num_students,
+                              "signs": num_signs}
+                    if max_cells and num_signs <= SPARSE_ABOVE and num_students * num_signs > max_cells:
+                        result["skipped"] = f"CSV over {max_cells} cells"
+                    elif num_students > ENGINE_MAX_STUDENTS.get(engine, num_students):
+                        result["skipped"] = f"{engine} engine over {ENGINE_MAX_STUDENTS[engine]} students"
+                    else:
+                        result.update(time_case(setup, num_students, num_signs, engine or "vectorized",
+                                                repeats, memory))
+                    results.append(result)
+                    if log:
+                        log(format_result(result))
+    return {"environment": environment(), "results": results}
+
+
+def environment():
+    """Describes where and on what code a run was made, to tell runs apart."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def format_result(result):
+    """One line of text describing a case."""
+    label = f"{result['benchmark']:<12} {result['engine'] or '-':<10} n={result['population']:<8} " \
+            f"signs={result['signs'] if result['signs'] is not None else '-':<5}"
+    if "skipped" in result:
+        return f"{label} skipped: {result['skipped']}"
+    memory = f"{result['peak_memory_mb']:9.1f} MB" if result["peak_memory_mb"] is not None else ""
+    return f"{label} {result['wall_seconds']:9.4f} s {result['students_per_second']:14,.0f} students/s {memory}"
+
+
+def compare(old, new):
+    """
+    Matches up the cases of two runs and works out how each changed.
+
+    Args:
+        old (dict): Earlier run, as returned by run_benchmarks.
+        new (dict): Later run.
+
+    Returns:
+        list: One dict per case in both runs, with the new result and the ratios of new to old
+            wall time and peak memory (below 1 is an improvement).
+    """
+    before = {case_key(result): result for result in old["results"] if "skipped" not in result}
+    changes = []
+    for result in new["results"]:
+        previous = before.get(case_key(result))
+        if previous is None or "skipped" in result:
+            continue
+        change = dict(result)
+        change["time_ratio"] = result["wall_seconds"] / previous["wall_seconds"] if previous["wall_seconds"] else None
+        if result["peak_memory_mb"] and previous["peak_memory_mb"]:
+            change["memory_ratio"] = result["peak_memory_mb"] / previous["peak_memory_mb"]
+        else:
+            change["memory_ratio"] = None
+        changes.append(change)
+    return changes
+
+
+def load(path):
+    with open(path, mode="r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save(report, path):
+    with open(path, mode="w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark student generation, simulation and CSV I/O.")
+    parser.add_argument("--output", default="benchmark_results.json", help="where to save the results as JSON")
+    parser.add_argument("--quick", action="store_true", help="run a small grid only")
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument("--students", nargs="+", type=int, help="population sizes")
+    parser.add_argument("--signs", nargs="+", type=int, help="sign counts")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(DEFAULT_ENGINES))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory runs")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two saved runs instead")
+    args = parser.parse_args()
+
+    if args.compare:
+        for change in compare(load(args.compare[0]), load(args.compare[1])):
+            memory = f"memory x{change['memory_ratio']:.2f}" if change["memory_ratio"] is not None else ""
+            print(f"{format_result(change)}  time x{change['time_ratio']:.2f} {memory}")
+    else:
+        report = run_benchmarks(
+            args.benchmarks,
+            args.students or (QUICK_STUDENT_COUNTS if args.quick else STUDENT_COUNTS),
+            args.signs or (QUICK_SIGN_COUNTS if args.quick else SIGN_COUNTS),
+            args.engines,
+            args.repeats,
+            not args.no_memory,
+        )
+        save(report, args.output)
+        print(f"Saved {len(report['results'])} results to {args.output}")
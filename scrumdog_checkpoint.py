@@ -0,0 +1,348 @@
+import os
+import pickle
+import struct
+import zlib
+from scrumdog_queue import ResultAccumulator
+
+
+# Bump when the checkpoint contents change, so old files are refused instead of misread
+CHECKPOINT_VERSION = 2
+
+# Students run between checkpoints when no interval is given
+DEFAULT_CHECKPOINT_EVERY = 100_000
+
+# A checkpoint file is a run of records, each a compressed pickle after its length. The first
+# holds the run's fingerprint and starting state; each checkpoint then appends one with the
+# rows and viewership stats of the students its block ran, and the state to carry on from.
+# A checkpoint so costs in proportion to its block rather than to the whole run so far, and
+# the file ends up about the size of the results. Resuming replays every record.
+RECORD_LENGTH = struct.Struct("<Q")
+
+
+def fingerprint(system):
+    """
+    Describes the run a checkpoint belongs to, so it is only resumed into a matching system.
+
+    Args:
+        system (SignProcessingSystem): The system being run.
+
+    Returns:
+        dict: Engine, population size, signs and result settings.
+    """
+    return {
+        "engine": type(system).__name__,
+        "students": len(system.students),
+        "sign_ids": list(system.sign_ids),
+        "merge_policy": system.merge_policy,
+        "exposure_mode": system.exposure_mode,
+    }
+
+
+class VisitLog:
+    """Stands in for the accumulator while a block runs, passing every row on and keeping it for the checkpoint."""
+
+    def __init__(self, accumulator):
+        self.accumulator = accumulator
+        self.visits = []  # (student_data, seen, day) in the order they were added
+
+    def add(self, student_data, seen, day=None):
+        self.accumulator.add(student_data, seen, day)
+        self.visits.append((student_data, seen, day))
+
+
+def capture_viewership(students):
+    """
+    Returns the viewership stats of a block's students as they stand: rows of a StudentPopulation's
+    store by position, or one dict per student by identifier.
+    """
+    positions = getattr(students, "positions", None)
+    if positions is None:
+        return "students", [(student.identifier, dict(student.viewership_stats)) for student in students]
+    store = students.population.viewership
+    if students.population.sparse:
+        return "sparse", positions.copy(), [store.row(position) for position in positions.tolist()]
+    return "dense", positions.copy(), store[positions]
+
+
+def restore_viewership(students, saved, by_id):
+    """
+    Puts viewership stats from capture_viewership back.
+
+    Args:
+        students: Every student of the run, a StudentPopulation or a list of students.
+        saved (tuple): From capture_viewership.
+        by_id (dict): Students keyed by identifier, for stats saved by identifier.
+    """
+    kind = saved[0]
+    if kind == "students":
+        for identifier, stats in saved[1]:
+            by_id[identifier].viewership_stats = stats
+    elif kind == "sparse":
+        for position, values in zip(saved[1].tolist(), saved[2]):
+            students.viewership.set_row(position, values)
+    else:
+        students.viewership[saved[1]] = saved[2]
+
+
+def save_checkpoint(system, path, progress, block=None, log=None, first=False):
+    """
+    Appends a checkpoint record with everything needed to carry on with a run.
+
+    Args:
+        system (SignProcessingSystem): The system being run.
+        path (str): Checkpoint file.
+        progress (dict): Where the run has got to, see run_week.
+        block: Students run since the last checkpoint, whose viewership stats are saved, or None.
+        log (VisitLog): Rows added to the accumulator since the last checkpoint, or None.
+        first (bool): Start a new file, recording the run's fingerprint.
+    """
+    rng = getattr(system, "rng", None)
+    record = {
+        "progress": progress,
+        "rotation": system.signs.get_state(),
+        "sign_schedule": system.sign_schedule,
+        "viewership": capture_viewership(block) if block is not None else None,
+        "visits": log.visits if log is not None else None,
+        "rng": rng.bit_generator.state if rng is not None else None,
+    }
+    if first:
+        record.update(version=CHECKPOINT_VERSION, fingerprint=fingerprint(system))
+    write_record(path, record, "wb" if first else "ab")
+
+
+def write_record(path, record, mode="ab"):
+    """Writes one record to a checkpoint file, its length first so a torn last record can be told apart."""
+    data = zlib.compress(pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL), 1)
+    with open(path, mode) as file:
+        file.write(RECORD_LENGTH.pack(len(data)) + data)
+
+
+def load_checkpoint(path):
+    """
+    Reads the records of a checkpoint file written by save_checkpoint. Only load checkpoints
+    this code wrote: like any pickle, a crafted file can run code when it is read.
+
+    A record cut short by a run killed while writing it is left out, along with anything after it.
+
+    Args:
+        path (str): Checkpoint file.
+
+    Returns:
+        tuple: The complete records in order, and the file offset where they end.
+    """
+    records = []
+    end = 0
+    with open(path, mode="rb") as file:
+        while True:
+            header = file.read(RECORD_LENGTH.size)
+            if len(header) < RECORD_LENGTH.size:
+                break
+            data = file.read(RECORD_LENGTH.unpack(header)[0])
+            try:
+                records.append(pickle.loads(zlib.decompress(data)))
+            except (zlib.error, pickle.UnpicklingError, EOFError):
+                break
+            end = file.tell()
+    if not records or records[0].get("version") != CHECKPOINT_VERSION:
+        version = records[0].get("version") if records else None
+        raise ValueError(f"{path} is a version {version} checkpoint, this code reads version {CHECKPOINT_VERSION}.")
+    return records, end
+
+
+def restore(system, records):
+    """
+    Puts a freshly built system into the state a checkpoint recorded.
+
+    Args:
+        system (SignProcessingSystem): Built with the same students, signs and settings as the checkpointed one.
+        records (list): From load_checkpoint.
+
+    Returns:
+        dict: The run's progress as of the last record.
+    """
+    expected = records[0]["fingerprint"]
+    actual = fingerprint(system)
+    if actual != expected:
+        differences = [name for name in expected if expected[name] != actual.get(name)]
+        raise ValueError(f"The checkpoint was written by a different run; these differ: {differences}")
+    last = records[-1]
+    if last["progress"]["build_rows"]:
+        system.accumulator = ResultAccumulator(system.merge_policy, system.sign_ids)
+    by_id = None
+    for record in records:
+        saved = record["viewership"]
+        if saved is not None:
+            if saved[0] == "students" and by_id is None:
+                by_id = {student.identifier: student for student in system.students}
+            restore_viewership(system.students, saved, by_id)
+        for student_data, seen, day in record["visits"] or ():
+            system.accumulator.add(student_data, seen, day)
+    system.signs.set_state(last["rotation"])
+    system.total_signs = len(system.signs)
+    system.sign_schedule = last["sign_schedule"]
+    if last["rng"] is not None:
+        system.rng.bit_generator.state = last["rng"]
+    return last["progress"]
+
+
+def block_size(system, every):
+    """
+    Students run between checkpoints, rounded up to whole batches of engines that work in batches,
+    so splitting a day into blocks gives the same batches, and the same results, as a run without checkpoints.
+    """
+    chunk_cells = getattr(system, "chunk_cells", None)
+    if chunk_cells is None or not len(system.signs):
+        return every
+    batch = max(1, chunk_cells // len(system.signs))
+    return -(-every // batch) * batch
+
+
+def run_week(system, path, every=DEFAULT_CHECKPOINT_EVERY, days=None, build_rows=True):
+    """
+    Runs the week like process_students_for_week, or simulate_week without rows, writing a
+    checkpoint every time another block of students is done.
+
+    If the run dies, build the system again the same way and call resume_week with the same
+    path: it carries on from the last checkpoint and finishes with exactly the results an
+    uninterrupted run gives. Engines whose rotation runs on a clock see a whole day at once,
+    so they are checkpointed at the end of each day. Instrumentation is not checkpointed.
+
+    Checkpoints only record what changed since the system was built, so start from a freshly
+    built system. Each one appends the block's rows and viewership stats to the file, and takes
+    time in proportion to the block; a smaller every costs little more than a larger one.
+
+    Args:
+        system (SignProcessingSystem): The system to run, freshly built.
+        path (str): Checkpoint file, started afresh, added to at every checkpoint and left in place at the end.
+        every (int): Students run between checkpoints.
+        days (list): Days to run, in order. Defaults to Monday to Friday.
+        build_rows (bool): Build result rows, merged according to the system's merge_policy.
+
+    Returns:
+        list: The week's results as process_students_for_week returns them, or None without rows.
+    """
+    if every < 1:
+        raise ValueError("every must be at least 1.")
+    progress = {
+        "days": list(system.check_days(days)),
+        "day": 0,  # Position in days of the day being run
+        "position": 0,  # Students of that day already run
+        "segment_start": 0,  # Student the last sign change happened before, where blocks are counted from
+        "pending": None,  # That day's sign changes not yet made, once the day has started
+        "build_rows": build_rows,
+        "every": every,
+    }
+    if build_rows:
+        system.accumulator = ResultAccumulator(system.merge_policy, system.sign_ids)
+    save_checkpoint(system, path, progress, first=True)
+    return continue_week(system, path, progress)
+
+
+def resume_week(system, path):
+    """
+    Carries on with a run from its last checkpoint.
+
+    Args:
+        system (SignProcessingSystem): Built with the same students, signs and settings as the
+            interrupted run, and not run since.
+        path (str): Checkpoint file the interrupted run_week was writing.
+
+    Returns:
+        list: The week's results, as run_week returns them.
+    """
+    records, end = load_checkpoint(path)
+    progress = restore(system, records)
+    with open(path, mode="r+b") as file:
+        file.truncate(end)  # Drop a record cut short by the interruption, so new ones follow the last good one
+    return continue_week(system, path, progress)
+
+
+def continue_week(system, path, progress):
+    """Runs the week on from where progress says it got to; see run_week."""
+    days = progress["days"]
+    while progress["day"] < len(days):
+        day = days[progress["day"]]
+        students = system.day_index[day]
+        if progress["pending"] is None:
+            progress["pending"] = system.sign_schedule.pop(day, [])  # The day's changes, made as it goes
+        pending = progress["pending"]
+
+        while True:
+            position = progress["position"]
+            while pending and pending[0]["at"] <= position:
+                system.apply_sign_change(pending.pop(0))
+                progress["segment_start"] = position
+            if position >= len(students):
+                break
+            if system.rotation_follows_viewers:
+                size = block_size(system, progress["every"])
+                start = progress["segment_start"]
+                end = start + ((position - start) // size + 1) * size
+            else:
+                end = len(students)  # Clock engines run the whole day together
+            end = min(end, len(students), pending[0]["at"] if pending else len(students))
+            block = students[position:end]
+            log = run_block(system, block, day, progress["build_rows"])
+            progress["position"] = end
+            save_checkpoint(system, path, progress, block, log)
+
+        for change in pending:
+            system.apply_sign_change(change)  # Changes scheduled after the day's last student
+        progress.update(day=progress["day"] + 1, position=0, segment_start=0, pending=None)
+    save_checkpoint(system, path, progress)
+    return system.accumulator.results() if progress["build_rows"] else None
+
+
+def run_block(system, students, day, build_rows):
+    """
+    Runs one block of a day's students, adding their rows to the system's accumulator if there are rows.
+
+    Returns:
+        VisitLog: The rows the block added, or None without rows.
+    """
+    if build_rows:
+        log = VisitLog(system.accumulator)
+        system.process_students(students, day, log)
+        return log
+    with system.instrumented_day(day):
+        system.simulate_students(students, day)
+    return None
+
+
+if __name__ == "__main__":
+    import tempfile
+    import scrumdog_queue
+    import Student_Population
+    from scrumdog_vectorized import VectorizedSignProcessingSystem
+
+    def build():
+        signs = scrumdog_queue.CircularLinkedList()
+        for i in range(1, 7):
+            signs.append(i, 5)  # Add 6 signs, each with a display time of 5 seconds
+        return VectorizedSignProcessingSystem(Student_Population.generate_population(20_000, seed=1), signs)
+
+    class Interrupted(Exception):
+        pass
+
+    def interrupt_after(saves):
+        """Stands in for a killed job: makes the checkpoint writer fail after a number of saves."""
+        real_save = save_checkpoint
+        count = [0]
+
+        def save(*args, **options):
+            real_save(*args, **options)
+            count[0] += 1
+            if count[0] == saves:
+                raise Interrupted()
+        return save
+
+    expected = build().process_students_for_week()
+    path = os.path.join(tempfile.mkdtemp(), "week.ckpt")
+    save_checkpoint = interrupt_after(3)
+    try:
+        run_week(build(), path, every=5000)
+    except Interrupted:
+        print(f"Interrupted; checkpoint is {os.path.getsize(path):,} bytes")
+    save_checkpoint = interrupt_after(0)
+    results = resume_week(build(), path)
+    print(f"Resumed run matches an uninterrupted one: {results == expected}")
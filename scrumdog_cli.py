@@ -0,0 +1,297 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import scrumdog_queue
+import Student_Population
+from Database3 import Database
+from scrumdog_engines import ENGINES
+from scrumdog_sketch import ExposureSketches
+
+
+# Settings of one run; a config file sets any of them, for every run or for one
+DEFAULT_RUN = {
+    "name": None,  # Names the run's output files; defaults to run1, run2, ...
+    "num_students": 1000,  # Number of students generated
+    "speed_mean": None,  # Mean car speed in mph, None for the default 10-20 mph range
+    "speed_std": None,  # Standard deviation of car speed in mph
+    "num_signs": 6,  # Number of signs in the rotation
+    "sign_time": 5,  # Seconds each sign is displayed
+    "random_sign_order": False,  # Shuffle the rotation order, from the seed
+    "seed": 0,  # Seed for the population, the sign order and engines with their own random stream
+    "engine": "vectorized",  # Key of ENGINES
+    "weeks": 1,  # Weeks simulated, for the per-student outputs
+    "output": "csv",  # Key of OUTPUTS
+}
+
+# What a run writes, by name, with the file it goes to
+OUTPUTS = {
+    "csv": "{name}.csv",  # One weekly row per student
+    "sqlite": "{name}.db",  # The same rows in a SQLite database
+    "histogram": "{name}.histograms.csv",  # Exposure histograms per sign, day and student type
+    "sketch": "{name}.sketch.npz",  # Mergeable exposure quantile sketches per sign
+    "none": None,  # Only the summary
+}
+
+# Outputs that collect one week as it runs, so they cannot cover several
+SINGLE_WEEK_OUTPUTS = ("histogram", "sketch")
+
+
+def load_config(path):
+    """
+    Reads run settings from a JSON or TOML file, picked by the extension.
+
+    The file is either one run's settings, or settings shared by every run with a list of runs
+    under "runs" (an array of tables, [[runs]], in TOML), each overriding what it needs.
+
+    Args:
+        path (str): The config file.
+
+    Returns:
+        list: Each run's complete settings, see DEFAULT_RUN.
+    """
+    if path.endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:
+            raise ValueError("TOML configs need Python 3.11 or later; use JSON instead.") from None
+        with open(path, mode="rb") as file:
+            config = tomllib.load(file)
+    else:
+        with open(path, mode="r", encoding="utf-8") as file:
+            config = json.load(file)
+    if not isinstance(config, dict):
+        raise ValueError(f"{path} should hold a table of settings.")
+    return expand_runs(config)
+
+
+def expand_runs(config):
+    """
+    Turns a loaded config into the settings of each run, checking them before anything runs.
+
+    Args:
+        config (dict): Shared settings, with the runs' own settings under "runs" if there are several.
+
+    Returns:
+        list: Each run's complete settings.
+    """
+    shared = {key: value for key, value in config.items() if key != "runs"}
+    runs = []
+    for position, overrides in enumerate(config.get("runs", [{}]), start=1):
+        run = {**DEFAULT_RUN, **shared, **overrides}
+        if run["name"] is None:
+            run["name"] = f"run{position}"
+        check_run(run)
+        runs.append(run)
+
+    names = [run["name"] for run in runs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Runs need different names, as they name the output files: {duplicates}")
+    return runs
+
+
+def is_number(value):
+    """Whether a setting is a number; true and false are not, though Python counts bools as ints."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def is_whole_number(value):
+    """Whether a setting is an int and not a bool."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def check_run(run):
+    """Raises a ValueError naming the run and the setting if a run's settings cannot work."""
+    name = run["name"]
+    unknown = sorted(set(run) - set(DEFAULT_RUN))
+    if unknown:
+        raise ValueError(f"Run {name!r} has unknown settings {unknown}; known settings are {list(DEFAULT_RUN)}")
+    if not isinstance(name, str) or not name or os.sep in name:
+        raise ValueError(f"Run names must be non-empty file names, got {name!r}")
+    for key in ("num_students", "num_signs", "weeks"):
+        if not is_whole_number(run[key]) or run[key] < 1:
+            raise ValueError(f"Run {name!r}: {key} must be a whole number of at least 1, got {run[key]!r}")
+    if not is_number(run["sign_time"]) or run["sign_time"] <= 0:
+        raise ValueError(f"Run {name!r}: sign_time must be a positive number of seconds, got {run['sign_time']!r}")
+    for key in ("speed_mean", "speed_std"):
+        if run[key] is not None and (not is_number(run[key]) or run[key] <= 0):
+            raise ValueError(f"Run {name!r}: {key} must be None or a positive number of mph, got {run[key]!r}")
+    if run["speed_std"] is not None and run["speed_mean"] is None:
+        raise ValueError(f"Run {name!r}: speed_std only applies with a speed_mean")
+    if not is_whole_number(run["seed"]) or run["seed"] < 0:
+        raise ValueError(f"Run {name!r}: seed must be a whole number of at least 0, got {run['seed']!r}")
+    if not isinstance(run["random_sign_order"], bool):
+        raise ValueError(f"Run {name!r}: random_sign_order must be true or false, got {run['random_sign_order']!r}")
+    if run["engine"] not in ENGINES:
+        raise ValueError(f"Run {name!r}: engine must be one of {list(ENGINES)}, got {run['engine']!r}")
+    if run["output"] not in OUTPUTS:
+        raise ValueError(f"Run {name!r}: output must be one of {list(OUTPUTS)}, got {run['output']!r}")
+    if run["output"] in SINGLE_WEEK_OUTPUTS and run["weeks"] != 1:
+        raise ValueError(f"Run {name!r}: the {run['output']} output covers one week, got weeks={run['weeks']}")
+
+
+def build_system(run):
+    """
+    Builds the population, sign rotation and engine of a run.
+
+    Args:
+        run (dict): The run's settings, see DEFAULT_RUN.
+
+    Returns:
+        SignProcessingSystem: The system, ready to run.
+    """
+    signs = scrumdog_queue.CircularLinkedList(random_sign_order=run["random_sign_order"])
+    for i in range(1, run["num_signs"] + 1):
+        signs.append(i, run["sign_time"])  # Adding signs with display times
+    signs.finalize_signs(random.Random(run["seed"]))
+
+    students = Student_Population.generate_population(
+        run["num_students"],
+        seed=run["seed"],
+        speed_mean=run["speed_mean"],
+        speed_std=run["speed_std"],
+        num_signs=run["num_signs"],
+        sparse=run["num_signs"] > scrumdog_queue.SignProcessingSystem.dense_sign_limit,
+    )
+    return ENGINES[run["engine"]](students, signs, run["seed"])
+
+
+def sign_summary(system):
+    """
+    Summarises the students' viewership per sign.
+
+    Returns:
+        dict: Maps each sign index to the mean seconds per student ("mean_seconds") and the
+            fraction of students who saw the sign at all ("reach").
+    """
+    summary = {}
+    for index in system.sign_ids:
+        column = system.students.sign_column(index)
+        summary[index] = {
+            "mean_seconds": float(column.mean()),
+            "reach": float(np.count_nonzero(column) / len(column)),
+        }
+    return summary
+
+
+def run_one(run, output_dir):
+    """
+    Runs one configuration and writes its output.
+
+    Args:
+        run (dict): The run's settings, see DEFAULT_RUN.
+        output_dir (str): Directory the output file goes in.
+
+    Returns:
+        dict: The run's settings, the file written, rows written, seconds taken and per-sign summary.
+    """
+    start = time.perf_counter()
+    system = build_system(run)
+    output = run["output"]
+    path = os.path.join(output_dir, OUTPUTS[output].format(name=run["name"])) if OUTPUTS[output] else None
+    rows = None
+
+    if output == "histogram":
+        histograms = system.histogram_week()
+        rows = Database(path).excel_stream(histograms.rows(), histograms.fieldnames())
+    elif output == "sketch":
+        sketches = ExposureSketches(system.sign_ids, seed=run["seed"])
+        system.simulate_week(collector=sketches)
+        sketches.save(path)
+    else:
+        system.simulate_weeks(run["weeks"])
+        if path is not None:
+            rows = Database(path, backend=output).excel_stream(
+                system.build_student_data(student) for student in system.students)
+
+    return {
+        "run": run,
+        "file": path,
+        "rows": rows,
+        "seconds": time.perf_counter() - start,
+        "signs": sign_summary(system),
+    }
+
+
+def _run_one(job):
+    """Runs a (run, output_dir) job for the process pool, reporting a failure instead of raising it."""
+    run, output_dir = job
+    try:
+        return run_one(run, output_dir)
+    except Exception as error:
+        return {"run": run, "error": f"{type(error).__name__}: {error}"}
+
+
+def run_batch(runs, output_dir, workers=None, log=print):
+    """
+    Runs every configuration across a process pool and writes summary.json next to their outputs.
+
+    A run that fails is reported in the summary with its error; the others still run.
+
+    Args:
+        runs (list): Each run's settings, as load_config returns them.
+        output_dir (str): Directory for the outputs and the summary; created if missing.
+        workers (int): Number of worker processes. Defaults to the number of CPUs; 1 runs in this process.
+        log (callable): Called with a line of text as each run finishes, or None.
+
+    Returns:
+        list: One result per run, in the order given, as run_one returns them or with an "error".
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [(run, output_dir) for run in runs]
+    results = []
+
+    if workers == 1 or len(jobs) == 1:
+        finished = map(_run_one, jobs)
+        for result in finished:
+            results.append(result)
+            if log:
+                log(format_result(result))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(_run_one, jobs):
+                results.append(result)
+                if log:
+                    log(format_result(result))
+
+    with open(os.path.join(output_dir, "summary.json"), mode="w", encoding="utf-8") as file:
+        json.dump({"runs": results}, file, indent=2)
+    return results
+
+
+def format_result(result):
+    """One line of text describing a finished run."""
+    run = result["run"]
+    label = f"{run['name']:<16} {run['engine']:<10} n={run['num_students']:<8} signs={run['num_signs']:<5}"
+    if "error" in result:
+        return f"{label} failed: {result['error']}"
+    written = f" -> {result['file']}" if result["file"] else ""
+    return f"{label} {result['seconds']:9.2f} s{written}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run simulations from a JSON or TOML config, without the GUI.")
+    parser.add_argument("config", help="JSON or TOML file with the runs' settings")
+    parser.add_argument("--output-dir", default="results", help="where the outputs and summary.json are written")
+    parser.add_argument("--workers", type=int, help="worker processes; defaults to the number of CPUs, 1 runs here")
+    args = parser.parse_args(argv)
+
+    try:
+        runs = load_config(args.config)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+
+    results = run_batch(runs, args.output_dir, args.workers)
+    failed = sum("error" in result for result in results)
+    print(f"{len(results) - failed} of {len(results)} runs finished; summary in "
+          f"{os.path.join(args.output_dir, 'summary.json')}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
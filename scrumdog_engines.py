@@ -0,0 +1,25 @@
+"""
+The exposure engines by name, for the benchmarks, the batch CLI and the tests.
+
+Each entry builds a system as factory(students, signs, seed=None, **options), where options
+are passed on to the system (instrumentation, sign_schedule, ...) and seed seeds engines with
+their own random stream; the others ignore it.
+"""
+from scrumdog_queue import SignProcessingSystem
+from scrumdog_events import EventSignProcessingSystem
+from scrumdog_vectorized import VectorizedSignProcessingSystem
+
+
+ENGINES = {
+    # Steps through the rotation sign by sign, calling CircularLinkedList.rotate
+    "walk": lambda students, signs, seed=None, **options: SignProcessingSystem(students, signs, **options),
+    # Looks each student's stretch up in the rotation's prefix table
+    "timeline": lambda students, signs, seed=None, **options: SignProcessingSystem(
+        students, signs, exposure_mode="timeline", **options),
+    # Works out a whole day's exposure as one NumPy matrix
+    "vectorized": lambda students, signs, seed=None, **options: VectorizedSignProcessingSystem(
+        students, signs, **options),
+    # Students arrive on a wall clock and the rotation keeps time on its own
+    "event": lambda students, signs, seed=None, **options: EventSignProcessingSystem(
+        students, signs, seed=seed, **options),
+}
@@ -0,0 +1,246 @@
+import heapq
+import numpy as np
+from scrumdog_queue import SignProcessingSystem
+
+
+# Arrival rate profile used for any day without its own: (start hour, end hour, relative rate).
+# Arrivals within a window are spread evenly; a window with twice the rate gets twice the cars per hour.
+DEFAULT_ARRIVAL_PROFILE = [
+    (7, 8, 2),  # Early classes
+    (8, 10, 5),  # Morning rush
+    (10, 12, 3),
+    (12, 14, 3),  # Midday classes
+    (14, 17, 2),
+    (17, 19, 1),  # Evening classes
+]
+
+# Event kinds, in the order events at the same instant are handled: the sign changes first
+# so a car arriving at that moment sees the new sign, and cars leave before new ones arrive.
+SIGN_CHANGE = 0
+DEPARTURE = 1
+ARRIVAL = 2
+
+
+def check_profile(profile):
+    """
+    Validates an arrival rate profile.
+
+    Args:
+        profile (list): (start hour, end hour, relative rate) windows.
+
+    Returns:
+        list: The profile, sorted by start hour.
+    """
+    profile = sorted(profile)
+    if not profile:
+        raise ValueError("An arrival profile needs at least one window.")
+    for start, end, rate in profile:
+        if not 0 <= start < end <= 24:
+            raise ValueError(f"Arrival window ({start}, {end}) must satisfy 0 <= start < end <= 24.")
+        if rate < 0:
+            raise ValueError(f"Arrival rate of window ({start}, {end}) must not be negative.")
+    if sum((end - start) * rate for start, end, rate in profile) <= 0:
+        raise ValueError("An arrival profile needs at least one window with a positive rate.")
+    return profile
+
+
+def arrival_times(count, profile, rng):
+    """
+    Draws arrival times for a day's cars from an arrival rate profile.
+
+    Each car independently lands in a window with probability proportional to the window's
+    rate times its length, then uniformly within it, which is how a Poisson process with that
+    rate profile looks once the day's total is known.
+
+    Args:
+        count (int): Number of cars arriving.
+        profile (list): (start hour, end hour, relative rate) windows.
+        rng (numpy.random.Generator): Source of randomness.
+
+    Returns:
+        ndarray: Sorted arrival times in seconds after midnight.
+    """
+    starts = np.array([start for start, end, rate in profile], dtype=np.float64) * 3600
+    lengths = np.array([end - start for start, end, rate in profile], dtype=np.float64) * 3600
+    weights = lengths * np.array([rate for start, end, rate in profile], dtype=np.float64)
+    windows = rng.choice(len(profile), size=count, p=weights / weights.sum())
+    return np.sort(starts[windows] + rng.random(count) * lengths[windows])
+
+
+class EventSignProcessingSystem(SignProcessingSystem):
+    """
+    Discrete-event version of SignProcessingSystem where the signs rotate on a wall clock.
+
+    Students arrive through the day according to an arrival rate profile, and any number of
+    them can be in view of the signs at once. The rotation moves on at each sign's display
+    time whoever is watching. A heap holds the upcoming arrivals, departures and sign changes,
+    and the engine jumps from one event to the next, so a day costs O(events log events)
+    however much the traffic overlaps.
+
+    A student sees whatever was on display between their arrival and arrival plus their view
+    time. Students keep the order they are given in: the first one arrives first.
+
+    Each day the rotation picks up where it stopped the day before, at the day's first arrival.
+
+    Attributes:
+        arrival_profiles (dict): Arrival rate profile for each day, see DEFAULT_ARRIVAL_PROFILE.
+        rng (numpy.random.Generator): Source of arrival times.
+        last_arrivals (ndarray): Arrival times of the last day processed, in seconds after midnight.
+    """
+    rotation_follows_viewers = False  # The rotation runs on the clock
+
+    def __init__(self, students, signs, random_sign_order=False, merge_policy="per_day", instrumentation=None,
+                 arrival_profiles=None, seed=None, sign_schedule=None):
+        super().__init__(students, signs, random_sign_order, merge_policy=merge_policy, instrumentation=instrumentation,
+                         sign_schedule=sign_schedule)
+        arrival_profiles = arrival_profiles or {}
+        unknown_days = [day for day in arrival_profiles if day not in self.DAYS_OF_WEEK]
+        if unknown_days:
+            raise ValueError(f"Unknown days in arrival_profiles: {unknown_days}")
+        self.arrival_profiles = {day: check_profile(arrival_profiles.get(day, DEFAULT_ARRIVAL_PROFILE))
+                                 for day in self.DAYS_OF_WEEK}
+        self.rng = np.random.default_rng(seed)
+        self.last_arrivals = np.empty(0)
+
+    def instrumented_day(self, day):
+        """Like SignProcessingSystem.instrumented_day, but rotations are counted by the clock."""
+        if self.instrumentation is None:
+            return super().instrumented_day(day)
+        return self.instrumentation.day(day, self.signs, count_rotations=False)
+
+    def iter_student_results(self, students, build_rows=True, day=None):
+        """
+        Runs one day of traffic past the signs, yielding each student's results as they drive out of view.
+
+        Args:
+            students (iterable): Students arriving that day, in arrival order.
+            build_rows (bool): Build a result row for each student. When False, None is yielded in its place.
+            day (str): Day being processed, which picks the arrival profile. Defaults to DEFAULT_ARRIVAL_PROFILE.
+
+        Yields:
+            tuple: The student's result row and a dict of seconds spent on each sign during this visit,
+                in the order the students leave.
+        """
+        return self.run_day(students, day, self.record_student, build_rows)
+
+    def iter_visits(self, students, day=None):
+        """
+        Like SignProcessingSystem.iter_visits, but in the order the students leave.
+
+        Yields:
+            tuple: The student and a dict of seconds spent on each sign during this visit.
+        """
+        record_student = self.record_student
+
+        def record_visit(student, seen, build_row=False):
+            record_student(student, seen, False)
+            return student  # Stands in for the row, so each visit is tied to its student
+        return self.run_day(students, day, record_visit, False)
+
+    def run_day(self, students, day, record_student, build_rows):
+        """
+        Draws the day's arrival times and runs the day's events.
+
+        Args:
+            students (iterable): Students arriving that day, in arrival order.
+            day (str): Day being processed, which picks the arrival profile.
+            record_student (callable): Called as record_student(student, seen, build_rows) as each student leaves.
+            build_rows (bool): Passed on to record_student.
+
+        Yields:
+            tuple: What record_student returned and the seconds spent on each sign, as students leave.
+        """
+        students = students if hasattr(students, "__len__") else list(students)
+        profile = self.arrival_profiles.get(day, DEFAULT_ARRIVAL_PROFILE)
+        self.last_arrivals = arrival_times(len(students), profile, self.rng)
+
+        if self.instrumentation is not None:
+            record_student = self.instrumentation.visit_recorder(record_student, self.signs)
+
+        if not len(self.signs):
+            for student in students:
+                yield record_student(student, {}, build_rows), {}
+            return
+
+        yield from self.run_events(students, self.last_arrivals.tolist(), record_student, build_rows)
+
+    def run_events(self, students, arrivals, record_student, build_rows):
+        """
+        Processes the day's events in time order.
+
+        Sign changes are logged as (time, sign index) in the order they happen. A student remembers
+        where the log stood when they arrived, so on leaving their exposure is read off the log
+        entries since then, with no per-student work while other events go by. The next sign to
+        come up is taken from a walk of the rotation (see slots_from), so a sign change costs
+        O(1) whichever rotation is used, with no table of the whole cycle built first.
+
+        Args:
+            students (iterable): Students in arrival order.
+            arrivals (list): Sorted arrival time of each student, in seconds.
+            record_student (callable): Called as each student leaves, possibly instrumented.
+            build_rows (bool): Build a result row for each student.
+
+        Yields:
+            tuple: As iter_student_results.
+        """
+        if not arrivals:
+            return
+        if self.signs.cycle_length() <= 0:
+            raise ValueError("Signs must have a positive total display time.")
+
+        # The rotation continues from its current phase at the first arrival
+        opening = arrivals[0]
+        opening_phase = self.signs.get_phase()
+        rotation = self.signs.slots_from(opening_phase)
+        sign, start = next(rotation)
+        log = [(opening - (opening_phase - start), sign.index)]  # When each sign came up
+
+        # Every arrival goes on the heap up front; a sequence number keeps ties in arrival order
+        events = [(time, ARRIVAL, sequence, student) for sequence, (time, student) in enumerate(zip(arrivals, students))]
+        heapq.heapify(events)
+        heapq.heappush(events, (opening + start + sign.duration - opening_phase, SIGN_CHANGE, -1, None))
+        in_view = len(events) - 1  # Students still to arrive or still watching
+
+        while in_view:
+            time, kind, sequence, payload = heapq.heappop(events)
+
+            if kind == SIGN_CHANGE:
+                sign, _ = next(rotation)
+                log.append((time, sign.index))
+                heapq.heappush(events, (time + sign.duration, SIGN_CHANGE, -1, None))
+
+            elif kind == ARRIVAL:
+                # Remember which sign was up on arrival, and leave once the view time has passed
+                heapq.heappush(events, (time + payload.time, DEPARTURE, sequence, (payload, time, len(log) - 1)))
+
+            else:
+                student, arrived, first_entry = payload
+                seen = {}  # Seconds spent on each sign during this visit
+                for entry in range(first_entry, len(log)):
+                    shown_from, index = log[entry]
+                    shown_until = log[entry + 1][0] if entry + 1 < len(log) else time
+                    seconds = min(shown_until, time) - max(shown_from, arrived)
+                    if seconds > 0:
+                        seen[index] = seen.get(index, 0) + seconds
+                in_view -= 1
+                yield record_student(student, seen, build_rows), seen
+
+        # Leave the rotation where the clock stopped when the last student drove off
+        if self.instrumentation is not None:
+            self.instrumentation.count("rotations", len(log) - 1)
+        self.signs.set_phase(opening_phase + (time - opening))
+
+
+if __name__ == "__main__":
+    import scrumdog_queue
+    import Student_Population
+
+    signs = scrumdog_queue.CircularLinkedList()
+    for i in range(1, 7):
+        signs.append(i, 5)  # Add 6 signs, each with a display time of 5 seconds
+    students = Student_Population.generate_population(20000, seed=1)
+
+    system = EventSignProcessingSystem(students, signs, seed=1)
+    system.simulate_week()
+    for sign in range(1, 7):
+        print(f"Sign {sign}: {students.sign_column(sign).mean():.2f} sec/week on average")
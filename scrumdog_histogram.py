@@ -0,0 +1,284 @@
+from abc import ABC, abstractmethod
+import numpy as np
+from Student_Class import Student
+
+
+# Number of student types: students attend one to five days a week
+STUDENT_TYPES = 5
+
+# Histogram bins used when none are given: one-second bins up to a minute, the last one open-ended
+DEFAULT_BIN_WIDTH = 1.0
+DEFAULT_NUM_BINS = 60
+
+# Exposure this close below a bin edge is counted in the bin above, so a full view that one
+# engine works out as 5.0 and another as 4.9999999 lands in the same bin
+BIN_EDGE_TOLERANCE = 1e-9
+
+
+class ExposureCollector(ABC):
+    """
+    Base for summaries of per-visit exposure that are built while the simulation runs.
+
+    Engines hand visits over either one at a time with add_visit, which buffers them, or
+    as a matrix with add_chunk. Subclasses must do the work in add_chunk, and implement merge
+    and empty_copy so work split across processes can be put back together.
+
+    Attributes:
+        sign_ids (list): Sign index of each column, in order.
+        columns (dict): Column of each sign index.
+        days (list): Days visits can belong to.
+        chunk_cells (int): Upper bound on visits x signs buffered before they are added in one batch.
+    """
+    chunk_cells = 1 << 16
+
+    def __init__(self, sign_ids, days=None):
+        self.sign_ids = list(sign_ids)
+        self.columns = {index: column for column, index in enumerate(self.sign_ids)}
+        self.days = list(days or Student.Days)
+        self.day_positions = {day: position for position, day in enumerate(self.days)}
+        self.pending = []  # Buffered (student type, seen) visits from add_visit
+        self.pending_day = None
+
+    def day_position(self, day):
+        position = self.day_positions.get(day)
+        if position is None:
+            raise ValueError(f"{type(self).__name__} is kept for {self.days}, got day {day!r}")
+        return position
+
+    def add_visit(self, day, num_days_attended, seen):
+        """
+        Adds one visit. Visits are buffered and added a batch at a time; see flush.
+
+        Args:
+            day (str): Day of the visit.
+            num_days_attended (int): The student's type, 1 to 5.
+            seen (dict): Seconds spent on each sign during the visit, keyed by sign index.
+        """
+        if day != self.pending_day:
+            self.flush()
+            self.day_position(day)
+            self.pending_day = day
+        self.pending.append((num_days_attended, seen))
+        if len(self.pending) >= max(1, self.chunk_cells // max(1, len(self.sign_ids))):
+            self.flush()
+
+    def flush(self):
+        """Adds the visits buffered by add_visit."""
+        if not self.pending:
+            return
+        exposure = np.zeros((len(self.pending), len(self.sign_ids)), dtype=np.float64)
+        types = np.empty(len(self.pending), dtype=np.int64)
+        columns = self.columns
+        for row, (num_days_attended, seen) in enumerate(self.pending):
+            types[row] = num_days_attended
+            for index, seconds in seen.items():
+                exposure[row, columns[index]] = seconds
+        self.pending = []
+        self.add_chunk(self.pending_day, types, exposure)
+
+    def full_exposure(self, exposure, columns):
+        """Spreads an exposure matrix whose columns are the given sign columns out over every sign."""
+        if columns is None:
+            return exposure
+        full = np.zeros((len(exposure), len(self.sign_ids)), dtype=np.float64)
+        full[:, columns] = exposure
+        return full
+
+    @abstractmethod
+    def add_chunk(self, day, num_days_attended, exposure, columns=None):
+        """
+        Adds a batch of visits from one day.
+
+        Args:
+            day (str): Day of the visits.
+            num_days_attended (ndarray): Type of each visiting student, 1 to 5.
+            exposure (ndarray): Seconds each visit spent on each sign, shape (visits, signs).
+            columns (ndarray): Column of each exposure column, when they are not already in
+                sign_ids order. Signs left out count as not seen.
+        """
+
+    @abstractmethod
+    def merge(self, other):
+        """Folds another collector of the same kind and shape into this one."""
+
+    @abstractmethod
+    def empty_copy(self):
+        """Returns a collector of the same kind and shape with nothing added yet."""
+
+
+class ExposureHistograms(ExposureCollector):
+    """
+    Distribution of per-visit exposure for every sign x day x student type, built while the
+    simulation runs instead of from per-student rows.
+
+    Each visit adds the seconds the student spent on every sign, zero included, to the group of
+    its day and its student type (days attended a week). A group keeps a fixed-bin histogram
+    and running moments (Welford's mean and sum of squared differences, merged a batch at a
+    time with Chan's formula), so memory depends on the number of signs, not of students.
+
+    Bin b holds exposures in [b * bin_width, (b + 1) * bin_width); the last bin also takes
+    everything above. Visits where the sign was not seen at all are counted in "zeros" too.
+
+    Attributes:
+        bin_width (float): Width of a histogram bin in seconds.
+        num_bins (int): Number of bins.
+        visits (ndarray): Visits in each (day, type) group, shape (days, types).
+        zeros (ndarray): Visits that did not see each sign, shape (days, types, signs).
+        mean (ndarray): Mean exposure, shape (days, types, signs).
+        m2 (ndarray): Sum of squared differences from the mean, shape (days, types, signs).
+        minimum (ndarray): Smallest exposure, shape (days, types, signs).
+        maximum (ndarray): Largest exposure, shape (days, types, signs).
+        bins (ndarray): Histogram counts, shape (days, types, signs, num_bins).
+    """
+    def __init__(self, sign_ids, bin_width=DEFAULT_BIN_WIDTH, num_bins=DEFAULT_NUM_BINS, days=None):
+        if bin_width <= 0:
+            raise ValueError("bin_width must be positive.")
+        if num_bins < 1:
+            raise ValueError("num_bins must be at least 1.")
+        super().__init__(sign_ids, days)
+        self.bin_width = float(bin_width)
+        self.num_bins = int(num_bins)
+
+        shape = (len(self.days), STUDENT_TYPES, len(self.sign_ids))
+        self.visits = np.zeros(shape[:2], dtype=np.int64)
+        self.zeros = np.zeros(shape, dtype=np.int64)
+        self.mean = np.zeros(shape, dtype=np.float64)
+        self.m2 = np.zeros(shape, dtype=np.float64)
+        self.minimum = np.full(shape, np.inf)
+        self.maximum = np.full(shape, -np.inf)
+        self.bins = np.zeros(shape + (self.num_bins,), dtype=np.int64)
+
+    def empty_copy(self):
+        """Returns histograms with the same signs, bins and days and nothing added yet."""
+        return ExposureHistograms(self.sign_ids, self.bin_width, self.num_bins, self.days)
+
+    def add_chunk(self, day, num_days_attended, exposure, columns=None):
+        """
+        Adds a batch of visits from one day.
+
+        Args:
+            day (str): Day of the visits.
+            num_days_attended (ndarray): Type of each visiting student, 1 to 5.
+            exposure (ndarray): Seconds each visit spent on each sign, shape (visits, signs).
+            columns (ndarray): Histogram column of each exposure column, when they are not
+                already in sign_ids order. Signs left out count as not seen.
+        """
+        self.flush()
+        position = self.day_position(day)
+        exposure = self.full_exposure(exposure, columns)
+        num_days_attended = np.asarray(num_days_attended)
+        bin_index = ((exposure + BIN_EDGE_TOLERANCE) // self.bin_width).astype(np.int64)
+        np.minimum(bin_index, self.num_bins - 1, out=bin_index)  # The last bin is open-ended
+        offsets = np.arange(len(self.sign_ids)) * self.num_bins  # Start of each sign's bins when flattened
+
+        for student_type in range(1, STUDENT_TYPES + 1):
+            members = num_days_attended == student_type
+            count = int(members.sum())
+            if not count:
+                continue
+            values = exposure[members]
+            group = (position, student_type - 1)
+
+            # Chan's formula folds the batch's mean and squared differences into the running ones
+            batch_mean = values.mean(axis=0)
+            batch_m2 = ((values - batch_mean) ** 2).sum(axis=0)
+            previous = self.visits[group]
+            total = previous + count
+            delta = batch_mean - self.mean[group]
+            self.mean[group] += delta * count / total
+            self.m2[group] += batch_m2 + delta * delta * previous * count / total
+            self.visits[group] = total
+
+            self.zeros[group] += (values == 0).sum(axis=0)
+            np.minimum(self.minimum[group], values.min(axis=0), out=self.minimum[group])
+            np.maximum(self.maximum[group], values.max(axis=0), out=self.maximum[group])
+            self.bins[group] += np.bincount((bin_index[members] + offsets).ravel(),
+                                            minlength=len(offsets) * self.num_bins).reshape(-1, self.num_bins)
+
+    def merge(self, other):
+        """
+        Folds another set of histograms into this one, as if every visit had been added here.
+
+        Args:
+            other (ExposureHistograms): Histograms with the same signs, bins and days.
+        """
+        if (other.sign_ids, other.bin_width, other.num_bins, other.days) != \
+                (self.sign_ids, self.bin_width, self.num_bins, self.days):
+            raise ValueError("Only histograms with the same signs, bins and days can be merged.")
+        self.flush()
+        other.flush()
+        previous = self.visits[:, :, None].astype(np.float64)
+        count = other.visits[:, :, None].astype(np.float64)
+        total = np.maximum(previous + count, 1)
+        delta = other.mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += other.m2 + delta * delta * previous * count / total
+        self.visits += other.visits
+        self.zeros += other.zeros
+        np.minimum(self.minimum, other.minimum, out=self.minimum)
+        np.maximum(self.maximum, other.maximum, out=self.maximum)
+        self.bins += other.bins
+
+    def bin_names(self):
+        """Column name of each bin in rows(), by its lower edge; the open-ended last bin ends in "+"."""
+        names = [f"bin_{b * self.bin_width:g}" for b in range(self.num_bins)]
+        names[-1] += "+"
+        return names
+
+    def fieldnames(self):
+        """Columns of the rows from rows(), in order."""
+        return ["day", "num_days_attended", "sign", "visits", "zeros", "mean", "variance", "min", "max"] \
+            + self.bin_names()
+
+    def rows(self):
+        """
+        Yields one row per sign, day and student type that had visits, ready for Database.excel_stream.
+
+        Yields:
+            dict: The group's day, student type and sign, its visit count, how many visits did not
+                see the sign, mean, population variance, min and max exposure, then the bin counts.
+        """
+        self.flush()
+        bin_names = self.bin_names()
+        for position, day in enumerate(self.days):
+            for type_position in range(STUDENT_TYPES):
+                visits = int(self.visits[position, type_position])
+                if not visits:
+                    continue
+                for column, sign in enumerate(self.sign_ids):
+                    group = (position, type_position, column)
+                    row = {
+                        "day": day,
+                        "num_days_attended": type_position + 1,
+                        "sign": sign,
+                        "visits": visits,
+                        "zeros": int(self.zeros[group]),
+                        "mean": round(float(self.mean[group]), 4),
+                        "variance": round(float(self.m2[group]) / visits, 4),
+                        "min": round(float(self.minimum[group]), 4),
+                        "max": round(float(self.maximum[group]), 4),
+                    }
+                    row.update(zip(bin_names, self.bins[group].tolist()))
+                    yield row
+
+    def nbytes(self):
+        """Return the memory used by the histogram arrays, in bytes."""
+        return sum(array.nbytes for array in (self.visits, self.zeros, self.mean, self.m2,
+                                              self.minimum, self.maximum, self.bins))
+
+
+if __name__ == "__main__":
+    import scrumdog_queue
+    import Student_Population
+    from Database3 import Database
+    from scrumdog_vectorized import VectorizedSignProcessingSystem
+
+    signs = scrumdog_queue.CircularLinkedList()
+    for i in range(1, 7):
+        signs.append(i, 5)  # Add 6 signs, each with a display time of 5 seconds
+    system = VectorizedSignProcessingSystem(Student_Population.generate_population(100_000, seed=1), signs)
+
+    histograms = system.histogram_week()
+    written = Database("histograms.csv").excel_stream(histograms.rows(), histograms.fieldnames())
+    print(f"{int(histograms.visits.sum()):,} visits summarised in {written} rows "
+          f"({histograms.nbytes() / 2 ** 10:.0f} KiB of histograms)")
@@ -0,0 +1,312 @@
+import cProfile
+import pstats
+import time
+from bisect import bisect_right
+from contextlib import contextmanager
+
+
+# Phases a run is split into, in the order they happen
+PHASES = ["generation", "queue_build", "sign_processing", "result_assembly", "csv_write"]
+
+# Exposure this close to a sign's full display time still counts as a full view
+FULL_VIEW_TOLERANCE = 1e-9
+
+
+def boundaries_crossed(starts, phase, elapsed):
+    """
+    Counts the sign changes the rotation goes through while it advances by elapsed seconds.
+
+    Args:
+        starts (list): Prefix table of sign durations from CircularLinkedList.cycle_starts.
+        phase (float): Offset into the cycle where the stretch begins.
+        elapsed (float): Length of the stretch in seconds.
+
+    Returns:
+        int: Number of sign boundaries in (phase, phase + elapsed].
+    """
+    cycle_length = starts[-1]
+    if cycle_length <= 0 or elapsed <= 0:
+        return 0
+    signs = len(starts) - 1
+
+    def boundaries_up_to(offset):
+        cycles, within = divmod(offset, cycle_length)
+        return int(cycles) * signs + bisect_right(starts, within) - 1
+
+    return boundaries_up_to(phase + elapsed) - boundaries_up_to(phase)
+
+
+class Instrumentation:
+    """
+    Collects per-phase timings and counters from an instrumented run.
+
+    Pass one to SignProcessingSystem and Database with their instrumentation argument and
+    wrap student generation in phase("generation"). Nothing is recorded when they are
+    left without one, so an uninstrumented run pays nothing for it.
+
+    Phases can overlap: when rows are streamed straight from the simulation into
+    Database.excel_stream, csv_write includes the sign_processing and result_assembly
+    time spent producing them.
+
+    Counters:
+        students: visits processed, one per student per day.
+        view_seconds: total time students spent watching.
+        rotations: sign changes the rotation went through.
+        partial_views: signs a student saw for only part of a display slot.
+        rows_written: rows written to the CSV or database.
+
+    Attributes:
+        phases (dict): Maps each phase to [seconds, calls].
+        counters (dict): Run totals of each counter.
+        day_counters (dict): Counters for each day, for the days processed.
+        profile_phase (str): Phase run under cProfile, or None.
+        profiler (cProfile.Profile): Profile of profile_phase, if one was asked for.
+    """
+    def __init__(self, profile_phase=None):
+        if profile_phase is not None and profile_phase not in PHASES:
+            raise ValueError(f"profile_phase must be one of {PHASES}, got {profile_phase!r}")
+        self.phases = {}
+        self.counters = {}
+        self.day_counters = {}
+        self.current_day = None
+        self.rotation_mark = None  # (prefix table, phase, view seconds) rotations are being counted from
+        self.profile_phase = profile_phase
+        self.profiler = cProfile.Profile() if profile_phase else None
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Times the code inside the with block as part of a phase.
+
+        Args:
+            name (str): One of PHASES.
+        """
+        profile = name == self.profile_phase
+        if profile:
+            self.profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+            if profile:
+                self.profiler.disable()
+
+    def timed(self, name, function):
+        """
+        Wraps a function called once per student so every call is timed as part of a phase.
+
+        Args:
+            name (str): One of PHASES.
+            function (callable): The function to time.
+
+        Returns:
+            callable: The wrapped function.
+        """
+        profiler = self.profiler if name == self.profile_phase else None
+        totals = self.phases.setdefault(name, [0.0, 0])
+
+        def wrapper(*args):
+            if profiler is not None:
+                profiler.enable()
+            start = time.perf_counter()
+            try:
+                return function(*args)
+            finally:
+                totals[0] += time.perf_counter() - start
+                totals[1] += 1
+                if profiler is not None:
+                    profiler.disable()
+        return wrapper
+
+    def add_time(self, name, seconds, calls=1):
+        totals = self.phases.setdefault(name, [0.0, 0])
+        totals[0] += seconds
+        totals[1] += calls
+
+    def count(self, name, amount=1):
+        """
+        Adds to a counter, both for the run and for the day being processed.
+
+        Args:
+            name (str): Counter name.
+            amount (int): How much to add.
+        """
+        self.counters[name] = self.counters.get(name, 0) + amount
+        if self.current_day is not None:
+            day_counters = self.day_counters.setdefault(self.current_day, {})
+            day_counters[name] = day_counters.get(name, 0) + amount
+
+    @contextmanager
+    def day(self, day, signs, count_rotations=True):
+        """
+        Attributes the counters inside the with block to a day and counts the day's rotations.
+
+        Rotations are worked out from how far the students' view time moved the rotation,
+        so every exposure engine reports them the same way. Changes made to the rotation
+        inside the block must be reported through signs_changed. Engines whose rotation
+        runs on a clock count their own and pass count_rotations=False.
+
+        Args:
+            day (str): Day being processed, or None to count towards the run only.
+            signs (CircularLinkedList): The rotation the students are watching.
+            count_rotations (bool): Work out the day's rotations from the view time.
+        """
+        previous_day, previous_mark = self.current_day, self.rotation_mark
+        self.current_day = day
+        self.rotation_mark = self.mark_rotation(signs) if count_rotations else None
+        try:
+            yield
+        finally:
+            if count_rotations:
+                self.count_rotations()
+            self.current_day, self.rotation_mark = previous_day, previous_mark
+
+    def mark_rotation(self, signs):
+        """Notes where the rotation stands, to count the rotations from there on."""
+        starts = signs.cycle_starts()
+        return starts, signs.get_phase(starts), self.counters.get("view_seconds", 0.0)
+
+    def count_rotations(self):
+        """Counts the rotations the view time since rotation_mark moved through."""
+        starts, phase, view_seconds = self.rotation_mark
+        elapsed = self.counters.get("view_seconds", 0.0) - view_seconds
+        self.count("rotations", boundaries_crossed(starts, phase, elapsed))
+
+    def signs_changed(self, signs, rotated=False):
+        """
+        Carries the day's rotation count over a change to the rotation, such as a scheduled sign change.
+
+        The rotations up to the change are counted against the table from before it, and
+        counting starts again from the changed rotation. Does nothing outside a day that counts rotations.
+
+        Args:
+            signs (CircularLinkedList): The rotation, after the change.
+            rotated (bool): The change itself moved the rotation on to another sign.
+        """
+        if self.rotation_mark is None:
+            return
+        self.count_rotations()
+        if rotated:
+            self.count("rotations")
+        self.rotation_mark = self.mark_rotation(signs)
+
+    def visit_recorder(self, record, signs):
+        """
+        Wraps SignProcessingSystem.record_student so each visit is timed and counted.
+
+        Args:
+            record (callable): The system's record_student.
+            signs (CircularLinkedList): The rotation, for each sign's display time.
+
+        Returns:
+            callable: Drop-in replacement for record.
+        """
+        durations = {sign.index: sign.duration for sign in signs.items}
+        timed_record = self.timed("result_assembly", record)
+
+        def wrapper(student, seen, build_row=True):
+            self.count("students")
+            self.count("view_seconds", student.time)
+            self.count("partial_views", sum(1 for index, seconds in seen.items()
+                                            if 0 < seconds % durations[index] < durations[index] - FULL_VIEW_TOLERANCE))
+            return timed_record(student, seen, build_row)
+        return wrapper
+
+    def count_chunk(self, view_times, exposure, durations):
+        """
+        Counts a batch of visits whose exposure was worked out as a matrix.
+
+        Args:
+            view_times (ndarray): View time of each student in the batch.
+            exposure (ndarray): Seconds each student spent on each sign, shape (students, signs).
+            durations (ndarray): Display time of each sign, in the matrix's column order.
+        """
+        self.count("students", len(view_times))
+        self.count("view_seconds", float(view_times.sum()))
+        remainder = exposure % durations
+        self.count("partial_views", int(((remainder > 0) & (remainder < durations - FULL_VIEW_TOLERANCE)).sum()))
+
+    def report(self):
+        """
+        Returns everything recorded as plain data, ready for json.dump.
+
+        Returns:
+            dict: "phases" with seconds and calls per phase, "counters" with run totals and
+                "days" with the counters of each day.
+        """
+        return {
+            "phases": {name: {"seconds": seconds, "calls": calls}
+                       for name, (seconds, calls) in sorted(self.phases.items(), key=lambda item: phase_order(item[0]))},
+            "counters": dict(self.counters),
+            "days": {day: dict(counters) for day, counters in self.day_counters.items()},
+        }
+
+    def format_report(self):
+        """Returns the report as lines of text for printing."""
+        report = self.report()
+        lines = ["Phase timings:"]
+        for name, phase in report["phases"].items():
+            lines.append(f"  {name:<16} {phase['seconds']:10.4f} s  ({phase['calls']} calls)")
+        lines.append("Counters:")
+        for name, value in report["counters"].items():
+            lines.append(f"  {name:<16} {value:,.2f}" if isinstance(value, float) else f"  {name:<16} {value:,}")
+        for day, counters in report["days"].items():
+            lines.append(f"{day}: " + ", ".join(f"{name}={value:,.0f}" for name, value in counters.items()))
+        return lines
+
+    def dump_profile(self, path):
+        """
+        Saves the profile of profile_phase in pstats format.
+
+        Args:
+            path (str): File to write, readable with pstats.Stats(path).
+        """
+        if self.profiler is None:
+            raise ValueError("No phase was profiled; pass profile_phase when creating the Instrumentation.")
+        self.profiler.dump_stats(path)
+
+    def profile_stats(self):
+        """Returns the profile of profile_phase as a pstats.Stats object."""
+        if self.profiler is None:
+            raise ValueError("No phase was profiled; pass profile_phase when creating the Instrumentation.")
+        return pstats.Stats(self.profiler)
+
+
+def phase_order(name):
+    """Sort key putting known phases in run order, then any others by name."""
+    return (PHASES.index(name), "") if name in PHASES else (len(PHASES), name)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import scrumdog_queue
+    import Student_Population
+    from Database3 import Database
+
+    parser = argparse.ArgumentParser(description="Run one instrumented week and report where the time went.")
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--signs", type=int, default=6)
+    parser.add_argument("--output", default="test.csv", help="CSV the weekly rows are written to")
+    parser.add_argument("--profile", choices=PHASES, help="phase to run under cProfile")
+    parser.add_argument("--profile-output", default="instrument.prof", help="where the pstats dump is saved")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    instrumentation = Instrumentation(args.profile)
+    with instrumentation.phase("generation"):
+        population = Student_Population.generate_population(args.students, num_signs=args.signs)
+    signs = scrumdog_queue.CircularLinkedList()
+    for i in range(1, args.signs + 1):
+        signs.append(i, 5)
+    system = scrumdog_queue.SignProcessingSystem(population, signs, instrumentation=instrumentation)
+    Database(args.output, instrumentation=instrumentation).excel_stream(system.iter_students_for_week())
+
+    if args.json:
+        print(json.dumps(instrumentation.report(), indent=2))
+    else:
+        print("\n".join(instrumentation.format_report()))
+    if args.profile:
+        instrumentation.dump_profile(args.profile_output)
+        print(f"Profile of {args.profile} saved to {args.profile_output}")
@@ -0,0 +1,155 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+import numpy as np
+import scrumdog_queue
+import Student_Population
+from Database3 import RunningStats
+from scrumdog_vectorized import VectorizedSignProcessingSystem
+
+
+# Settings for one simulated week, matching the GUI's inputs
+DEFAULT_CONFIG = {
+    "num_students": 1000,  # Number of students generated
+    "speed_mean": None,  # Mean car speed in mph, None for the default 10-20 mph range
+    "speed_std": None,  # Standard deviation of car speed in mph
+    "num_signs": 6,  # Number of signs in the rotation
+    "sign_time": 5,  # Seconds each sign is displayed
+    "random_sign_order": True,  # Shuffle the rotation order for each replicate
+}
+
+
+def build_system(config, seed):
+    """
+    Builds a SignProcessingSystem for one replicate, with every random draw taken from seed.
+
+    Args:
+        config (dict): Simulation settings, see DEFAULT_CONFIG.
+        seed (SeedSequence): Seed for this replicate's random stream.
+
+    Returns:
+        VectorizedSignProcessingSystem: The system, ready to run.
+    """
+    config = {**DEFAULT_CONFIG, **config}
+    # The children seed.spawn(2) would give, without advancing seed, so one seed always rebuilds the same system
+    population_seed, sign_seed = (np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key + (child,))
+                                  for child in range(2))
+
+    signs = scrumdog_queue.CircularLinkedList(random_sign_order=config["random_sign_order"])
+    for i in range(1, config["num_signs"] + 1):
+        signs.append(i, config["sign_time"])  # Adding signs with display times
+    signs.finalize_signs(random.Random(int(sign_seed.generate_state(1)[0])))
+
+    students = Student_Population.generate_population(
+        config["num_students"],
+        seed=population_seed,
+        speed_mean=config["speed_mean"],
+        speed_std=config["speed_std"],
+        num_signs=config["num_signs"],
+    )
+    return VectorizedSignProcessingSystem(students, signs)
+
+
+def run_replicate(config, seed):
+    """
+    Runs one simulated week and summarises it per sign.
+
+    Args:
+        config (dict): Simulation settings, see DEFAULT_CONFIG.
+        seed (SeedSequence): Seed for this replicate's random stream.
+
+    Returns:
+        dict: Maps each sign index to a dict with the mean weekly seconds per student ("mean_seconds")
+            and the fraction of students who saw the sign at all ("reach").
+    """
+    system = build_system(config, seed)
+    system.simulate_week()
+
+    summary = {}
+    for sign in system.signs.items:
+        column = system.students.sign_column(sign.index)
+        summary[sign.index] = {
+            "mean_seconds": float(column.mean()),
+            "reach": float(np.count_nonzero(column) / len(column)),
+        }
+    return summary
+
+
+def _run_replicate(job):
+    """Unpacks a (config, seed) job for the process pool."""
+    return run_replicate(*job)
+
+
+def run_monte_carlo(config, replicates, seed=None, workers=None, confidence=0.95):
+    """
+    Runs independent replicates of the same week across a process pool and merges their summaries.
+
+    Each replicate gets its own child of one SeedSequence, so results are reproducible for a
+    given seed whatever the number of workers.
+
+    Args:
+        config (dict): Simulation settings, see DEFAULT_CONFIG.
+        replicates (int): Number of independent weeks to simulate.
+        seed (int): Seed for the whole run.
+        workers (int): Number of worker processes. Defaults to the number of CPUs; 1 runs in this process.
+        confidence (float): Confidence level of the reported intervals.
+
+    Returns:
+        dict: Maps each sign index to a dict with, for "mean_seconds" and "reach", the mean over
+            replicates, its standard error and the lower and upper confidence bounds.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(replicates)
+    jobs = [(config, replicate_seed) for replicate_seed in seeds]
+
+    if workers == 1:
+        summaries = map(_run_replicate, jobs)
+        return merge_summaries(summaries, confidence)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        summaries = pool.map(_run_replicate, jobs, chunksize=max(1, replicates // (8 * (workers or 8))))
+        return merge_summaries(summaries, confidence)
+
+
+def merge_summaries(summaries, confidence=0.95):
+    """
+    Merges per-replicate summaries into means with confidence intervals.
+
+    Args:
+        summaries (iterable): Summaries returned by run_replicate.
+        confidence (float): Confidence level of the reported intervals.
+
+    Returns:
+        dict: See run_monte_carlo.
+    """
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    stats = {}
+    for summary in summaries:
+        for sign, measures in summary.items():
+            sign_stats = stats.setdefault(sign, {name: RunningStats() for name in measures})
+            for name, value in measures.items():
+                sign_stats[name].add(value)
+
+    report = {}
+    for sign, sign_stats in sorted(stats.items()):
+        report[sign] = {}
+        for name, running in sign_stats.items():
+            # Sample standard deviation across replicates, then the standard error of the mean
+            spread = (running.m2 / (running.count - 1)) ** 0.5 if running.count > 1 else 0.0
+            error = spread / running.count ** 0.5
+            report[sign][name] = {
+                "mean": running.mean,
+                "std_error": error,
+                "ci_low": running.mean - z * error,
+                "ci_high": running.mean + z * error,
+                "replicates": running.count,
+            }
+    return report
+
+
+if __name__ == "__main__":
+    results = run_monte_carlo({"num_students": 5000}, replicates=32, seed=2025)
+    for sign, measures in results.items():
+        seconds = measures["mean_seconds"]
+        print(f"Sign {sign}: {seconds['mean']:.2f} sec/week "
+              f"({seconds['ci_low']:.2f} - {seconds['ci_high']:.2f}), "
+              f"reach {measures['reach']['mean']:.1%}")
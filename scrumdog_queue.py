@@ -1,221 +1,950 @@
-import random
-from queue import Queue
-from Student_Class import OneDayStudent, TwoDayStudent, ThreeDayStudent, FourDayStudent, FiveDayStudent
-import Database3
-
-
-class CircularLinkedList:
-    """
-    A circular linked list to manage and rotate signs in the simulation.
-
-    Attributes:
-        items (list): List of Sign objects representing signs displayed to students.
-        current_index (int): Tracks the current sign being displayed in the rotation.
-        random_sign_order (bool): Determines whether the order of signs should be randomized.
-    """
-    def __init__(self, random_sign_order=False):
-        self.items = []  # List to hold the Sign objects
-        self.current_index = 0  # Index to track the current sign being displayed
-        self.random_sign_order = random_sign_order  # Flag to shuffle signs if set to True
-
-    def append(self, index, time):
-        """
-        Adds a new sign to the circular linked list.
-
-        Args:
-            index (int): Unique identifier for the sign.
-            time (float): Duration the sign remains visible before rotation.
-        """
-        self.items.append(Sign(index, time))  # Append a new Sign object to the list
-
-    def finalize_signs(self):
-        """
-        Finalizes the list of signs, shuffling their order if random_sign_order is enabled.
-        This ensures that students see signs in a different order each simulation run if set to True.
-        """
-        if self.random_sign_order:
-            random.shuffle(self.items)  # Shuffle the signs if random order is enabled
-
-    def get_current_item(self):
-        """
-        Retrieves the current sign being displayed.
-
-        Returns:
-            Sign: The current sign object or None if there are no signs.
-        """
-        if self.items:
-            return self.items[self.current_index]  # Return the current sign being displayed
-        return None
-
-    def rotate(self):
-        """
-        Rotates to the next sign in the circular linked list.
-        This allows students to see a new sign after a certain duration.
-        """
-        if self.items:
-            self.current_index = (self.current_index + 1) % len(self.items)  # Rotate to the next sign
-
-
-class Sign:
-    """
-    Represents a sign with an index and display time.
-
-    Attributes:
-        index (int): Identifier for the sign.
-        time (float): The amount of time the sign is visible before switching to the next.
-    """
-    def __init__(self, index, time):
-        self.index = index  # Set the sign's index
-        self.time = time  # Set the time for which the sign is displayed
-
-
-class SignProcessingSystem:
-    """
-    Manages student interactions with signs and tracks viewership data.
-
-    Attributes:
-        students (list): List of student objects who will view the signs.
-        signs (CircularLinkedList): Circular linked list containing Sign objects.
-        total_signs (int): Total number of signs in the system.
-    """
-    def __init__(self, students, signs, random_sign_order=False):
-        self.students = students  # List of students viewing the signs
-        self.signs = signs  # Circular linked list of signs
-        self.total_signs = len(signs.items)  # Total number of signs available
-        if random_sign_order:
-            self.signs.finalize_signs()  # Finalize and shuffle signs if random order is set
-        self.initialize_viewership_stats()  # Initialize the stats for student interactions with signs
-
-    def initialize_viewership_stats(self):
-        """
-        Initializes each student's viewership statistics for up to 20 signs.
-        Each student's stats start at zero for all signs.
-        """
-        for student in self.students:
-            student.viewership_stats = {i: 0 for i in range(1, 21)}  # Initialize viewership for each sign
-
-    def process_queue_and_signs(self, student_queue):
-        """
-        Processes students as they view signs and records their interactions.
-
-        Args:
-            student_queue (Queue): Queue of students waiting to view signs.
-
-        Returns:
-            list: A list of dictionaries containing student details and viewership data.
-        """
-        results = []  # List to store results of each student's interaction with signs
-
-        while not student_queue.empty():
-            student = student_queue.get()  # Get the student from the queue
-            student_time_remaining = student.time  # The time the student will interact with the signs
-
-            while student_time_remaining > 0:
-                current_sign = self.signs.get_current_item()  # Get the current sign being displayed
-                if not current_sign:
-                    break  # Break if no sign is available
-
-                if current_sign.time > student_time_remaining:
-                    # Student can view part of the sign before time runs out
-                    current_sign.time -= student_time_remaining  # Reduce the sign's remaining time
-                    student.viewership_stats[current_sign.index] += student_time_remaining  # Update student stats
-                    student_time_remaining = 0  # The student is done viewing
-                else:
-                    # Student can fully view the sign and move on to the next
-                    student_time_remaining -= current_sign.time  # Deduct the time spent on the current sign
-                    student.viewership_stats[current_sign.index] += current_sign.time  # Update stats
-                    self.signs.rotate()  # Move to the next sign
-
-            # Store student viewership data
-            student_data = {
-                "student_id": student.identifier,  # Student identifier
-                "speed": student.speed,  # Student's speed (how fast they view signs)
-                "view_time": student.time,  # Total time the student interacts with signs
-                "num_days_attended": len(student.attendance_days),  # Number of days the student attended
-                "days_attended": student.attendance_days,  # Days the student attended class
-            }
-
-            # Record viewing time for up to 20 signs
-            for i in range(1, 21):
-                # Round the view time to 2 decimals
-                student_data[f"sign{i}"] = round(student.viewership_stats.get(i, 0), 2)
-
-            # Check if student data already exists in results (based on student_id)
-            existing_student = next((data for data in results if data['student_id'] == student.identifier), None)
-            if existing_student:
-                # Update the existing student data with the latest data
-                existing_student.update(student_data)
-            else:
-                # If not found, add the new student data
-                results.append(student_data)
-
-        return results  # Return the processed results
-
-    def process_students_for_week(self):
-        """
-        Processes students for each day of the week and compiles the viewership results.
-
-        Returns:
-            list: Aggregated list of dictionaries containing viewership data for the week.
-        """
-        days_of_week = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]  # Days of the week
-        weekly_results = []  # List to store weekly results
-
-        for day in days_of_week:
-            daily_queue = Queue()  # Queue to hold students for the current day
-            for student in self.students:
-                if day in student.attendance_days:  # Check if the student attended on this day
-                    daily_queue.put(student)  # Add the student to the daily queue
-
-            daily_results = self.process_queue_and_signs(daily_queue)  # Process the daily queue
-            weekly_results.extend(daily_results)  # Add daily results to the weekly results
-
-        return weekly_results  # Return the aggregated results for the week
-
-    def print_results(self, results):
-        """
-        Prints the processed results in a structured format.
-
-        Args:
-            results (list): List of student viewership data dictionaries.
-        """
-        print("Raw Data Output:")
-        print(results)  # Print raw dictionary output first for diagnostics
-        print("\nFormatted Output:")
-
-        for student_data in results:
-            print("=" * 40)
-            print(f"Student ID: {student_data['student_id']}")
-            print(f"Speed: {student_data['speed']:.2f}")  # Display student speed
-            print(f"View Time: {student_data['view_time']:.2f}")  # Display student view time
-            print(f"Number of Days Attended: {student_data['num_days_attended']}")  # Display number of days attended
-            print(f"Days Attended: {', '.join(student_data['days_attended'])}")  # List of days attended
-            print("Sign Viewership:")
-            for i in range(1, 21):
-                if student_data[f"sign{i}"] > 0:
-                    print(f"  Sign {i}: {student_data[f'sign{i}']:.2f} sec")  # Display time spent on each sign
-            print("=" * 40, "\n")
-
-
-if __name__ == "__main__":
-    # Create circular linked list of signs
-    signs = CircularLinkedList(random_sign_order=True)
-    for i in range(1, 7):
-        signs.append(i, 5)  # Add 6 signs, each with a display time of 5 seconds
-    signs.finalize_signs()  # Finalize the sign list (shuffle if random order is enabled)
-
-    # Generate a list of students with randomized types and viewing times
-    student_classes = [OneDayStudent, TwoDayStudent, ThreeDayStudent, FourDayStudent, FiveDayStudent]
-    students = [
-        random.choice(student_classes)(i, time=random.uniform(0.75, 1.25))  # Create students with random attributes
-        for i in range(1, 20)
-    ]
-
-    # Initialize and process the sign system
-    sign_system = SignProcessingSystem(students, signs, random_sign_order=True)
-    results = sign_system.process_students_for_week()  # Process students and signs for the week
-    sign_system.print_results(results)  # Print the results of the simulation
-
-    test_csv_maker = Database3.Database('test.csv')
-    test_csv_maker.excel(results)
-    test_csv_maker.averages(1)
+import random
+from bisect import bisect_right
+from itertools import islice
+from contextlib import nullcontext
+from Student_Class import OneDayStudent, TwoDayStudent, ThreeDayStudent, FourDayStudent, FiveDayStudent
+import Database3
+from scrumdog_histogram import ExposureHistograms, DEFAULT_BIN_WIDTH, DEFAULT_NUM_BINS
+
+
+def add_seconds(stats, seen):
+    """
+    Adds a visit's exposure to a student's viewership stats.
+
+    Args:
+        stats (dict): The student's viewership_stats, a dict or a population row keyed by sign index.
+        seen (dict): Seconds spent on each sign during the visit, keyed by sign index.
+    """
+    add = getattr(stats, "add_seconds", None)
+    if add is not None:
+        add(seen)  # Population rows update their store in one go
+        return
+    for index, seconds in seen.items():
+        stats[index] = stats.get(index, 0) + seconds  # Sparse stats only hold signs already seen
+
+
+def signs_seen(stats):
+    """
+    Lists the signs a student has seen, for the signs_seen column of a sparse result row.
+
+    Args:
+        stats (dict): Viewership stats or running totals, a dict or a population row keyed by sign index.
+
+    Returns:
+        dict: Seconds on each sign, rounded to 2 decimals and in sign order, leaving out signs that round to zero.
+    """
+    seen_items = getattr(stats, "seen_items", None)
+    items = seen_items() if seen_items is not None else stats.items()
+    seen = {}
+    for index, seconds in sorted(items):
+        seconds = round(seconds, 2)
+        if seconds:
+            seen[index] = seconds
+    return seen
+
+
+class CircularLinkedList:
+    """
+    A circular linked list to manage and rotate signs in the simulation.
+
+    Attributes:
+        items (list): List of Sign objects representing signs displayed to students.
+        current_index (int): Tracks the current sign being displayed in the rotation.
+        random_sign_order (bool): Determines whether the order of signs should be randomized.
+    """
+    def __init__(self, random_sign_order=False):
+        self.items = []  # List to hold the Sign objects
+        self.current_index = 0  # Index to track the current sign being displayed
+        self.random_sign_order = random_sign_order  # Flag to shuffle signs if set to True
+        self.starts = None  # Cached prefix table from cycle_starts, dropped whenever the signs change
+
+    def append(self, index, time):
+        """
+        Adds a new sign to the circular linked list.
+
+        Args:
+            index (int): Unique identifier for the sign.
+            time (float): Duration the sign remains visible before rotation.
+        """
+        self.items.append(Sign(index, time))  # Append a new Sign object to the list
+        self.starts = None
+
+    def finalize_signs(self, rng=None):
+        """
+        Finalizes the list of signs, shuffling their order if random_sign_order is enabled.
+        This ensures that students see signs in a different order each simulation run if set to True.
+
+        Args:
+            rng (random.Random): Optional generator to shuffle with, for reproducible runs.
+        """
+        if self.random_sign_order:
+            (rng or random).shuffle(self.items)  # Shuffle the signs if random order is enabled
+            self.starts = None
+
+    def get_current_item(self):
+        """
+        Retrieves the current sign being displayed.
+
+        Returns:
+            Sign: The current sign object or None if there are no signs.
+        """
+        if self.items:
+            return self.items[self.current_index]  # Return the current sign being displayed
+        return None
+
+    def rotate(self):
+        """
+        Rotates to the next sign in the circular linked list.
+        This allows students to see a new sign after a certain duration.
+        The outgoing sign's clock is reset so it shows for its full duration next time around.
+        """
+        if self.items:
+            self.items[self.current_index].time = self.items[self.current_index].duration  # Reset the outgoing sign
+            self.current_index = (self.current_index + 1) % len(self.items)  # Rotate to the next sign
+
+    def __len__(self):
+        return len(self.items)
+
+    def cycle_starts(self):
+        """
+        Returns the prefix-sum table of sign durations for one full rotation. It is built once
+        and kept until the signs change, so it must not be modified.
+
+        Returns:
+            list: k + 1 offsets where entry i is the time sign i comes up and the last entry is the cycle length.
+        """
+        if self.starts is None:
+            starts = [0.0]
+            for sign in self.items:
+                starts.append(starts[-1] + sign.duration)  # Each sign starts where the previous one ends
+            self.starts = starts
+        return self.starts
+
+    def cycle_length(self):
+        """Returns the time one full rotation takes."""
+        return self.cycle_starts()[-1]
+
+    def slots_from(self, offset):
+        """
+        Walks the rotation from the sign on display at an offset, finding it with a binary search
+        of the prefix table and then stepping from sign to sign, round the cycle for as long as
+        the caller keeps asking.
+
+        Args:
+            offset (float): Offset in seconds from the start of the cycle. Wrapped into [0, cycle length).
+
+        Yields:
+            tuple: Each Sign and the offset it comes up at. Offsets keep counting up past the cycle
+                length, so they compare directly with offset + elapsed time. Nothing is yielded
+                when the rotation has no signs or no display time.
+        """
+        starts = self.cycle_starts()
+        cycle_length = starts[-1]
+        if not self.items or cycle_length <= 0:
+            return
+        position = min(bisect_right(starts, offset % cycle_length) - 1, len(self.items) - 1)
+        lap = offset - offset % cycle_length  # Start of the cycle the offset falls in
+        while True:
+            yield self.items[position], lap + starts[position]
+            position += 1
+            if position == len(self.items):
+                position = 0
+                lap += cycle_length
+
+    def get_phase(self, starts=None):
+        """
+        Returns how far into the rotation cycle the display currently is.
+
+        Args:
+            starts (list): Optional prefix table from cycle_starts. Defaults to the cached one.
+
+        Returns:
+            float: Offset in seconds from the start of the first sign in the cycle.
+        """
+        if not self.items:
+            return 0.0
+        if starts is None:
+            starts = self.cycle_starts()
+        current_sign = self.items[self.current_index]
+        return starts[self.current_index] + (current_sign.duration - current_sign.time)
+
+    def set_phase(self, phase, starts=None):
+        """
+        Moves the rotation to the given offset in the cycle, as if the signs had rotated there.
+
+        Args:
+            phase (float): Offset in seconds from the start of the cycle. Wrapped into [0, cycle length).
+            starts (list): Optional prefix table from cycle_starts. Defaults to the cached one.
+        """
+        if not self.items:
+            return
+        if starts is None:
+            starts = self.cycle_starts()
+        cycle_length = starts[-1]
+        phase = phase % cycle_length if cycle_length > 0 else 0.0
+
+        self.items[self.current_index].time = self.items[self.current_index].duration  # Reset the outgoing sign
+        # Last sign whose start is at or before the phase is the one on display
+        self.current_index = min(bisect_right(starts, phase) - 1, len(self.items) - 1)
+        self.items[self.current_index].time = starts[self.current_index + 1] - phase  # Time left on display
+
+    def get_state(self):
+        """
+        Captures the exact rotation, for checkpoints.
+
+        Returns:
+            dict: Every sign as (index, duration, time remaining) in rotation order, and the current index.
+        """
+        return {"signs": [(sign.index, sign.duration, sign.time) for sign in self.items],
+                "current_index": self.current_index}
+
+    def set_state(self, state):
+        """
+        Puts the rotation back exactly as get_state found it.
+
+        Args:
+            state (dict): Rotation state from get_state.
+        """
+        self.items = []
+        for index, duration, time in state["signs"]:
+            sign = Sign(index, duration)
+            sign.time = time  # Remaining display time, which may be part way through
+            self.items.append(sign)
+        self.starts = None
+        self.current_index = state["current_index"]
+
+
+class Sign:
+    """
+    Represents a sign with an index and display time.
+
+    Attributes:
+        index (int): Identifier for the sign.
+        time (float): The amount of time the sign is still visible before switching to the next.
+        duration (float): The full display time the sign gets each time it comes up.
+    """
+    def __init__(self, index, time):
+        self.index = index  # Set the sign's index
+        self.time = time  # Set the time for which the sign is displayed
+        self.duration = time  # Remember the full display time so rotate() can reset it
+
+
+class ResultAccumulator:
+    """
+    Collects result rows keyed by student id, so merging a row is a dictionary lookup
+    instead of a scan over everything collected so far.
+
+    Merge policies:
+        "per_day": keep one row per student per day, in the order they were added.
+        "overwrite": keep only the latest row for each student.
+        "sum": keep one row per student with view time and sign exposure summed across days.
+
+    Attributes:
+        merge_policy (str): How rows for a student who is added more than once are combined.
+        sign_ids (list): Sign indices written as sign{i} columns in summed rows, or None to
+            use the sign columns of each student's rows. Rows with a signs_seen column keep
+            that layout and get only the signs seen over the summed days.
+        rows (dict): Result rows keyed by student id, or by (student id, day) for "per_day".
+        totals (dict): Running per-student totals across every day added, whatever the policy.
+    """
+    MERGE_POLICIES = ("per_day", "overwrite", "sum")
+
+    def __init__(self, merge_policy="per_day", sign_ids=None):
+        if merge_policy not in self.MERGE_POLICIES:
+            raise ValueError(f"merge_policy must be one of {self.MERGE_POLICIES}, got {merge_policy!r}")
+        self.merge_policy = merge_policy
+        self.sign_ids = list(sign_ids) if sign_ids is not None else None
+        self.rows = {}
+        self.totals = {}
+
+    def add(self, student_data, seen, day=None):
+        """
+        Merges a student's row into the accumulator.
+
+        Args:
+            student_data (dict): Result row built by SignProcessingSystem.build_student_data.
+            seen (dict): Seconds the student spent on each sign during this visit, keyed by sign index.
+            day (str): Day the row belongs to. Used as part of the key for "per_day".
+        """
+        student_id = student_data["student_id"]
+        total = self.totals.get(student_id)
+        if total is None:
+            total = self.totals[student_id] = {"view_time": 0, "days": 0, "seen": {}}
+        total["view_time"] += student_data["view_time"]  # Time on the hill adds up across visits
+        total["days"] += 1
+        for index, seconds in seen.items():
+            total["seen"][index] = total["seen"].get(index, 0) + seconds
+        total["row"] = student_data  # Latest row carries the student's details
+
+        if self.merge_policy == "per_day":
+            self.rows[(student_id, day)] = student_data
+        elif self.merge_policy == "overwrite":
+            self.rows[student_id] = student_data
+        else:
+            self.rows[student_id] = None  # Built from the running totals when asked for
+
+    def results(self):
+        """
+        Returns the merged rows according to the merge policy.
+
+        Returns:
+            list: A list of dictionaries containing student details and viewership data.
+        """
+        if self.merge_policy == "sum":
+            return self.weekly_totals()
+        return list(self.rows.values())
+
+    def weekly_totals(self):
+        """
+        Returns one row per student with view time and sign exposure summed over every day added.
+
+        Returns:
+            list: A list of dictionaries with the usual result columns plus "days_processed".
+        """
+        totals = []
+        for total in self.totals.values():
+            student_data = dict(total["row"])
+            student_data["view_time"] = round(total["view_time"], 4)  # Total time on the hill
+            student_data["days_processed"] = total["days"]  # Number of visits that were summed
+            if "signs_seen" in student_data:
+                student_data["signs_seen"] = signs_seen(total["seen"])
+            elif self.sign_ids is not None:
+                for i in self.sign_ids:
+                    student_data[f"sign{i}"] = round(total["seen"].get(i, 0), 2)
+            else:
+                for column in student_data:
+                    if Database3.is_sign_column(column):
+                        student_data[column] = round(total["seen"].get(int(column[4:]), 0), 2)
+            totals.append(student_data)
+        return totals
+
+    def __len__(self):
+        return len(self.rows)
+
+
+class SignProcessingSystem:
+    """
+    Manages student interactions with signs and tracks viewership data.
+
+    Attributes:
+        students (list): List of student objects who will view the signs.
+        signs (CircularLinkedList): Circular linked list containing Sign objects.
+        total_signs (int): Total number of signs in the system.
+        exposure_mode (str): How exposure is computed. "walk" steps through the rotation sign by sign,
+            "timeline" looks the student's start up in the rotation's prefix sums of sign durations,
+            so a long view costs a step per sign it takes in rather than per sign change it sits through.
+        merge_policy (str): How process_students_for_week merges a student's daily rows, see ResultAccumulator.
+        accumulator (ResultAccumulator): Rows collected by the last call to process_students_for_week.
+        day_index (dict): Students attending each day, built once so the weekly loop never rescans everyone.
+        instrumentation (Instrumentation): Collects phase timings and counters, or None to record nothing.
+        sign_schedule (dict): Sign changes still to be applied, by day, in the order they happen.
+        sign_ids (list): Every sign index the run can show, in order: the rotation's signs plus any
+            scheduled to be added. Result rows have one sign{i} column for each, unless sparse_stats is set.
+        sparse_stats (bool): Whether viewership stats keep only the signs a student has seen. Result rows
+            then hold those signs alone, in a signs_seen column of {sign index: seconds}.
+    """
+    EXPOSURE_MODES = ("walk", "timeline")
+    DAYS_OF_WEEK = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+    # The rotation only moves while students watch, so it advances by exactly their view time
+    rotation_follows_viewers = True
+    # Scheduled sign change actions and the rotation method that carries each one out
+    SIGN_CHANGE_ACTIONS = {"add": "append", "remove": "remove", "set_duration": "set_duration"}
+    # Above this many signs, viewership stats only hold the signs each student has actually seen
+    dense_sign_limit = 64
+
+    def __init__(self, students, signs, random_sign_order=False, exposure_mode="walk", merge_policy="per_day",
+                 instrumentation=None, sign_schedule=None):
+        if exposure_mode not in self.EXPOSURE_MODES:
+            raise ValueError(f"exposure_mode must be one of {self.EXPOSURE_MODES}, got {exposure_mode!r}")
+        if merge_policy not in ResultAccumulator.MERGE_POLICIES:
+            raise ValueError(f"merge_policy must be one of {ResultAccumulator.MERGE_POLICIES}, got {merge_policy!r}")
+        self.students = students  # List of students viewing the signs
+        self.signs = signs  # Circular linked list of signs
+        self.total_signs = len(signs)  # Total number of signs available
+        self.exposure_mode = exposure_mode  # Strategy used to work out time spent on each sign
+        self.merge_policy = merge_policy  # How a student's rows from different days are combined
+        self.instrumentation = instrumentation  # Optional scrumdog_instrument.Instrumentation
+        if random_sign_order:
+            self.signs.finalize_signs()  # Finalize and shuffle signs if random order is set
+        self.sign_schedule = self.build_sign_schedule(sign_schedule or [])  # Campaign changes during the week
+        self.sign_ids = self.derive_sign_ids()  # Signs the results have columns for
+        self.sign_columns = [(i, f"sign{i}") for i in self.sign_ids]  # Result column name of each sign
+        self.sparse_stats = len(self.sign_ids) > self.dense_sign_limit
+        self.accumulator = ResultAccumulator(merge_policy, self.sign_ids)  # Results of the latest weekly run
+        self.initialize_viewership_stats()  # Initialize the stats for student interactions with signs
+        with self.instrumented("queue_build"):
+            self.day_index = self.build_day_index()  # Students attending each day
+
+    def derive_sign_ids(self):
+        """
+        Works out which signs the run can show: those in the rotation and those scheduled to be added.
+
+        Returns:
+            list: Sign indices in ascending order.
+        """
+        sign_ids = {sign.index for sign in self.signs.items}
+        for changes in self.sign_schedule.values():
+            sign_ids.update(change["sign"] for change in changes if change["action"] == "add")
+        return sorted(sign_ids)
+
+    def build_sign_schedule(self, changes):
+        """
+        Checks a list of scheduled sign changes and groups them by day.
+
+        Each change is a dict with:
+            "day": weekday the change happens on.
+            "at": how many of that day's students pass before the change (0 for the start of the day).
+            "action": "add", "remove" or "set_duration".
+            "sign": index of the sign.
+            "time": display time in seconds, for "add" and "set_duration".
+
+        Adding signs works with any rotation; removing signs or changing their duration needs
+        one that supports it, such as scrumdog_rotation.SignRotation.
+
+        Args:
+            changes (list): The scheduled changes.
+
+        Returns:
+            dict: Maps each day to its changes, sorted by "at", keeping the given order for ties.
+        """
+        schedule = {}
+        for change in changes:
+            action = change.get("action")
+            if action not in self.SIGN_CHANGE_ACTIONS:
+                raise ValueError(f"Sign change action must be one of {list(self.SIGN_CHANGE_ACTIONS)}, got {action!r}")
+            if not hasattr(self.signs, self.SIGN_CHANGE_ACTIONS[action]):
+                raise ValueError(f"{type(self.signs).__name__} does not support the {action!r} sign change.")
+            if change.get("day") not in self.DAYS_OF_WEEK:
+                raise ValueError(f"Unknown day in sign change: {change.get('day')!r}")
+            at = change.get("at", 0)
+            if not isinstance(at, int) or at < 0:
+                raise ValueError(f"Sign change 'at' must be a whole number of students, got {at!r}")
+            if at and not self.rotation_follows_viewers:
+                raise ValueError(f"{type(self).__name__} only applies sign changes at the start of a day (at=0).")
+            if action != "remove" and "time" not in change:
+                raise ValueError(f"Sign change {action!r} needs a display time.")
+            schedule.setdefault(change["day"], []).append(dict(change, at=at))
+        for day_changes in schedule.values():
+            day_changes.sort(key=lambda change: change["at"])
+        return schedule
+
+    def apply_sign_change(self, change):
+        """
+        Applies one scheduled change to the rotation, in place.
+
+        Args:
+            change (dict): A change as described in build_sign_schedule.
+        """
+        method = getattr(self.signs, self.SIGN_CHANGE_ACTIONS[change["action"]])
+        if change["action"] == "remove":
+            method(change["sign"])
+        else:
+            method(change["sign"], change["time"])
+        self.total_signs = len(self.signs)
+
+    def scheduled_segments(self, students, day):
+        """
+        Splits a day's students at the points where scheduled sign changes happen.
+
+        Each change is applied just before the segment it affects, and only once: the first
+        time the simulation reaches it. Without changes for the day the students come back whole.
+
+        Args:
+            students (iterable): The day's students, in the order they pass the signs.
+            day (str): Day being processed.
+
+        Yields:
+            The students between one change and the next, as a slice of the input.
+        """
+        changes = self.sign_schedule.pop(day, None)
+        if not changes:
+            yield students
+            return
+
+        if not hasattr(students, "__getitem__"):
+            students = list(students)
+        position = 0
+        for change in changes:
+            if change["at"] > position:
+                yield students[position:change["at"]]
+                position = change["at"]
+            current_sign = self.signs.get_current_item()
+            self.apply_sign_change(change)
+            if self.instrumentation is not None:
+                # Removing or shortening the sign on display rotates straight past it
+                self.instrumentation.signs_changed(self.signs, rotated=self.signs.get_current_item() is not current_sign)
+        yield students[position:]
+
+    def instrumented(self, phase):
+        """
+        Times a block of code as part of a phase when instrumentation is enabled.
+
+        Args:
+            phase (str): Name of the phase, see scrumdog_instrument.PHASES.
+
+        Returns:
+            A context manager for a with block; does nothing without instrumentation.
+        """
+        if self.instrumentation is None:
+            return nullcontext()
+        return self.instrumentation.phase(phase)
+
+    def instrumented_day(self, day):
+        """
+        Attributes the counters of a block of code to a day when instrumentation is enabled.
+
+        Args:
+            day (str): Day being processed.
+
+        Returns:
+            A context manager for a with block; does nothing without instrumentation.
+        """
+        if self.instrumentation is None:
+            return nullcontext()
+        return self.instrumentation.day(day, self.signs)
+
+    def build_day_index(self):
+        """
+        Groups the students by the days they attend, in their original order.
+
+        Array-backed populations provide their own index; otherwise each student's
+        attendance_days list is read once.
+
+        Returns:
+            dict: Maps each day of the week to the students attending that day.
+        """
+        population_index = getattr(self.students, "day_index", None)
+        if population_index is not None:
+            return population_index
+
+        day_index = {day: [] for day in self.DAYS_OF_WEEK}
+        for student in self.students:
+            for day in student.attendance_days:
+                day_index[day].append(student)
+        return day_index
+
+    def initialize_viewership_stats(self):
+        """
+        Initializes each student's viewership statistics for the run's signs.
+        Each student's stats start at zero for all signs. With more than dense_sign_limit signs
+        they start empty and only gain an entry for each sign the student sees.
+        """
+        reset_viewership = getattr(self.students, "reset_viewership", None)
+        if reset_viewership is not None:
+            reset_viewership(self.sign_ids, self.sparse_stats)  # Array-backed populations clear every student at once
+            return
+        for student in self.students:
+            # Initialize viewership for each sign, or for none yet when there are many
+            student.viewership_stats = {} if self.sparse_stats else {i: 0 for i in self.sign_ids}
+
+    def process_queue_and_signs(self, student_queue, day=None, accumulator=None):
+        """
+        Processes students as they view signs and records their interactions.
+
+        Args:
+            student_queue (Queue): Queue of students waiting to view signs.
+            day (str): Day being processed, passed on to the accumulator.
+            accumulator (ResultAccumulator): Optional accumulator that also receives every row.
+
+        Returns:
+            list: A list of dictionaries containing student details and viewership data.
+        """
+        with self.instrumented("queue_build"):
+            students = []  # Drain the queue in arrival order
+            while not student_queue.empty():
+                students.append(student_queue.get())
+        return self.process_students(students, day, accumulator)
+
+    def process_students(self, students, day=None, accumulator=None, collector=None):
+        """
+        Processes students in order as they view signs and records their interactions.
+
+        Args:
+            students (iterable): Students in the order they pass the signs.
+            day (str): Day being processed, passed on to the accumulator.
+            accumulator (ResultAccumulator): Optional accumulator that also receives every row.
+            collector (ExposureCollector): Optionally also receives every visit's exposure.
+
+        Returns:
+            list: A list of dictionaries containing student details and viewership data.
+        """
+        add = accumulator.add if accumulator is not None else None
+        if add is not None and self.instrumentation is not None:
+            add = self.instrumentation.timed("result_assembly", add)
+        add_visit = self.collector_recorder(collector) if collector is not None else None
+
+        results = {}  # Rows keyed by student id, so a repeat visit on the same day replaces the earlier row
+        with self.instrumented_day(day):
+            for segment in self.scheduled_segments(students, day):
+                for student_data, seen in self.iter_student_results(segment, day=day):
+                    results[student_data["student_id"]] = student_data
+                    if add is not None:
+                        add(student_data, seen, day)
+                    if add_visit is not None:
+                        add_visit(day, student_data["num_days_attended"], seen)
+
+        return list(results.values())  # Return the processed results
+
+    def iter_student_results(self, students, build_rows=True, day=None):
+        """
+        Runs students past the signs in order, yielding each one's results as soon as they finish.
+
+        Args:
+            students (iterable): Students in the order they pass the signs.
+            build_rows (bool): Build a result row for each student. When False, None is yielded in its place.
+            day (str): Day being processed. Not used here, but engines that model the day use it.
+
+        Yields:
+            tuple: The student's result row and a dict of seconds spent on each sign during this visit.
+        """
+        view_signs = self.view_signs_on_timeline if self.exposure_mode == "timeline" else self.walk_signs
+        record_student = self.record_student
+
+        if self.instrumentation is not None:
+            # Picked once here, so an uninstrumented run has no per-student checks
+            view_signs = self.instrumentation.timed("sign_processing", view_signs)
+            record_student = self.instrumentation.visit_recorder(record_student, self.signs)
+
+        for student in students:
+            seen = {}  # Seconds spent on each sign during this visit
+            view_signs(student, seen)
+            yield record_student(student, seen, build_rows), seen
+
+    def record_student(self, student, seen, build_row=True):
+        """
+        Adds a visit's exposure to the student's running stats and builds their result row.
+
+        Args:
+            student (Student): The student who just finished viewing the signs.
+            seen (dict): Seconds spent on each sign during this visit, keyed by sign index.
+            build_row (bool): Build and return the result row.
+
+        Returns:
+            dict: Student details and viewing time per sign, or None if build_row is False.
+        """
+        stats = student.viewership_stats  # Population rows are built on each access, so fetch it once
+        add_seconds(stats, seen)  # Update stats
+
+        if build_row:
+            return self.build_student_data(student, stats)  # Store student viewership data
+        return None
+
+    def iter_visits(self, students, day=None):
+        """
+        Runs students past the signs without building rows, yielding who saw what.
+
+        Args:
+            students (iterable): Students in the order they pass the signs.
+            day (str): Day being processed, passed on to iter_student_results.
+
+        Yields:
+            tuple: The student and a dict of seconds spent on each sign during this visit.
+        """
+        students = students if hasattr(students, "__len__") else list(students)
+        for student, (_, seen) in zip(students, self.iter_student_results(students, build_rows=False, day=day)):
+            yield student, seen
+
+    def simulate_students(self, students, day=None, collector=None):
+        """
+        Runs students past the signs, updating only their viewership stats.
+
+        Args:
+            students (iterable): Students in the order they pass the signs.
+            day (str): Day being processed, passed on to iter_student_results.
+            collector (ExposureCollector): Optionally also receives every visit's exposure,
+                such as ExposureHistograms or scrumdog_sketch.ExposureSketches.
+        """
+        if collector is None:
+            for _ in self.iter_student_results(students, build_rows=False, day=day):
+                pass
+            return
+
+        add_visit = self.collector_recorder(collector)
+        for student, seen in self.iter_visits(students, day):
+            add_visit(day, len(student.attendance_days), seen)
+        with self.instrumented("result_assembly"):
+            collector.flush()
+
+    def collector_recorder(self, collector):
+        """Returns the collector's add_visit, timed as result assembly when instrumentation is enabled."""
+        if self.instrumentation is None:
+            return collector.add_visit
+        return self.instrumentation.timed("result_assembly", collector.add_visit)
+
+    def walk_signs(self, student, seen):
+        """
+        Steps the student through the rotation one sign at a time until their view time runs out.
+
+        Args:
+            student (Student): The student viewing the signs.
+            seen (dict): Receives the seconds spent on each sign, keyed by sign index.
+        """
+        student_time_remaining = student.time  # The time the student will interact with the signs
+
+        while student_time_remaining > 0:
+            current_sign = self.signs.get_current_item()  # Get the current sign being displayed
+            if not current_sign:
+                break  # Break if no sign is available
+
+            if current_sign.time > student_time_remaining:
+                # Student can view part of the sign before time runs out
+                current_sign.time -= student_time_remaining  # Reduce the sign's remaining time
+                seen[current_sign.index] = seen.get(current_sign.index, 0) + student_time_remaining
+                student_time_remaining = 0  # The student is done viewing
+            else:
+                # Student can fully view the sign and move on to the next
+                student_time_remaining -= current_sign.time  # Deduct the time spent on the current sign
+                seen[current_sign.index] = seen.get(current_sign.index, 0) + current_sign.time
+                self.signs.rotate()  # Move to the next sign
+
+    def view_signs_on_timeline(self, student, seen):
+        """
+        Credits the student's view time to signs using the periodic rotation timeline.
+
+        The student watches the stretch [phase, phase + view time) of the repeating cycle.
+        Whole cycles are credited by multiplication and the rest by walking the rotation's own
+        prefix structure from the sign on display (see slots_from), so the cost does not grow
+        with how long the student watches, and nothing is rebuilt after a sign change. It does
+        grow with how many signs the view takes in: O(log k) to find the start plus one step per
+        sign credited, which is every sign for a view of a whole cycle or more, since each of
+        them gets its own entry in seen.
+
+        Args:
+            student (Student): The student viewing the signs.
+            seen (dict): Receives the seconds spent on each sign, keyed by sign index.
+        """
+        if not len(self.signs):
+            return
+        cycle_length = self.signs.cycle_length()
+        if cycle_length <= 0:
+            raise ValueError("Signs must have a positive total display time.")
+
+        phase = self.signs.get_phase()
+        full_cycles, leftover = divmod(student.time, cycle_length)
+        if full_cycles:
+            for sign, _ in islice(self.signs.slots_from(0.0), len(self.signs)):
+                seen[sign.index] = seen.get(sign.index, 0) + full_cycles * sign.duration  # Seen in full each loop
+
+        end = phase + leftover
+        if leftover > 0:
+            # Every sign that comes up before the end, starting with the one on display; the
+            # offsets run on past the cycle length when the view wraps round to the start
+            for sign, start in self.signs.slots_from(phase):
+                if start >= end:
+                    break
+                seen[sign.index] = seen.get(sign.index, 0) + min(start + sign.duration, end) - max(start, phase)
+
+        self.signs.set_phase(end)  # Leave the rotation where the student stopped watching
+
+    def build_student_data(self, student, stats=None):
+        """
+        Builds the result row for a student from their current viewership statistics.
+
+        Args:
+            student (Student): The student who just finished viewing the signs.
+            stats (dict): The student's viewership_stats, if already at hand.
+
+        Returns:
+            dict: Student details and viewing time per sign, as one sign{i} column per sign, or
+                with sparse_stats as a signs_seen column holding only the signs the student has seen.
+        """
+        student_data = {
+            "student_id": student.identifier,  # Student identifier
+            "speed": student.speed,  # Student's speed (how fast they view signs)
+            "view_time": student.time,  # Total time the student interacts with signs
+            "num_days_attended": len(student.attendance_days),  # Number of days the student attended
+            "days_attended": student.attendance_days,  # Days the student attended class
+        }
+
+        if stats is None:
+            stats = student.viewership_stats
+        if self.sparse_stats:
+            student_data["signs_seen"] = signs_seen(stats)  # Only the signs the student has seen
+            return student_data
+
+        # Record viewing time for every sign the run can show
+        for i, column in self.sign_columns:
+            # Round the view time to 2 decimals
+            student_data[column] = round(stats.get(i, 0), 2)
+
+        return student_data
+
+    def check_days(self, days):
+        """
+        Validates a list of days to run.
+
+        Args:
+            days (list): Days to run, in order, or None for Monday to Friday.
+
+        Returns:
+            list: The days to run.
+        """
+        if days is None:
+            return self.DAYS_OF_WEEK  # Days of the week
+        unknown_days = [day for day in days if day not in self.day_index]
+        if unknown_days:
+            raise ValueError(f"Unknown days: {unknown_days}")
+        return days
+
+    def simulate_week(self, days=None, collector=None):
+        """
+        Runs the week without building result rows, leaving the totals in each student's viewership stats.
+
+        Args:
+            days (list): Days to run, in order. Defaults to Monday to Friday.
+            collector (ExposureCollector): Optionally also receives every visit's exposure.
+        """
+        for day in self.check_days(days):
+            with self.instrumented_day(day):
+                for segment in self.scheduled_segments(self.day_index[day], day):
+                    self.simulate_students(segment, day, collector)
+
+    def simulate_weeks(self, weeks, days=None):
+        """
+        Runs a multi-week horizon, such as a semester, leaving the totals in each student's viewership stats.
+
+        Every week is simulated. The rotation moves on by the week's total view time, which is
+        seldom a whole number of cycles, so each week starts somewhere else in the rotation and
+        its exposure cannot be copied from an earlier week's.
+
+        Result rows for the horizon can be built from the stats with build_student_data.
+
+        Args:
+            weeks (int): Number of weeks in the horizon.
+            days (list): Days run each week, in order. Defaults to Monday to Friday.
+        """
+        days = self.check_days(days)
+        for _ in range(weeks):
+            self.simulate_week(days)
+
+    def histogram_week(self, days=None, bin_width=DEFAULT_BIN_WIDTH, num_bins=DEFAULT_NUM_BINS):
+        """
+        Runs the week into per sign x day x student type histograms instead of per-student rows.
+
+        No result rows are built; write the output with
+        Database(file).excel_stream(histograms.rows(), histograms.fieldnames()).
+
+        Args:
+            days (list): Days to run, in order. Defaults to Monday to Friday.
+            bin_width (float): Width of a histogram bin in seconds.
+            num_bins (int): Number of bins, the last one open-ended.
+
+        Returns:
+            ExposureHistograms: The week's exposure distributions.
+        """
+        histograms = ExposureHistograms(self.sign_ids, bin_width, num_bins, self.DAYS_OF_WEEK)
+        self.simulate_week(days, collector=histograms)
+        return histograms
+
+    def process_students_for_week(self, days=None, collector=None):
+        """
+        Processes students for each day of the week and compiles the viewership results.
+
+        Args:
+            days (list): Days to run, in order. Defaults to Monday to Friday.
+            collector (ExposureCollector): Optionally also receives every visit's exposure.
+
+        Returns:
+            list: Aggregated list of dictionaries containing viewership data for the week,
+                merged according to merge_policy.
+        """
+        days = self.check_days(days)
+        self.accumulator = ResultAccumulator(self.merge_policy, self.sign_ids)  # Collects the weekly results
+
+        for day in days:
+            # Students attending this day, straight from the index
+            self.process_students(self.day_index[day], day, self.accumulator, collector)
+        if collector is not None:
+            collector.flush()
+
+        return self.accumulator.results()  # Return the aggregated results for the week
+
+    def iter_students_for_week(self, days=None, include_day=True, collector=None):
+        """
+        Streams the week's results one row at a time instead of collecting them in memory.
+
+        Rows come out as each student finishes, one per student per day attended, the same
+        rows process_students_for_week returns with the "per_day" merge policy plus a "day"
+        column, so a SQLite store can index every visit by its day.
+
+        Args:
+            days (list): Days to run, in order. Defaults to Monday to Friday.
+            include_day (bool): Add a "day" column naming the day each row belongs to. Turn it off
+                for exactly the rows of process_students_for_week.
+            collector (ExposureCollector): Optionally also receives every visit's exposure.
+                It is complete once the last row has been taken.
+
+        Yields:
+            dict: Student details and viewership data for one student on one day.
+        """
+        add_visit = self.collector_recorder(collector) if collector is not None else None
+        for day in self.check_days(days):
+            with self.instrumented_day(day):
+                for segment in self.scheduled_segments(self.day_index[day], day):
+                    for student_data, seen in self.iter_student_results(segment, day=day):
+                        if add_visit is not None:
+                            add_visit(day, student_data["num_days_attended"], seen)
+                        if include_day:
+                            student_data["day"] = day
+                        yield student_data
+        if collector is not None:
+            collector.flush()
+
+    def weekly_totals(self):
+        """
+        Returns per-student totals from the last call to process_students_for_week.
+
+        Returns:
+            list: One dictionary per student with view time and sign exposure summed across the week.
+        """
+        return self.accumulator.weekly_totals()
+
+    def print_results(self, results):
+        """
+        Prints the processed results in a structured format.
+
+        Args:
+            results (list): List of student viewership data dictionaries.
+        """
+        print("Raw Data Output:")
+        print(results)  # Print raw dictionary output first for diagnostics
+        print("\nFormatted Output:")
+
+        for student_data in results:
+            print("=" * 40)
+            print(f"Student ID: {student_data['student_id']}")
+            print(f"Speed: {student_data['speed']:.2f}")  # Display student speed
+            print(f"View Time: {student_data['view_time']:.2f}")  # Display student view time
+            print(f"Number of Days Attended: {student_data['num_days_attended']}")  # Display number of days attended
+            print(f"Days Attended: {', '.join(student_data['days_attended'])}")  # List of days attended
+            print("Sign Viewership:")
+            for column, seconds in student_data.items():
+                if Database3.is_sign_column(column) and seconds > 0:
+                    print(f"  Sign {column[4:]}: {seconds:.2f} sec")  # Display time spent on each sign
+            for index, seconds in student_data.get("signs_seen", {}).items():
+                print(f"  Sign {index}: {seconds:.2f} sec")  # Sparse rows only hold the signs seen
+            print("=" * 40, "\n")
+
+
+if __name__ == "__main__":
+    # Create circular linked list of signs
+    signs = CircularLinkedList(random_sign_order=True)
+    for i in range(1, 7):
+        signs.append(i, 5)  # Add 6 signs, each with a display time of 5 seconds
+    signs.finalize_signs()  # Finalize the sign list (shuffle if random order is enabled)
+
+    # Generate a list of students with randomized types and viewing times
+    student_classes = [OneDayStudent, TwoDayStudent, ThreeDayStudent, FourDayStudent, FiveDayStudent]
+    students = [
+        random.choice(student_classes)(i, time=random.uniform(0.75, 1.25))  # Create students with random attributes
+        for i in range(1, 20)
+    ]
+
+    # Initialize and process the sign system
+    sign_system = SignProcessingSystem(students, signs, random_sign_order=True)
+    results = sign_system.process_students_for_week()  # Process students and signs for the week
+    sign_system.print_results(results)  # Print the results of the simulation
+
+    test_csv_maker = Database3.Database('test.csv')
+    test_csv_maker.excel(results)
+    test_csv_maker.averages(1)
@@ -0,0 +1,352 @@
+import random
+from scrumdog_queue import Sign
+
+
+class SignRotation:
+    """
+    Sign rotation that can change while a simulation runs.
+
+    A drop-in replacement for CircularLinkedList that also supports removing signs and
+    changing their display time. Signs sit in slots, in rotation order, and a Fenwick tree
+    over the slot durations gives the time each slot comes up in the cycle. Insert, remove,
+    duration updates and "which sign is up at offset t" are all O(log k).
+
+    New signs join the end of the rotation. Removed signs leave an empty slot of zero length
+    behind, and the slots are compacted once more than half of them are empty.
+
+    Attributes:
+        random_sign_order (bool): Shuffle the signs in finalize_signs.
+        slots (list): Sign in each slot, or None for a removed sign.
+        tree (list): Fenwick tree of slot durations, 1-based.
+        current (int): Slot of the sign on display, or None when there are no signs.
+    """
+    def __init__(self, random_sign_order=False):
+        self.random_sign_order = random_sign_order
+        self.slots = []
+        self.tree = [0.0]
+        self.slot_of = {}  # Slot of each live sign, by sign index
+        self.current = None
+        self.live_items = None  # Cached list of live signs, rebuilt after a change
+
+    # Fenwick tree over slot durations
+
+    def tree_add(self, slot, delta):
+        """Adds delta to the duration of a slot."""
+        position = slot + 1
+        while position < len(self.tree):
+            self.tree[position] += delta
+            position += position & -position
+
+    def prefix(self, slot):
+        """Returns the total duration of the slots before the given one, i.e. when it comes up."""
+        total = 0.0
+        position = slot
+        while position > 0:
+            total += self.tree[position]
+            position -= position & -position
+        return total
+
+    def find_slot(self, offset):
+        """
+        Returns the first slot whose end is past the offset: the slot on display at that offset.
+
+        Args:
+            offset (float): Offset into the cycle, at least 0 and below the cycle length.
+
+        Returns:
+            int: The slot, or len(slots) if the offset is at or past the end of the cycle.
+        """
+        position = 0
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            following = position + step
+            if following < len(self.tree) and self.tree[following] <= offset:
+                position = following
+                offset -= self.tree[following]
+            step >>= 1
+        return position
+
+    def rebuild(self, signs):
+        """Lays the given signs out in fresh slots, in order, building the tree in O(k)."""
+        current_sign = self.slots[self.current] if self.current is not None else None
+        self.slots = list(signs)
+        self.slot_of = {sign.index: slot for slot, sign in enumerate(self.slots)}
+        self.tree = [0.0] + [sign.duration for sign in self.slots]
+        for position in range(1, len(self.tree)):
+            parent = position + (position & -position)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[position]
+        if current_sign is not None and current_sign.index in self.slot_of:
+            self.current = self.slot_of[current_sign.index]
+        else:
+            self.current = 0 if self.slots else None
+        self.live_items = None
+
+    # Changing the rotation
+
+    def append(self, index, time):
+        """
+        Adds a sign at the end of the rotation.
+
+        Args:
+            index (int): Unique identifier for the sign.
+            time (float): Duration the sign remains visible before rotation.
+        """
+        if index in self.slot_of:
+            raise ValueError(f"Sign {index} is already in the rotation.")
+        if time < 0:
+            raise ValueError("A sign's display time must not be negative.")
+        slot = len(self.slots)
+        self.slots.append(Sign(index, time))
+        # The new tree node covers slots (position - lowbit, position], of which only this one is new
+        position = slot + 1
+        self.tree.append(time + self.prefix(slot) - self.prefix(position - (position & -position)))
+        self.slot_of[index] = slot
+        if self.current is None:
+            self.current = slot
+        self.live_items = None
+
+    def remove(self, index):
+        """
+        Retires a sign from the rotation. If it is on display, the next sign comes up at once.
+
+        Args:
+            index (int): Identifier of the sign.
+        """
+        slot = self.slot_of.pop(index, None)
+        if slot is None:
+            raise KeyError(f"Sign {index} is not in the rotation.")
+        sign = self.slots[slot]
+        if slot == self.current:
+            self.rotate()
+        self.tree_add(slot, -sign.duration)
+        self.slots[slot] = None
+        self.live_items = None
+        if not self.slot_of:
+            self.current = None
+        elif self.current == slot:
+            self.current = self.next_slot(slot)  # Every other sign has zero length
+            self.slots[self.current].time = self.slots[self.current].duration
+
+        if len(self.slots) > 2 * len(self.slot_of) + 8:
+            self.rebuild(self.items)
+
+    def set_duration(self, index, time):
+        """
+        Changes how long a sign is displayed each time it comes up.
+
+        If the sign is on display, it keeps the time it has already been up, and the rotation
+        moves on at once if that is now longer than the new duration.
+
+        Args:
+            index (int): Identifier of the sign.
+            time (float): New display time in seconds.
+        """
+        slot = self.slot_of.get(index)
+        if slot is None:
+            raise KeyError(f"Sign {index} is not in the rotation.")
+        if time < 0:
+            raise ValueError("A sign's display time must not be negative.")
+        sign = self.slots[slot]
+        self.tree_add(slot, time - sign.duration)
+        shown = sign.duration - sign.time
+        sign.duration = time
+        sign.time = time
+        if slot == self.current:
+            sign.time = time - shown
+            if sign.time <= 0:
+                self.rotate()
+
+    def finalize_signs(self, rng=None):
+        """
+        Shuffles the rotation order if random_sign_order is enabled, as CircularLinkedList does.
+
+        Args:
+            rng (random.Random): Optional generator to shuffle with, for reproducible runs.
+        """
+        if self.random_sign_order:
+            signs = self.items
+            (rng or random).shuffle(signs)
+            self.current = None
+            self.rebuild(signs)
+
+    def get_state(self):
+        """
+        Captures the exact rotation, for checkpoints: the slots, with removed signs left empty,
+        and the tree as it stands, so sums come out the same to the last bit after set_state.
+
+        Returns:
+            dict: Each slot as (index, duration, time remaining) or None, the tree and the current slot.
+        """
+        return {"slots": [(sign.index, sign.duration, sign.time) if sign is not None else None for sign in self.slots],
+                "tree": list(self.tree), "current": self.current}
+
+    def set_state(self, state):
+        """
+        Puts the rotation back exactly as get_state found it.
+
+        Args:
+            state (dict): Rotation state from get_state.
+        """
+        self.slots = []
+        for slot in state["slots"]:
+            sign = None
+            if slot is not None:
+                index, duration, time = slot
+                sign = Sign(index, duration)
+                sign.time = time
+            self.slots.append(sign)
+        self.tree = list(state["tree"])
+        self.slot_of = {sign.index: slot for slot, sign in enumerate(self.slots) if sign is not None}
+        self.current = state["current"]
+        self.live_items = None
+
+    # Reading the rotation
+
+    @property
+    def items(self):
+        """Live signs in rotation order."""
+        if self.live_items is None:
+            self.live_items = [sign for sign in self.slots if sign is not None]
+        return self.live_items
+
+    def __len__(self):
+        return len(self.slot_of)
+
+    def cycle_length(self):
+        """Returns the time one full rotation takes."""
+        return self.prefix(len(self.slots))
+
+    def sign_at(self, offset):
+        """
+        Looks up the sign on display at an offset into the cycle, in O(log k).
+
+        Args:
+            offset (float): Offset in seconds from the start of the cycle, wrapped into one cycle.
+
+        Returns:
+            tuple: The Sign and the offset its slot starts at, or (None, 0.0) without signs.
+        """
+        cycle_length = self.cycle_length()
+        if not self.slot_of or cycle_length <= 0:
+            return None, 0.0
+        slot = min(self.find_slot(offset % cycle_length), len(self.slots) - 1)
+        while self.slots[slot] is None:
+            slot -= 1  # Only reachable through rounding at the very end of the cycle
+        return self.slots[slot], self.prefix(slot)
+
+    def slots_from(self, offset):
+        """
+        Walks the rotation from the sign on display at an offset, as CircularLinkedList.slots_from.
+        The first sign is found in the tree in O(log k); each one after it is the next live slot,
+        so the walk never builds the k + 1 table that cycle_starts does.
+
+        Args:
+            offset (float): Offset in seconds from the start of the cycle. Wrapped into [0, cycle length).
+
+        Yields:
+            tuple: Each Sign and the offset it comes up at, counting up past the cycle length.
+        """
+        cycle_length = self.cycle_length()
+        if not self.slot_of or cycle_length <= 0:
+            return
+        lap = offset - offset % cycle_length  # Start of the cycle the offset falls in
+        sign, start = self.sign_at(offset)
+        slot = self.slot_of[sign.index]
+        start += lap
+        while True:
+            yield sign, start
+            start += sign.duration
+            slot += 1
+            while slot < len(self.slots) and self.slots[slot] is None:
+                slot += 1  # Skip removed signs
+            if slot == len(self.slots):
+                lap += cycle_length
+                slot, start = 0, lap
+                while self.slots[slot] is None:
+                    slot += 1
+            sign = self.slots[slot]
+
+    def cycle_starts(self):
+        """
+        Builds the prefix-sum table of the live signs' durations, as CircularLinkedList.cycle_starts.
+        This is O(k) every call; engines that can walk the rotation use slots_from instead.
+
+        Returns:
+            list: k + 1 offsets where entry i is the time sign i comes up and the last entry is the cycle length.
+        """
+        starts = [0.0]
+        for sign in self.items:
+            starts.append(starts[-1] + sign.duration)
+        return starts
+
+    def get_current_item(self):
+        """
+        Retrieves the current sign being displayed.
+
+        Returns:
+            Sign: The current sign object or None if there are no signs.
+        """
+        if self.current is None:
+            return None
+        return self.slots[self.current]
+
+    def next_slot(self, slot):
+        """Returns the next live slot after the given one, wrapping round, in O(log k)."""
+        end = self.prefix(slot + 1)
+        if end < self.cycle_length():
+            following = self.find_slot(end)
+        else:
+            following = self.find_slot(0.0)
+        if following >= len(self.slots) or self.slots[following] is None:
+            # No time left in the cycle past this slot; step to the next live slot directly
+            following = (slot + 1) % len(self.slots)
+            while self.slots[following] is None:
+                following = (following + 1) % len(self.slots)
+        return following
+
+    def rotate(self):
+        """
+        Rotates to the next sign, resetting the outgoing sign's clock, as CircularLinkedList.rotate.
+        Signs with no display time are passed over.
+        """
+        if self.current is None:
+            return
+        outgoing = self.slots[self.current]
+        outgoing.time = outgoing.duration
+        self.current = self.next_slot(self.current)
+
+    def get_phase(self, starts=None):
+        """
+        Returns how far into the rotation cycle the display currently is.
+
+        Args:
+            starts (list): Ignored; accepted so engines written for CircularLinkedList can pass one.
+
+        Returns:
+            float: Offset in seconds from the start of the first sign in the cycle.
+        """
+        if self.current is None:
+            return 0.0
+        sign = self.slots[self.current]
+        return self.prefix(self.current) + (sign.duration - sign.time)
+
+    def set_phase(self, phase, starts=None):
+        """
+        Moves the rotation to the given offset in the cycle, as if the signs had rotated there.
+
+        Args:
+            phase (float): Offset in seconds from the start of the cycle. Wrapped into [0, cycle length).
+            starts (list): Ignored; accepted so engines written for CircularLinkedList can pass one.
+        """
+        if self.current is None:
+            return
+        sign, start = self.sign_at(phase)
+        if sign is None:
+            return
+        cycle_length = self.cycle_length()
+        phase = phase % cycle_length
+        outgoing = self.slots[self.current]
+        outgoing.time = outgoing.duration  # Reset the outgoing sign
+        self.current = self.slot_of[sign.index]
+        sign.time = start + sign.duration - phase  # Time left on display
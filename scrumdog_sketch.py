@@ -0,0 +1,272 @@
+import json
+import numpy as np
+from scrumdog_histogram import ExposureCollector
+
+
+# Sketch size used when none is given. Rank error shrinks roughly as 1/k; memory grows as k.
+DEFAULT_SKETCH_K = 200
+
+# Quantiles reported when none are asked for
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+# Share of a level's capacity the level below it gets, as in the KLL paper
+CAPACITY_DECAY = 2 / 3
+
+
+class KLLSketch:
+    """
+    KLL quantile sketches for several streams that always receive values together.
+
+    Values are kept in levels. An item on level h stands for 2 ** h of the values added.
+    When a level holds more than its capacity it is sorted and every other item, starting
+    at a random one of the first two, moves up a level. Lower levels get geometrically
+    smaller capacities, so a sketch holds about 3k items however many values it has seen.
+
+    Every stream gets a value on every update, so all streams have the same number of items
+    on each level and the levels are stored as (streams, items) arrays, compacted together.
+
+    Attributes:
+        streams (int): Number of streams, such as one per sign.
+        k (int): Capacity of the top level; sets the accuracy.
+        count (int): Values added to each stream.
+        levels (list): Items on each level, as arrays of shape (streams, items).
+        rng (numpy.random.Generator): Picks which half of a level moves up.
+    """
+    def __init__(self, streams, k=DEFAULT_SKETCH_K, seed=None):
+        if k < 2:
+            raise ValueError("k must be at least 2.")
+        self.streams = int(streams)
+        self.k = int(k)
+        self.count = 0
+        self.levels = [np.empty((self.streams, 0), dtype=np.float64)]
+        self.rng = np.random.default_rng(seed)
+
+    def capacity(self, level):
+        """Number of items a level may hold before it is compacted."""
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * CAPACITY_DECAY ** depth)))
+
+    def update(self, values):
+        """
+        Adds one value per stream for each row of values.
+
+        Args:
+            values (ndarray): Shape (rows, streams).
+        """
+        if not len(values):
+            return
+        self.levels[0] = np.concatenate((self.levels[0], np.asarray(values, dtype=np.float64).T), axis=1)
+        self.count += len(values)
+        self.compress()
+
+    def compress(self):
+        """Compacts the lowest level over capacity until every level fits."""
+        while True:
+            full = [level for level in range(len(self.levels)) if self.levels[level].shape[1] > self.capacity(level)]
+            if not full:
+                return
+            self.compact(full[0])
+
+    def compact(self, level):
+        """Moves every other item of a level up to the next one, keeping the odd one out if there is one."""
+        items = np.sort(self.levels[level], axis=1)
+        even = items.shape[1] - items.shape[1] % 2
+        promoted = items[:, int(self.rng.integers(2)):even:2]
+        self.levels[level] = items[:, even:]
+        if level + 1 == len(self.levels):
+            self.levels.append(np.empty((self.streams, 0), dtype=np.float64))
+        self.levels[level + 1] = np.concatenate((self.levels[level + 1], promoted), axis=1)
+
+    def merge(self, other):
+        """
+        Folds another sketch into this one, as if its values had been added here.
+
+        Args:
+            other (KLLSketch): Sketch with the same number of streams and k.
+        """
+        if (other.streams, other.k) != (self.streams, self.k):
+            raise ValueError("Only sketches with the same streams and k can be merged.")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty((self.streams, 0), dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate((self.levels[level], items), axis=1)
+        self.count += other.count
+        self.compress()
+
+    def quantiles(self, qs):
+        """
+        Estimates quantiles of every stream.
+
+        Args:
+            qs (list): Quantiles between 0 and 1.
+
+        Returns:
+            ndarray: Shape (len(qs), streams); NaN if nothing was added.
+        """
+        if not self.count:
+            return np.full((len(qs), self.streams), np.nan)
+        items = np.concatenate(self.levels, axis=1)
+        weights = np.concatenate([np.full(level.shape[1], 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, axis=1)
+        items = np.take_along_axis(items, order, axis=1)
+        ranks = np.cumsum(weights[order], axis=1)  # Weighted rank of each item, per stream
+        total = ranks[:, -1]
+        result = np.empty((len(qs), self.streams))
+        for row, q in enumerate(qs):
+            if not 0 <= q <= 1:
+                raise ValueError(f"Quantiles must be between 0 and 1, got {q}")
+            first = (ranks >= q * total[:, None]).argmax(axis=1)  # First item reaching the rank
+            result[row] = items[np.arange(self.streams), first]
+        return result
+
+    def nbytes(self):
+        return sum(level.nbytes for level in self.levels)
+
+
+class ExposureSketches(ExposureCollector):
+    """
+    Streaming quantiles of per-visit exposure for every sign, over the run and optionally per day.
+
+    Memory is fixed by k and the number of signs, not by how many visits go in, and sketches
+    from different processes merge, so sharded and batch runs give one combined answer.
+
+    Attributes:
+        k (int): Sketch size; larger is more accurate.
+        per_day (bool): Also keep a sketch for each day.
+        sketches (dict): KLLSketch over every sign, keyed by day, with None for the whole run.
+    """
+    def __init__(self, sign_ids, k=DEFAULT_SKETCH_K, per_day=False, days=None, seed=None):
+        super().__init__(sign_ids, days)
+        self.k = int(k)
+        self.per_day = per_day
+        self.rng = np.random.default_rng(seed)
+        keys = [None] + (self.days if per_day else [])
+        self.sketches = {key: KLLSketch(len(self.sign_ids), self.k, self.rng.integers(2 ** 63)) for key in keys}
+
+    def empty_copy(self):
+        """Returns sketches with the same signs, k and days and nothing added yet."""
+        return ExposureSketches(self.sign_ids, self.k, self.per_day, self.days, self.rng.integers(2 ** 63))
+
+    def add_chunk(self, day, num_days_attended, exposure, columns=None):
+        """
+        Adds a batch of visits from one day, see ExposureCollector.add_chunk.
+
+        The student types are not used; the sketches are kept per sign and day only.
+        """
+        self.flush()
+        self.day_position(day)
+        exposure = self.full_exposure(exposure, columns)
+        self.sketches[None].update(exposure)
+        if self.per_day:
+            self.sketches[day].update(exposure)
+
+    def merge(self, other):
+        """
+        Folds another set of sketches into this one.
+
+        Args:
+            other (ExposureSketches): Sketches with the same signs, k, days and per_day setting.
+        """
+        if (other.sign_ids, other.k, other.per_day, other.days) != (self.sign_ids, self.k, self.per_day, self.days):
+            raise ValueError("Only sketches with the same signs, k, days and per_day setting can be merged.")
+        self.flush()
+        other.flush()
+        for key, sketch in self.sketches.items():
+            sketch.merge(other.sketches[key])
+
+    def quantiles(self, qs=DEFAULT_QUANTILES, day=None):
+        """
+        Estimates exposure quantiles of every sign.
+
+        Args:
+            qs (list): Quantiles between 0 and 1.
+            day (str): Day to report, or None for the whole run. Needs per_day.
+
+        Returns:
+            dict: Maps each sign index to {quantile: seconds}.
+        """
+        self.flush()
+        if day not in self.sketches:
+            raise ValueError(f"No sketch for day {day!r}; per_day sketches are {'on' if self.per_day else 'off'}.")
+        values = self.sketches[day].quantiles(qs)
+        return {sign: {q: float(values[row, column]) for row, q in enumerate(qs)}
+                for column, sign in enumerate(self.sign_ids)}
+
+    def rows(self, qs=DEFAULT_QUANTILES):
+        """
+        Yields one row per sign, for the whole run and then for each day if kept, ready for Database.excel_stream.
+
+        Yields:
+            dict: "day" ("all" for the whole run), "sign", "visits" and one "p{q}" column per quantile.
+        """
+        names = [f"p{q * 100:g}" for q in qs]
+        for key in self.sketches:
+            sketch = self.sketches[key]
+            for sign, values in self.quantiles(qs, key).items():
+                row = {"day": key or "all", "sign": sign, "visits": sketch.count}
+                row.update((name, round(values[q], 4)) for name, q in zip(names, qs))
+                yield row
+
+    def nbytes(self):
+        return sum(sketch.nbytes() for sketch in self.sketches.values())
+
+    def save(self, path):
+        """
+        Writes the sketches to a compressed .npz file, so they can be merged or queried later.
+
+        Args:
+            path (str): File to write.
+        """
+        self.flush()
+        arrays = {}
+        for position, (key, sketch) in enumerate(self.sketches.items()):
+            for level, items in enumerate(sketch.levels):
+                arrays[f"sketch{position}_level{level}"] = items
+        meta = {
+            "sign_ids": self.sign_ids,
+            "k": self.k,
+            "per_day": self.per_day,
+            "days": self.days,
+            "sketches": [{"day": key, "count": sketch.count, "levels": len(sketch.levels)}
+                         for key, sketch in self.sketches.items()],
+        }
+        with open(path, mode="wb") as file:
+            np.savez_compressed(file, meta=np.array(json.dumps(meta)), **arrays)
+
+    @classmethod
+    def load(cls, path, seed=None):
+        """
+        Reads sketches written by save.
+
+        Args:
+            path (str): File to read.
+            seed (int): Seed for compactions after loading, such as when more sketches are merged in.
+
+        Returns:
+            ExposureSketches: The saved sketches.
+        """
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            sketches = cls(meta["sign_ids"], meta["k"], meta["per_day"], meta["days"], seed)
+            for position, saved in enumerate(meta["sketches"]):
+                sketch = sketches.sketches[saved["day"]]
+                sketch.count = saved["count"]
+                sketch.levels = [data[f"sketch{position}_level{level}"] for level in range(saved["levels"])]
+        return sketches
+
+
+if __name__ == "__main__":
+    import scrumdog_queue
+    import Student_Population
+    from scrumdog_vectorized import VectorizedSignProcessingSystem
+
+    signs = scrumdog_queue.CircularLinkedList()
+    for i in range(1, 7):
+        signs.append(i, 5)  # Add 6 signs, each with a display time of 5 seconds
+    system = VectorizedSignProcessingSystem(Student_Population.generate_population(100_000, seed=1), signs)
+
+    sketches = ExposureSketches(system.sign_ids, per_day=True, seed=1)
+    system.simulate_week(collector=sketches)
+    for sign, values in sketches.quantiles().items():
+        print(f"Sign {sign}: " + ", ".join(f"p{q * 100:g} {seconds:.2f} s" for q, seconds in values.items()))
+    print(f"{sketches.nbytes() / 2 ** 10:.0f} KiB of sketches")
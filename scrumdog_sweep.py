@@ -0,0 +1,155 @@
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scrumdog_montecarlo import DEFAULT_CONFIG, merge_summaries, _run_replicate
+
+
+# Bump when the simulation changes in a way that makes cached results stale
+CACHE_VERSION = 1
+
+# Directory cached sweep cells are kept in, next to this file
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".sweep_cache")
+
+
+def expand_grid(ranges, base_config=None):
+    """
+    Expands parameter ranges into one simulation config per combination.
+
+    Args:
+        ranges (dict): Maps a DEFAULT_CONFIG key to the list of values to try,
+            e.g. {"sign_time": range(2, 16), "num_signs": range(3, 21)}.
+        base_config (dict): Settings shared by every combination.
+
+    Returns:
+        list: One config dict per combination, in itertools.product order.
+    """
+    unknown = [name for name in ranges if name not in DEFAULT_CONFIG]
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {unknown}")
+    base = {**DEFAULT_CONFIG, **(base_config or {})}
+    names = list(ranges)
+    return [{**base, **dict(zip(names, values))} for values in itertools.product(*(list(ranges[name]) for name in names))]
+
+
+def plain_value(value):
+    """Turns a NumPy scalar, as grids built with np.arange or np.linspace hold, into the Python number json can write."""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot hash a sweep setting of type {type(value).__name__}")
+
+
+def cache_key(config, seed, replicates):
+    """
+    Hashes everything that determines a cell's result. NumPy scalars hash the same as the
+    Python numbers they hold, so np.arange(2, 16) and range(2, 16) share cached cells.
+
+    Args:
+        config (dict): The cell's simulation settings.
+        seed (int): Seed of the sweep.
+        replicates (int): Replicates per cell.
+
+    Returns:
+        str: Hex digest identifying the cell.
+    """
+    payload = json.dumps({"version": CACHE_VERSION, "config": config, "seed": seed, "replicates": replicates},
+                         sort_keys=True, default=plain_value)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SweepCache:
+    """
+    Keeps finished sweep cells as one small JSON file each, named by cache_key.
+
+    Attributes:
+        directory (str): Where the cell files are stored.
+    """
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """
+        Loads a cached cell result.
+
+        Args:
+            key (str): The cell's cache key.
+
+        Returns:
+            dict: The cached report, or None if the cell has not been run.
+        """
+        try:
+            with open(self.path(key), mode="r", encoding="utf-8") as file:
+                report = json.load(file)
+        except FileNotFoundError:
+            return None
+        return {int(sign): measures for sign, measures in report.items()}  # JSON keys come back as text
+
+    def put(self, key, report):
+        """
+        Stores a cell result. Written to a temporary file first so readers never see half a file.
+
+        Args:
+            key (str): The cell's cache key.
+            report (dict): The cell's report from merge_summaries.
+        """
+        temporary = f"{self.path(key)}.{os.getpid()}.tmp"
+        with open(temporary, mode="w", encoding="utf-8") as file:
+            json.dump(report, file)
+        os.replace(temporary, self.path(key))
+
+
+def run_sweep(ranges, base_config=None, seed=0, replicates=1, workers=None, cache=None):
+    """
+    Runs every combination of the parameter ranges, computing only cells missing from the cache.
+
+    Every cell uses the same replicate seeds, so differences between cells come from the
+    parameters rather than from different random draws.
+
+    Args:
+        ranges (dict): Parameter ranges, see expand_grid.
+        base_config (dict): Settings shared by every combination.
+        seed (int): Seed of the sweep.
+        replicates (int): Independent weeks simulated per cell.
+        workers (int): Number of worker processes. Defaults to the number of CPUs; 1 runs in this process.
+        cache (SweepCache): Where results are looked up and stored. Defaults to DEFAULT_CACHE_DIR.
+
+    Returns:
+        list: One dict per cell with "config", "cached" (bool) and "result" (per-sign report).
+    """
+    if cache is None:
+        cache = SweepCache()
+    configs = expand_grid(ranges, base_config)
+    keys = [cache_key(config, seed, replicates) for config in configs]
+    cells = [{"config": config, "cached": True, "result": cache.get(key)} for config, key in zip(configs, keys)]
+
+    # Each missing cell contributes one job per replicate, so the pool stays busy across cells
+    missing = [index for index, cell in enumerate(cells) if cell["result"] is None]
+    seeds = np.random.SeedSequence(seed).spawn(replicates)
+    jobs = [(cells[index]["config"], replicate_seed) for index in missing for replicate_seed in seeds]
+
+    if jobs:
+        if workers == 1:
+            summaries = list(map(_run_replicate, jobs))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                summaries = list(pool.map(_run_replicate, jobs, chunksize=max(1, len(jobs) // (8 * (workers or 8)))))
+
+        for position, index in enumerate(missing):
+            report = merge_summaries(summaries[position * replicates:(position + 1) * replicates])
+            cache.put(keys[index], report)
+            cells[index]["result"] = report
+            cells[index]["cached"] = False
+
+    return cells
+
+
+if __name__ == "__main__":
+    sweep = run_sweep({"sign_time": range(2, 16), "num_signs": range(3, 21)}, {"num_students": 2000}, replicates=4)
+    computed = sum(not cell["cached"] for cell in sweep)
+    print(f"{len(sweep)} cells, {computed} computed, {len(sweep) - computed} from cache")
@@ -0,0 +1,267 @@
+from itertools import islice
+import numpy as np
+from scrumdog_queue import SignProcessingSystem
+from Student_Population import MASK_DAYS, MASK_DAY_COUNTS
+
+
+# How close to halfway between two hundredths a value must be for round_hundredths to leave it to round()
+HALFWAY_TOLERANCE = 1e-6
+
+
+def round_hundredths(values):
+    """
+    Rounds an array to 2 decimals with the same results as Python's round(value, 2).
+
+    NumPy scales by 100 before rounding, which can tip a value lying almost exactly halfway
+    between two hundredths the other way. Those few values are rounded by round() instead.
+
+    Args:
+        values (ndarray): Values to round.
+
+    Returns:
+        ndarray: The rounded values, as float64.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scaled = values * 100
+    rounded = np.rint(scaled) / 100
+    halfway = np.abs(scaled - np.floor(scaled) - 0.5) < HALFWAY_TOLERANCE
+    if halfway.any():
+        rounded[halfway] = [round(value, 2) for value in values[halfway].tolist()]
+    return rounded
+
+
+class VectorizedSignProcessingSystem(SignProcessingSystem):
+    """
+    Drop-in replacement for SignProcessingSystem that works out every student's sign
+    exposure with NumPy array operations instead of walking the rotation one sign at a time.
+
+    Takes the same inputs and returns the same result rows as SignProcessingSystem.
+
+    The exposure matrices have a column per sign, so unlike the timeline and event engines
+    this one does read the whole rotation, once per day or scheduled segment: the k + 1 table
+    from cycle_starts and the sign order. With a SignRotation that is an O(k) rebuild after
+    each change, which the O(students x k) matrix work that follows outweighs.
+
+    Attributes:
+        chunk_cells (int): Upper bound on students x signs handled per batch, to cap memory use.
+    """
+    chunk_cells = 1 << 16
+
+    def iter_student_results(self, students, build_rows=True, day=None):
+        """
+        Runs students past the signs in batches, yielding each one's results in order.
+
+        Each student watches the stretch of the rotation cycle that starts where the
+        previous student left off, so the start offsets are a running sum of view times.
+        Exposure to each sign is then the overlap of that stretch with the sign's slot.
+        Students are taken chunk_cells // signs at a time, so memory stays flat. Students
+        from a dense StudentPopulation day index go through iter_population_results.
+
+        Args:
+            students (iterable): Students in the order they pass the signs.
+            build_rows (bool): Build a result row for each student. When False, None is yielded in its place.
+            day (str): Day being processed. Not used, the rotation only depends on the order of students.
+
+        Yields:
+            tuple: The student's result row and a dict of seconds spent on each sign during this visit.
+        """
+        if not len(self.signs):
+            for student in students:
+                yield self.record_student(student, {}, build_rows), {}
+            return
+
+        positions = getattr(students, "positions", None)
+        if positions is not None and not students.population.sparse:
+            yield from self.iter_population_results(students.population, positions, build_rows)
+            return
+
+        starts = self.signs.cycle_starts()
+        sign_ids = [sign.index for sign in self.signs.items]
+        step = max(1, self.chunk_cells // len(sign_ids))
+        students = iter(students)
+
+        compute_exposure = self.compute_exposure
+        record_student = self.record_student
+        if self.instrumentation is not None:
+            compute_exposure = self.instrumentation.timed("sign_processing", compute_exposure)
+            record_student = self.instrumentation.visit_recorder(record_student, self.signs)
+
+        while True:
+            chunk = list(islice(students, step))
+            if not chunk:
+                break
+            phase = self.signs.get_phase(starts)
+            view_times = np.array([student.time for student in chunk], dtype=np.float64)
+            exposure = compute_exposure(view_times, starts, phase)
+
+            # Move the rotation to where the last student in the chunk left it
+            self.signs.set_phase(phase + view_times.sum(), starts)
+
+            for student, seen in zip(chunk, exposure.tolist()):
+                seen = {sign_id: seconds for sign_id, seconds in zip(sign_ids, seen) if seconds}  # Skip unseen signs
+                yield record_student(student, seen, build_rows), seen
+
+    def iter_population_results(self, population, positions, build_rows=True):
+        """
+        Runs students of a dense StudentPopulation past the signs a chunk at a time, as
+        iter_student_results does, but with their view times, viewership updates and result
+        rows all handled per chunk from the population's arrays.
+
+        Args:
+            population (StudentPopulation): The students' population, with a dense viewership store.
+            positions (ndarray): Positions of the students in the population, in the order they pass the signs.
+            build_rows (bool): Build a result row for each student. When False, None is yielded in its place.
+
+        Yields:
+            tuple: The student's result row and a dict of seconds spent on each sign during this visit.
+        """
+        starts = self.signs.cycle_starts()
+        sign_ids = [sign.index for sign in self.signs.items]
+        columns = np.array([population.columns[index] for index in sign_ids])  # Viewership column of each sign
+        step = max(1, self.chunk_cells // len(sign_ids))
+
+        compute_exposure = self.compute_exposure
+        build_population_rows = self.build_population_rows
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            compute_exposure = instrumentation.timed("sign_processing", compute_exposure)
+            build_population_rows = instrumentation.timed("result_assembly", build_population_rows)
+            durations = np.diff(starts)
+
+        for low in range(0, len(positions), step):
+            chunk = positions[low:low + step]
+            phase = self.signs.get_phase(starts)
+            view_times = population.times[chunk]
+            exposure = compute_exposure(view_times, starts, phase)
+            self.signs.set_phase(phase + view_times.sum(), starts)
+            population.add_exposure(chunk, columns, exposure)
+            if instrumentation is not None:
+                instrumentation.count_chunk(view_times, exposure, durations)
+
+            rows = build_population_rows(population, chunk) if build_rows else [None] * len(chunk)
+            for row, seen in zip(rows, exposure.tolist()):
+                yield row, {sign_id: seconds for sign_id, seconds in zip(sign_ids, seen) if seconds}
+
+    def build_population_rows(self, population, positions):
+        """
+        Builds the result rows of a block of a dense population's students in one go, the same
+        rows build_student_data gives one student at a time.
+
+        Args:
+            population (StudentPopulation): The students' population, with a dense viewership store.
+            positions (ndarray): Positions of the students in the population.
+
+        Returns:
+            list: One row per student, in the order of positions.
+        """
+        columns = [population.columns[index] for index in self.sign_ids]
+        names = [column for _, column in self.sign_columns]
+        exposure = round_hundredths(population.viewership[positions[:, None], columns]).tolist()
+
+        rows = []
+        for identifier, speed, view_time, mask, seconds in zip(population.identifiers[positions].tolist(),
+                                                               population.speeds[positions].tolist(),
+                                                               population.times[positions].tolist(),
+                                                               population.attendance[positions].tolist(),
+                                                               exposure):
+            days = MASK_DAYS[mask]
+            row = {
+                "student_id": identifier,
+                "speed": speed,
+                "view_time": view_time,
+                "num_days_attended": len(days),
+                "days_attended": days,
+            }
+            row.update(zip(names, seconds))
+            rows.append(row)
+        return rows
+
+    def simulate_students(self, students, day=None, collector=None):
+        """
+        Runs students past the signs, updating only their viewership stats.
+
+        Students from a StudentPopulation day index are handled entirely with arrays:
+        their exposure is added straight into the population's viewership matrix,
+        and into the collector a chunk at a time.
+
+        Args:
+            students (iterable): Students in the order they pass the signs.
+            day (str): Day being processed.
+            collector (ExposureCollector): Optionally also receives every visit's exposure.
+        """
+        positions = getattr(students, "positions", None)
+        if positions is None or not len(self.signs):
+            super().simulate_students(students, day, collector)
+            return
+
+        population = students.population
+        starts = self.signs.cycle_starts()
+        columns = np.array([population.columns[sign.index] for sign in self.signs.items])  # Viewership column of each sign
+        step = max(1, self.chunk_cells // len(columns))
+
+        compute_exposure = self.compute_exposure
+        instrumentation = self.instrumentation
+        if collector is not None:
+            add_chunk = collector.add_chunk
+            collector_columns = np.array([collector.columns[sign.index] for sign in self.signs.items])
+        if instrumentation is not None:
+            compute_exposure = instrumentation.timed("sign_processing", compute_exposure)
+            durations = np.diff(starts)
+            if collector is not None:
+                add_chunk = instrumentation.timed("result_assembly", add_chunk)
+
+        for low in range(0, len(positions), step):
+            chunk = positions[low:low + step]
+            phase = self.signs.get_phase(starts)
+            view_times = population.times[chunk]
+            exposure = compute_exposure(view_times, starts, phase)
+            self.signs.set_phase(phase + view_times.sum(), starts)
+            population.add_exposure(chunk, columns, exposure)
+            if collector is not None:
+                add_chunk(day, MASK_DAY_COUNTS[population.attendance[chunk]], exposure, collector_columns)
+            if instrumentation is not None:
+                instrumentation.count_chunk(view_times, exposure, durations)
+
+    def compute_exposure(self, view_times, starts, phase):
+        """
+        Works out how long each student sees each sign.
+
+        Args:
+            view_times (ndarray): View time of each student, in queue order.
+            starts (list): Prefix table of sign durations from CircularLinkedList.cycle_starts.
+            phase (float): Offset into the rotation cycle when the first student arrives.
+
+        Returns:
+            ndarray: Matrix of shape (students, signs) with seconds of exposure.
+        """
+        starts = np.asarray(starts, dtype=np.float64)
+        cycle_length = starts[-1]
+        if cycle_length <= 0:
+            raise ValueError("Signs must have a positive total display time.")
+        sign_starts = starts[:-1]
+        durations = np.diff(starts)
+
+        # Where in the cycle each student starts watching
+        offsets = np.concatenate(([0.0], np.cumsum(view_times[:-1])))
+        begin = np.mod(phase + offsets, cycle_length)
+
+        return (self.time_on_signs(begin + view_times, sign_starts, durations, cycle_length)
+                - self.time_on_signs(begin, sign_starts, durations, cycle_length))
+
+    @staticmethod
+    def time_on_signs(position, sign_starts, durations, cycle_length):
+        """
+        Total time each sign has been on display between the start of the cycle and a position.
+
+        Args:
+            position (ndarray): Offsets in seconds, which may run past one cycle.
+            sign_starts (ndarray): Time each sign comes up within a cycle.
+            durations (ndarray): Display time of each sign.
+            cycle_length (float): Length of one full rotation.
+
+        Returns:
+            ndarray: Matrix of shape (positions, signs) with seconds of display time.
+        """
+        cycles = np.floor(position / cycle_length)
+        within = (position - cycles * cycle_length)[:, None]
+        return cycles[:, None] * durations + np.clip(within - sign_starts, 0.0, durations)
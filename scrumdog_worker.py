@@ -0,0 +1,174 @@
+import threading
+from queue import Queue, Empty
+
+
+class SimulationCancelled(Exception):
+    """Raised inside a job when the user cancels it."""
+
+
+class SimulationWorker(threading.Thread):
+    """
+    Runs a long simulation job on a background thread so the GUI stays responsive.
+
+    The job is called as job(progress) and reports back through progress(fraction, message),
+    which also raises SimulationCancelled once cancel() has been called. Everything the GUI
+    needs to know arrives on the events queue as tuples, for the Tk thread to poll with after():
+
+        ("progress", fraction, message)
+        ("done", result)
+        ("error", exception)
+        ("cancelled",)
+
+    Attributes:
+        events (Queue): Thread-safe queue of events for the GUI.
+    """
+    def __init__(self, job):
+        super().__init__(daemon=True)
+        self.job = job
+        self.events = Queue()
+        self.cancel_requested = threading.Event()
+
+    def cancel(self):
+        """Asks the job to stop at its next progress report."""
+        self.cancel_requested.set()
+
+    def progress(self, fraction, message=""):
+        """
+        Reports progress from inside the job.
+
+        Args:
+            fraction (float): How much of the job is done, from 0 to 1.
+            message (str): Short description of the current step.
+        """
+        if self.cancel_requested.is_set():
+            raise SimulationCancelled()
+        self.events.put(("progress", fraction, message))
+
+    def run(self):
+        try:
+            result = self.job(self.progress)
+        except SimulationCancelled:
+            self.events.put(("cancelled",))
+        except Exception as e:
+            self.events.put(("error", e))
+        else:
+            self.events.put(("done", result))
+
+    def poll(self):
+        """
+        Returns every event waiting on the queue without blocking.
+
+        Returns:
+            list: The events, oldest first.
+        """
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except Empty:
+                return events
+
+
+def report_every(rows, total, progress, step=1000, message="Simulating"):
+    """
+    Passes rows through unchanged, reporting progress every step rows.
+
+    Args:
+        rows (iterable): Rows being streamed, e.g. from iter_students_for_week.
+        total (int): Number of rows expected, used to work out the fraction done.
+        progress (callable): The worker's progress(fraction, message) function.
+        step (int): Rows between reports.
+        message (str): Message sent with each report.
+
+    Yields:
+        dict: The rows from the input.
+    """
+    for count, row in enumerate(rows, start=1):
+        if count % step == 0:
+            progress(count / total if total else 1.0, message)
+        yield row
+
+
+class WorkerControls:
+    """
+    Mixin for a Tk window class that runs its calculation on a SimulationWorker, with a
+    progress bar and Submit and Cancel buttons that follow the worker.
+
+    The class mixing it in sets self.window to its Tk window, defines submit() for the Submit
+    button and display_message(message) to show text, and calls add_worker_controls to place
+    the widgets. Its submit() hands the calculation to run_in_background.
+
+    Attributes:
+        poll_interval (int): Milliseconds between checks of the worker's events.
+        worker (SimulationWorker): The running calculation, or None.
+    """
+    poll_interval = 100
+
+    def add_worker_controls(self, parent):
+        """
+        Adds the progress bar and the Submit and Cancel buttons below what is already in parent.
+
+        Args:
+            parent (tk.Widget): Widget to pack them into, usually the window.
+        """
+        # Imported here so the worker can be used, and tested, without a display
+        import tkinter as tk
+        from tkinter import ttk
+
+        # Progress of a calculation running in the background
+        self.progress_bar = ttk.Progressbar(parent, length=400, maximum=100)
+        self.progress_bar.pack(pady=2)
+
+        # Submit and Cancel buttons
+        button_frame = tk.Frame(parent)
+        button_frame.pack(pady=5)
+        self.submit_button = tk.Button(button_frame, text="Submit", width=20, command=self.submit)
+        self.submit_button.grid(row=0, column=0, padx=5)
+        self.cancel_button = tk.Button(button_frame, text="Cancel", width=20, command=self.cancel, state="disabled")
+        self.cancel_button.grid(row=0, column=1, padx=5)
+
+        self.worker = None
+        self.on_done = None
+
+    def run_in_background(self, job, on_done):
+        """
+        Runs a long calculation on a background thread so the window keeps responding.
+
+        Args:
+            job (callable): Called as job(progress) on the background thread. It should call
+                progress(fraction, message) now and then, which also stops it when Cancel is pressed.
+            on_done (callable): Called as on_done(result) on the Tk thread with what job returned.
+        """
+        self.worker = SimulationWorker(job)
+        self.on_done = on_done
+        self.submit_button.config(state="disabled")
+        self.cancel_button.config(state="normal")
+        self.progress_bar["value"] = 0
+        self.display_message("Running Calculations...")
+        self.worker.start()
+        self.window.after(self.poll_interval, self.poll_worker)
+
+    def cancel(self):
+        """Asks the background calculation to stop at its next progress report."""
+        if self.worker is not None:
+            self.worker.cancel()
+            self.cancel_button.config(state="disabled")
+
+    def poll_worker(self):
+        """Handles everything the worker has reported since the last check, then checks again shortly."""
+        for event in self.worker.poll():
+            if event[0] == "progress":
+                self.progress_bar["value"] = event[1] * 100
+                continue
+            if event[0] == "done":
+                self.progress_bar["value"] = 100
+                self.on_done(event[1])
+            elif event[0] == "error":
+                self.display_message(f"An error occurred: {event[1]}")
+            else:
+                self.display_message("Calculation cancelled.")
+            self.worker = None
+            self.submit_button.config(state="normal")
+            self.cancel_button.config(state="disabled")
+            return
+        self.window.after(self.poll_interval, self.poll_worker)
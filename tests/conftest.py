@@ -0,0 +1,24 @@
+import os
+import sys
+
+# The modules live at the top of the repository rather than in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+import scrumdog_queue
+from scrumdog_engines import ENGINES
+
+
+@pytest.fixture
+def build_system():
+    """
+    Builds a system on one of scrumdog_engines.ENGINES, as
+    build_system(engine, students, durations, rotation=CircularLinkedList, seed=None, **options),
+    with signs 1, 2, ... shown for the given durations.
+    """
+    def build(engine, students, durations, rotation=scrumdog_queue.CircularLinkedList, seed=None, **options):
+        signs = rotation()
+        for i, time in enumerate(durations, start=1):
+            signs.append(i, time)
+        return ENGINES[engine](students, signs, seed, **options)
+    return build
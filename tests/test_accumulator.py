@@ -0,0 +1,51 @@
+import pytest
+from scrumdog_queue import ResultAccumulator
+
+
+def row(student_id, view_time, **signs):
+    data = {"student_id": student_id, "speed": 12.0, "view_time": view_time, "num_days_attended": 2,
+            "days_attended": ["Monday", "Friday"]}
+    data.update(signs)
+    return data
+
+
+def fill(accumulator):
+    accumulator.add(row(1, 10.0, sign1=4.0, sign2=6.0), {1: 4.0, 2: 6.0}, "Monday")
+    accumulator.add(row(2, 8.0, sign1=8.0, sign2=0.0), {1: 8.0}, "Monday")
+    accumulator.add(row(1, 10.0, sign1=7.0, sign2=13.0), {1: 3.0, 2: 7.0}, "Friday")
+    return accumulator
+
+
+def test_per_day_keeps_a_row_per_student_and_day():
+    results = fill(ResultAccumulator("per_day")).results()
+    assert [(result["student_id"], result["sign1"]) for result in results] == [(1, 4.0), (2, 8.0), (1, 7.0)]
+
+
+def test_per_day_replaces_a_repeat_visit_on_the_same_day():
+    accumulator = fill(ResultAccumulator("per_day"))
+    accumulator.add(row(2, 8.0, sign1=9.5, sign2=0.0), {1: 1.5}, "Monday")
+    assert len(accumulator) == 3
+    assert accumulator.results()[1]["sign1"] == 9.5
+
+
+def test_overwrite_keeps_the_latest_row():
+    results = fill(ResultAccumulator("overwrite")).results()
+    assert [(result["student_id"], result["sign2"]) for result in results] == [(1, 13.0), (2, 0.0)]
+
+
+@pytest.mark.parametrize("sign_ids", [None, [1, 2]])
+def test_sum_adds_up_every_visit(sign_ids):
+    results = fill(ResultAccumulator("sum", sign_ids)).results()
+    first, second = results
+    assert (first["view_time"], first["days_processed"], first["sign1"], first["sign2"]) == (20.0, 2, 7.0, 13.0)
+    assert (second["view_time"], second["days_processed"], second["sign1"], second["sign2"]) == (8.0, 1, 8.0, 0.0)
+
+
+def test_weekly_totals_do_not_depend_on_the_policy():
+    totals = [fill(ResultAccumulator(policy, [1, 2])).weekly_totals() for policy in ResultAccumulator.MERGE_POLICIES]
+    assert totals[0] == totals[1] == totals[2]
+
+
+def test_unknown_policy_is_refused():
+    with pytest.raises(ValueError):
+        ResultAccumulator("average")
@@ -0,0 +1,98 @@
+import random
+import numpy as np
+import pytest
+from Database3 import Database, RunningStats
+
+
+def make_rows(count=400, signs=3, seed=8):
+    rng = random.Random(seed)
+    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+    rows = []
+    for student_id in range(1, count + 1):
+        attended = sorted(rng.sample(days, rng.randint(1, 5)), key=days.index)
+        row = {"student_id": student_id, "speed": 15.0, "view_time": 10.0,
+               "num_days_attended": len(attended), "days_attended": attended}
+        for i in range(1, signs + 1):
+            row[f"sign{i}"] = round(rng.uniform(0, 10), 2)
+        rows.append(row)
+    return rows
+
+
+def write(tmp_path, rows, extension="csv"):
+    database = Database(str(tmp_path / f"rows.{extension}"))
+    database.excel_stream(rows)
+    return database
+
+
+def test_running_stats_match_numpy():
+    values = [random.Random(1).gauss(5, 2) for _ in range(1000)]
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+    assert stats.mean == pytest.approx(np.mean(values))
+    assert stats.variance() == pytest.approx(np.var(values))
+    assert (stats.min, stats.max, stats.count) == (min(values), max(values), len(values))
+
+
+def test_merged_stats_equal_one_pass():
+    values = [random.Random(2).uniform(0, 9) for _ in range(500)]
+    whole, left, right = RunningStats(), RunningStats(), RunningStats()
+    for value in values:
+        whole.add(value)
+    for value in values[:123]:
+        left.add(value)
+    for value in values[123:]:
+        right.add(value)
+    left.merge(right)
+    left.merge(RunningStats())
+    for key, value in whole.summary().items():
+        assert left.summary()[key] == pytest.approx(value)
+
+
+@pytest.mark.parametrize("extension", ["csv", "db"])
+def test_overall_statistics(tmp_path, extension):
+    rows = make_rows()
+    result = write(tmp_path, rows, extension).aggregate()
+    for sign in (1, 2, 3):
+        column = [row[f"sign{sign}"] for row in rows]
+        assert result[None][sign]["mean"] == pytest.approx(np.mean(column))
+        assert result[None][sign]["sum"] == pytest.approx(sum(column))
+        assert result[None][sign]["variance"] == pytest.approx(np.var(column))
+        assert result[None][sign]["count"] == len(rows)
+
+
+@pytest.mark.parametrize("extension", ["csv", "db"])
+def test_grouping_by_days_attended_and_by_day(tmp_path, extension):
+    rows = make_rows()
+    database = write(tmp_path, rows, extension)
+
+    by_count = database.aggregate("num_days_attended")
+    for count, group in by_count.items():
+        column = [row["sign2"] for row in rows if row["num_days_attended"] == count]
+        assert group[2]["count"] == len(column)
+        assert group[2]["mean"] == pytest.approx(np.mean(column))
+
+    by_day = database.aggregate("day")
+    column = [row["sign1"] for row in rows if "Wednesday" in row["days_attended"]]
+    assert by_day["Wednesday"][1]["count"] == len(column)
+    assert by_day["Wednesday"][1]["mean"] == pytest.approx(np.mean(column))
+
+
+def test_averages_round_the_group_means(tmp_path):
+    rows = make_rows()
+    averages = write(tmp_path, rows).averages(3)
+    matching = [row for row in rows if row["num_days_attended"] == 3]
+    assert [entry["Sign"] for entry in averages] == [1, 2, 3]
+    for entry in averages:
+        expected = np.mean([row[f"sign{entry['Sign']}"] for row in matching])
+        assert entry["Average_Seconds_Seen"] == pytest.approx(round(expected, 2))
+
+
+def test_averages_without_matching_rows(tmp_path):
+    rows = [row for row in make_rows() if row["num_days_attended"] != 4]
+    assert write(tmp_path, rows).averages(4) == []
+
+
+def test_unknown_grouping_is_refused(tmp_path):
+    with pytest.raises(ValueError):
+        write(tmp_path, make_rows(10)).aggregate("speed")
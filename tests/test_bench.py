@@ -0,0 +1,42 @@
+import os
+import scrumdog_bench
+from scrumdog_bench import compare, format_result, run_benchmarks, setup_csv_write, setup_csv_write_list
+
+
+def test_default_grid_times_the_walk_engine():
+    assert "walk" in scrumdog_bench.DEFAULT_ENGINES
+    report = run_benchmarks(["week"], [500], [5], repeats=1, memory=False, log=None)
+    assert [result["engine"] for result in report["results"]] == list(scrumdog_bench.DEFAULT_ENGINES)
+    assert all(result["students_per_second"] > 0 for result in report["results"])
+
+
+def test_walk_is_skipped_above_its_population_cap(monkeypatch):
+    monkeypatch.setitem(scrumdog_bench.ENGINE_MAX_STUDENTS, "walk", 400)
+    report = run_benchmarks(["week"], [300, 600], [5], engines=["walk"], repeats=1, memory=False, log=None)
+    small, large = report["results"]
+    assert "skipped" not in small and small["students_per_second"] > 0
+    assert "walk" in large["skipped"]
+    assert "skipped" in format_result(large)
+
+
+def test_results_record_every_case_and_compare():
+    report = run_benchmarks(["generate", "csv_write"], [300], [3], repeats=1, memory=True, log=None)
+    for result in report["results"]:
+        assert result["wall_seconds"] > 0
+        assert result["peak_memory_mb"] > 0
+    changes = compare(report, report)
+    assert len(changes) == 2
+    assert all(change["time_ratio"] == 1.0 for change in changes)
+
+
+def test_list_and_streamed_csv_writes_produce_the_same_file(tmp_path):
+    written = []
+    for setup in (setup_csv_write, setup_csv_write_list):
+        workdir = tmp_path / setup.__name__
+        workdir.mkdir()
+        run, items = setup(200, 4, None, str(workdir))
+        run()
+        assert items == 200
+        with open(os.path.join(workdir, "bench.csv"), encoding="utf-8") as file:
+            written.append(file.read())
+    assert written[0] == written[1]
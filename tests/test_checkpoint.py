@@ -0,0 +1,92 @@
+import os
+import numpy as np
+import pytest
+import scrumdog_checkpoint
+import Student_Population
+from scrumdog_checkpoint import resume_week, run_week
+from scrumdog_rotation import SignRotation
+
+SCHEDULE = [
+    {"day": "Monday", "at": 300, "action": "add", "sign": 9, "time": 4},
+    {"day": "Wednesday", "at": 0, "action": "remove", "sign": 2},
+]
+
+@pytest.fixture
+def build(build_system):
+    def build(engine, sparse=False, schedule=True, count=1500):
+        population = Student_Population.generate_population(count, seed=24, num_signs=9, sparse=sparse)
+        # Clock engines only change signs at the start of a day
+        changes = [dict(change, at=0 if engine == "event" else change["at"]) for change in SCHEDULE]
+        options = {"sign_schedule": changes} if schedule else {}
+        return build_system(engine, population, [5] * 6, rotation=SignRotation, seed=5, **options)
+    return build
+
+
+def viewership(system):
+    return np.array([[student.viewership_stats.get(index, 0.0) for index in system.sign_ids]
+                     for student in system.students])
+
+
+class Killed(Exception):
+    pass
+
+
+def kill_after(monkeypatch, records, torn=False):
+    """Makes the run die after writing a number of checkpoint records, or part way through the next one."""
+    real_write = scrumdog_checkpoint.write_record
+    written = [0]
+
+    def write(path, record, mode="ab"):
+        if written[0] == records:
+            if torn:
+                real_write(path, record, mode)
+                with open(path, mode="r+b") as file:
+                    file.truncate(os.path.getsize(path) - 10)  # The end of the record never made it
+            raise Killed()
+        real_write(path, record, mode)
+        written[0] += 1
+    monkeypatch.setattr(scrumdog_checkpoint, "write_record", write)
+
+
+@pytest.mark.parametrize("engine,sparse", [("walk", False), ("vectorized", False), ("vectorized", True),
+                                           ("event", False)])
+@pytest.mark.parametrize("build_rows", [True, False])
+@pytest.mark.parametrize("records,torn", [(1, False), (4, True), (7, False)])
+def test_killed_then_resumed_equals_uninterrupted(tmp_path, monkeypatch, build, engine, sparse, build_rows,
+                                                  records, torn):
+    if engine == "event":
+        records = min(records, 5)  # The event engine only checkpoints once a day
+    plain = build(engine, sparse)
+    expected = plain.process_students_for_week() if build_rows else plain.simulate_week()
+
+    path = str(tmp_path / "week.ckpt")
+    with monkeypatch.context() as patch:
+        kill_after(patch, records, torn)
+        with pytest.raises(Killed):
+            run_week(build(engine, sparse), path, every=200, build_rows=build_rows)
+
+    resumed = build(engine, sparse)
+    assert resume_week(resumed, path) == expected
+    np.testing.assert_array_equal(viewership(resumed), viewership(plain))
+    assert resumed.signs.get_state() == plain.signs.get_state()
+
+
+def test_checkpoints_grow_with_the_block_not_the_run(tmp_path, build):
+    sizes = []
+    for every in (100, 1000):
+        path = str(tmp_path / f"every{every}.ckpt")
+        run_week(build("walk", schedule=False), path, every=every)
+        sizes.append(os.path.getsize(path))
+    assert sizes[0] < 1.5 * sizes[1]
+
+
+def test_checkpoints_only_resume_into_the_same_run(tmp_path, build):
+    path = str(tmp_path / "week.ckpt")
+    run_week(build("walk", count=100), path)
+    with pytest.raises(ValueError):
+        resume_week(build("walk", count=101), path)
+
+    with open(path, mode="r+b") as file:
+        file.truncate(4)  # Not even the first record is whole
+    with pytest.raises(ValueError):
+        resume_week(build("walk", count=100), path)
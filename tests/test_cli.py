@@ -0,0 +1,116 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+import scrumdog_cli
+from scrumdog_cli import expand_runs, load_config, main
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_config(tmp_path, config, name="runs.json"):
+    path = tmp_path / name
+    path.write_text(json.dumps(config) if name.endswith(".json") else config, encoding="utf-8")
+    return str(path)
+
+
+def run_cli(tmp_path, config):
+    """Runs the CLI as a separate process, as a batch job would."""
+    return subprocess.run([sys.executable, os.path.join(ROOT, "scrumdog_cli.py"), write_config(tmp_path, config),
+                           "--output-dir", str(tmp_path / "out"), "--workers", "1"],
+                          cwd=str(tmp_path), capture_output=True, text=True)
+
+
+def test_exit_status_is_zero_when_every_run_finishes(tmp_path):
+    finished = run_cli(tmp_path, {"num_students": 200, "runs": [{"name": "a"}, {"name": "b", "output": "sqlite"}]})
+    assert finished.returncode == 0, finished.stderr
+    assert os.path.exists(tmp_path / "out" / "a.csv") and os.path.exists(tmp_path / "out" / "b.db")
+
+
+def test_exit_status_is_nonzero_when_a_run_fails(tmp_path):
+    # A directory where the bad run's CSV should go passes the config checks but fails the write
+    os.makedirs(tmp_path / "out" / "bad.csv")
+    finished = run_cli(tmp_path, {"num_students": 200, "runs": [{"name": "good"}, {"name": "bad"}]})
+    assert finished.returncode == 1
+    summary = json.loads((tmp_path / "out" / "summary.json").read_text(encoding="utf-8"))
+    errors = {result["run"]["name"]: result.get("error") for result in summary["runs"]}
+    assert errors["good"] is None and "Error" in errors["bad"]
+
+
+def test_bad_configs_stop_before_anything_runs(tmp_path):
+    finished = run_cli(tmp_path, {"runs": [{"name": "a", "engine": "warp"}]})
+    assert finished.returncode == 2
+    assert "engine must be one of" in finished.stderr
+    assert not os.path.exists(tmp_path / "out")
+
+
+@pytest.mark.parametrize("config", [
+    {"runs": [{"name": "a"}, {"name": "a"}]},
+    {"num_students": 0},
+    {"num_students": True},
+    {"weeks": 2.0},
+    {"sign_time": -5},
+    {"sign_time": True},
+    {"speed_mean": "fast"},
+    {"speed_mean": 0},
+    {"speed_mean": 15, "speed_std": -3},
+    {"speed_mean": 15, "speed_std": False},
+    {"speed_std": 3},
+    {"seed": "0"},
+    {"seed": -1},
+    {"seed": True},
+    {"random_sign_order": 1},
+    {"random_sign_order": "yes"},
+    {"colour": "red"},
+    {"output": "sketch", "weeks": 3},
+    {"name": "a/b" if os.sep == "/" else "a\\b"},
+])
+def test_bad_settings_are_refused(config):
+    with pytest.raises(ValueError):
+        expand_runs(config)
+
+
+def test_speed_settings_are_accepted_when_they_make_sense():
+    runs = expand_runs({"runs": [{"name": "uniform"}, {"name": "mean", "speed_mean": 15},
+                                 {"name": "spread", "speed_mean": 12.5, "speed_std": 2, "random_sign_order": True}]})
+    assert [(run["speed_mean"], run["speed_std"]) for run in runs] == [(None, None), (15, None), (12.5, 2)]
+
+
+def test_toml_and_json_configs_agree(tmp_path):
+    toml = """
+num_students = 300
+engine = "timeline"
+
+[[runs]]
+name = "short"
+
+[[runs]]
+name = "long"
+weeks = 4
+"""
+    from_toml = load_config(write_config(tmp_path, toml, "runs.toml"))
+    from_json = load_config(write_config(tmp_path, {"num_students": 300, "engine": "timeline",
+                                                    "runs": [{"name": "short"}, {"name": "long", "weeks": 4}]}))
+    assert from_toml == from_json
+    assert [run["weeks"] for run in from_toml] == [1, 4]
+
+
+def test_multi_week_runs_add_up_every_week(tmp_path):
+    for weeks in (1, 3):
+        assert main([write_config(tmp_path, {"name": "run", "num_students": 100, "weeks": weeks, "output": "none"}),
+                     "--output-dir", str(tmp_path / f"out{weeks}"), "--workers", "1"]) == 0
+    one, three = (json.loads((tmp_path / f"out{weeks}" / "summary.json").read_text(encoding="utf-8"))["runs"][0]
+                  for weeks in (1, 3))
+    assert three["run"]["weeks"] == 3
+    for sign, summary in one["signs"].items():
+        assert three["signs"][sign]["mean_seconds"] == pytest.approx(3 * summary["mean_seconds"], rel=0.05)
+
+
+def test_cli_runs_without_tkinter(tmp_path):
+    script = ("import sys; sys.modules['tkinter'] = None; import scrumdog_cli; "  # Any import of tkinter now fails
+              f"code = scrumdog_cli.main([{write_config(tmp_path, {'num_students': 50})!r}, '--workers', '1', "
+              f"'--output-dir', {str(tmp_path / 'out')!r}]); "
+              "sys.exit(code or any(name.startswith('tkinter.') for name in sys.modules))")
+    finished = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True)
+    assert finished.returncode == 0, finished.stderr
@@ -0,0 +1,61 @@
+import random
+from queue import Queue
+import pytest
+import scrumdog_queue
+import Student_Population
+from Student_Class import Student, OneDayStudent, TwoDayStudent, ThreeDayStudent, FourDayStudent, FiveDayStudent
+
+
+def make_students(count, seed=6):
+    random.seed(seed)
+    classes = [OneDayStudent, TwoDayStudent, ThreeDayStudent, FourDayStudent, FiveDayStudent]
+    return [random.choice(classes)(i) for i in range(1, count + 1)]
+
+
+def make_system(students):
+    signs = scrumdog_queue.CircularLinkedList()
+    for i in range(1, 5):
+        signs.append(i, 3)
+    return scrumdog_queue.SignProcessingSystem(students, signs)
+
+
+def test_day_index_holds_each_days_students_in_order():
+    students = make_students(200)
+    system = make_system(students)
+    for day in Student.Days:
+        assert system.day_index[day] == [student for student in students if student.is_attending_today(day)]
+
+
+def test_population_index_matches_the_attendance_masks():
+    population = Student_Population.generate_population(500, seed=2)
+    system = make_system(population)
+    for day in Student.Days:
+        assert system.day_index[day].positions.tolist() == population.attending(day).nonzero()[0].tolist()
+
+
+def test_week_visits_each_student_once_per_day_attended():
+    students = make_students(150)
+    rows = make_system(students).process_students_for_week()
+    assert len(rows) == sum(len(student.attendance_days) for student in students)
+
+
+def test_a_subset_of_days_runs_the_same_as_the_start_of_the_week():
+    full = make_system(make_students(150)).process_students_for_week()
+    first_two = make_system(make_students(150)).process_students_for_week(["Monday", "Tuesday"])
+    assert first_two == full[:len(first_two)]
+
+
+def test_queue_processing_drains_into_the_same_rows():
+    students = make_students(60)
+    queued = Queue()
+    for student in students:
+        queued.put(student)
+    from_queue = make_system(students).process_queue_and_signs(queued, "Monday")
+    assert queued.empty()
+    again = make_students(60)
+    assert from_queue == make_system(again).process_students(again, "Monday")
+
+
+def test_unknown_days_are_refused():
+    with pytest.raises(ValueError):
+        make_system(make_students(5)).process_students_for_week(["Saturday"])
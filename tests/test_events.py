@@ -0,0 +1,68 @@
+import random
+import numpy as np
+import pytest
+import scrumdog_queue
+from scrumdog_events import DEFAULT_ARRIVAL_PROFILE, EventSignProcessingSystem, arrival_times, check_profile
+from scrumdog_vectorized import VectorizedSignProcessingSystem
+from Student_Class import OneDayStudent, TwoDayStudent, ThreeDayStudent, FourDayStudent, FiveDayStudent
+
+
+def make_students(count, seed=6):
+    random.seed(seed)
+    classes = [OneDayStudent, TwoDayStudent, ThreeDayStudent, FourDayStudent, FiveDayStudent]
+    return [random.choice(classes)(i) for i in range(1, count + 1)]
+
+
+def make_system(students, seed=17, **options):
+    signs = scrumdog_queue.CircularLinkedList()
+    for i, time in enumerate([4, 6, 5, 3], start=1):
+        signs.append(i, time)
+    return EventSignProcessingSystem(students, signs, seed=seed, **options)
+
+
+def test_arrivals_fall_in_the_profile_windows():
+    times = arrival_times(5000, check_profile(DEFAULT_ARRIVAL_PROFILE), np.random.default_rng(1))
+    assert np.all(np.diff(times) >= 0)
+    assert times[0] >= 7 * 3600 and times[-1] <= 19 * 3600
+    rush = np.count_nonzero((times >= 8 * 3600) & (times < 10 * 3600)) / len(times)
+    assert rush == pytest.approx(10 / 32, abs=0.03)  # Two hours at rate 5 out of 32 rate-hours
+
+
+def test_exposure_follows_the_wall_clock():
+    students = make_students(400, seed=17)
+    system = make_system(students)
+    starts = np.array(system.signs.cycle_starts())
+    phase = system.signs.get_phase()
+    monday = system.day_index["Monday"]
+
+    visits = list(system.iter_visits(monday, "Monday"))
+    arrivals = dict(zip(map(id, monday), system.last_arrivals))
+    assert sorted(id(student) for student, _ in visits) == sorted(arrivals)
+
+    order = [sign.index for sign in system.signs.items]
+    for student, seen in visits:
+        begin = phase + arrivals[id(student)] - system.last_arrivals[0]
+        ends = np.array([begin, begin + student.time])
+        shown = VectorizedSignProcessingSystem.time_on_signs(ends, starts[:-1], np.diff(starts), starts[-1])
+        expected = shown[1] - shown[0]
+        assert [seen.get(index, 0.0) for index in order] == pytest.approx(expected.tolist(), abs=1e-6)
+
+
+def test_each_visit_sees_its_whole_view_time():
+    students = make_students(300, seed=3)
+    for row, seen in make_system(students).iter_student_results(students, day="Wednesday"):
+        assert sum(seen.values()) == pytest.approx(row["view_time"])
+
+
+def test_runs_are_reproducible_for_a_seed():
+    first = make_system(make_students(200)).process_students_for_week()
+    assert make_system(make_students(200)).process_students_for_week() == first
+    assert make_system(make_students(200), seed=18).process_students_for_week() != first
+
+
+def test_bad_profiles_are_refused():
+    for profile in ([], [(9, 8, 1)], [(8, 9, -1)], [(8, 9, 0)]):
+        with pytest.raises(ValueError):
+            check_profile(profile)
+    with pytest.raises(ValueError):
+        make_system(make_students(5), arrival_profiles={"Caturday": DEFAULT_ARRIVAL_PROFILE})
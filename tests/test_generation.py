@@ -0,0 +1,40 @@
+import numpy as np
+import Student_Population
+from Student_Population import generate_population, days_to_mask, MASK_DAYS, MIN_SPEED, STUDENT_TYPES, TYPE_SCHEDULES
+
+
+def test_same_seed_gives_the_same_population():
+    first, second = generate_population(5000, seed=11), generate_population(5000, seed=11)
+    for name in ("identifiers", "speeds", "times", "attendance"):
+        np.testing.assert_array_equal(getattr(first, name), getattr(second, name))
+    assert not np.array_equal(first.speeds, generate_population(5000, seed=12).speeds)
+
+
+def test_every_schedule_comes_from_a_student_type():
+    population = generate_population(20000, seed=1)
+    allowed = {days_to_mask(days) for schedules in TYPE_SCHEDULES for days in schedules}
+    assert set(np.unique(population.attendance).tolist()) <= allowed
+    # Types are picked uniformly, so each day count turns up about a fifth of the time
+    shares = np.bincount(population.num_days_attended(), minlength=6)[1:] / len(population)
+    assert np.all(np.abs(shares - 1 / len(STUDENT_TYPES)) < 0.02)
+
+
+def test_view_times_follow_from_speeds_as_for_a_student():
+    population = generate_population(1000, seed=3)
+    assert population.speeds.min() >= Student_Population.SPEED_RANGE[0]
+    assert population.speeds.max() <= Student_Population.SPEED_RANGE[1]
+    expected = [round(550 / 5280 / speed * 3600, 4) for speed in population.speeds.tolist()]
+    np.testing.assert_allclose(population.times, expected, rtol=0, atol=1e-9)
+
+
+def test_speed_distribution_is_normal_and_kept_above_the_minimum():
+    population = generate_population(50000, seed=4, speed_mean=30, speed_std=4)
+    assert abs(population.speeds.mean() - 30) < 0.1
+    assert abs(population.speeds.std() - 4) < 0.1
+    slow = generate_population(1000, seed=4, speed_mean=0.5, speed_std=2)
+    assert slow.speeds.min() >= MIN_SPEED
+
+
+def test_attendance_masks_decode_to_day_lists():
+    for mask, days in enumerate(MASK_DAYS):
+        assert days_to_mask(days) == mask
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+import Student_Population
+from scrumdog_histogram import ExposureCollector, ExposureHistograms
+from scrumdog_sharding import simulate_week_sharded
+
+ENGINES = ["walk", "timeline", "vectorized"]
+DURATIONS = [4, 2, 6, 3]
+
+
+def population():
+    return Student_Population.generate_population(400, seed=21, num_signs=4)
+
+
+def recount(system, bin_width=1.0, num_bins=8):
+    """Histograms worked out visit by visit from iter_visits."""
+    expected = {}
+    for day in system.DAYS_OF_WEEK:
+        for student, seen in system.iter_visits(system.day_index[day], day):
+            for sign in system.sign_ids:
+                seconds = seen.get(sign, 0.0)
+                group = expected.setdefault((day, len(student.attendance_days), sign), [])
+                group.append(seconds)
+    rows = {}
+    for (day, student_type, sign), values in expected.items():
+        bins = np.minimum(((np.array(values) + 1e-9) // bin_width).astype(int), num_bins - 1)
+        rows[(day, student_type, sign)] = {
+            "visits": len(values),
+            "zeros": sum(value == 0 for value in values),
+            "mean": np.mean(values),
+            "variance": np.var(values),
+            "bins": np.bincount(bins, minlength=num_bins).tolist(),
+        }
+    return rows
+
+
+def by_group(histograms):
+    names = histograms.bin_names()
+    return {(row["day"], row["num_days_attended"], row["sign"]): row for row in histograms.rows()}, names
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_histograms_match_a_recount_of_every_visit(engine, build_system):
+    expected = recount(build_system(engine, population(), DURATIONS))
+    rows, names = by_group(build_system(engine, population(), DURATIONS).histogram_week(bin_width=1.0, num_bins=8))
+    assert rows.keys() == expected.keys()
+    for key, row in rows.items():
+        assert (row["visits"], row["zeros"]) == (expected[key]["visits"], expected[key]["zeros"])
+        assert row["mean"] == pytest.approx(expected[key]["mean"], abs=1e-4)
+        assert row["variance"] == pytest.approx(expected[key]["variance"], abs=1e-4)
+        assert [row[name] for name in names] == expected[key]["bins"]
+
+
+def test_engines_give_the_same_histograms(build_system):
+    results = [by_group(build_system(engine, population(), DURATIONS).histogram_week(bin_width=0.5, num_bins=20))[0]
+               for engine in ENGINES]
+    for other in results[1:]:
+        assert other.keys() == results[0].keys()
+        for key, row in other.items():
+            assert row == pytest.approx(results[0][key], abs=1e-3)
+
+
+def test_merged_days_equal_one_run(build_system):
+    whole = build_system("vectorized", population(), DURATIONS).histogram_week()
+    system = build_system("vectorized", population(), DURATIONS)
+    merged = ExposureHistograms(system.sign_ids, days=system.DAYS_OF_WEEK)
+    simulate_week_sharded(system, workers=1, collector=merged)
+    assert list(merged.rows()) == pytest.approx(list(whole.rows()))
+
+
+def test_collectors_must_implement_the_abstract_methods():
+    with pytest.raises(TypeError):
+        ExposureCollector([1, 2])
+
+    class AddOnly(ExposureCollector):
+        def add_chunk(self, day, num_days_attended, exposure, columns=None):
+            pass
+
+    with pytest.raises(TypeError):
+        AddOnly([1, 2])
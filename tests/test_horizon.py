@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+import Student_Population
+from scrumdog_rotation import SignRotation
+
+ENGINES = ["walk", "timeline", "vectorized"]
+
+
+def population(count=100):
+    return Student_Population.generate_population(count, seed=2)
+
+
+def stats(system):
+    return np.array([[student.viewership_stats.get(index, 0.0) for index in system.sign_ids]
+                     for student in system.students])
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_horizon_equals_simulating_every_week(engine, build_system):
+    weeks = 16
+    horizon = build_system(engine, population(), [5] * 6)
+    assert horizon.simulate_weeks(weeks) is None
+
+    week_by_week = build_system(engine, population(), [5] * 6)
+    for _ in range(weeks):
+        week_by_week.simulate_week()
+    assert stats(horizon).tolist() == stats(week_by_week).tolist()
+    assert horizon.signs.get_phase() == week_by_week.signs.get_phase()
+
+
+@pytest.mark.parametrize("count", [10, 100, 1000])
+def test_weeks_of_a_real_population_do_not_repeat(count, build_system):
+    system = build_system("vectorized", population(count), [5] * 6)
+    phases, growth = [], []
+    for _ in range(16):
+        phases.append(system.signs.get_phase())
+        before = system.students.viewership.copy()
+        system.simulate_week()
+        growth.append(system.students.viewership - before)
+
+    # Each week starts somewhere else in the rotation, so no week's exposure stands in for another's
+    assert len(set(phases)) == len(phases)
+    assert all(not np.allclose(growth[0], later, atol=0.01) for later in growth[1:])
+
+
+def test_scheduled_changes_happen_in_the_first_week_only(build_system):
+    schedule = [{"day": "Tuesday", "at": 10, "action": "set_duration", "sign": 2, "time": 9}]
+    horizon, week_by_week = (build_system("vectorized", Student_Population.generate_population(80, seed=4), [5] * 6,
+                                          rotation=SignRotation, sign_schedule=schedule) for _ in range(2))
+    horizon.simulate_weeks(3)
+    for _ in range(3):
+        week_by_week.simulate_week()
+    assert not horizon.sign_schedule
+    assert [sign.duration for sign in horizon.signs.items] == [5, 9, 5, 5, 5, 5]
+    assert stats(horizon).tolist() == stats(week_by_week).tolist()
@@ -0,0 +1,93 @@
+import pytest
+import Student_Population
+from Database3 import Database
+from scrumdog_instrument import Instrumentation, boundaries_crossed
+from scrumdog_rotation import SignRotation
+
+
+DURATIONS = [2, 3, 5]
+
+
+@pytest.fixture
+def run_week(build_system):
+    def run_week(engine, instrumentation=None):
+        population = Student_Population.generate_population(300, seed=16)
+        return build_system(engine, population, DURATIONS, instrumentation=instrumentation).process_students_for_week()
+    return run_week
+
+
+def test_boundaries_crossed_counts_each_sign_change():
+    starts = [0.0, 2.0, 5.0, 10.0]
+    for phase in (0.0, 1.5, 2.0, 7.25):
+        for elapsed in (0.0, 0.5, 3.0, 10.0, 27.5):
+            changes = [start + cycle * 10.0 for cycle in range(6) for start in starts[:-1]]
+            expected = sum(phase < change <= phase + elapsed for change in changes)
+            assert boundaries_crossed(starts, phase, elapsed) == expected
+
+
+def test_instrumented_runs_give_the_same_rows(run_week):
+    instrumentation = Instrumentation()
+    assert run_week("walk", instrumentation) == run_week("walk")
+
+
+@pytest.mark.parametrize("engine", ["timeline", "vectorized"])
+def test_counters_agree_across_engines(run_week, engine):
+    walk, other = Instrumentation(), Instrumentation()
+    run_week("walk", walk)
+    run_week(engine, other)
+    for name in ("students", "rotations"):
+        assert other.counters[name] == walk.counters[name]
+    assert other.counters["view_seconds"] == pytest.approx(walk.counters["view_seconds"])
+    assert other.counters["partial_views"] == pytest.approx(walk.counters["partial_views"], rel=0.01)
+    assert other.report()["days"].keys() == walk.report()["days"].keys()
+
+
+MID_DAY_CHANGES = [
+    [{"day": "Monday", "at": 20, "action": "set_duration", "sign": 1, "time": 60},
+     {"day": "Monday", "at": 20, "action": "set_duration", "sign": 2, "time": 60}],
+    [{"day": "Monday", "at": 30, "action": "remove", "sign": 2},
+     {"day": "Tuesday", "at": 7, "action": "set_duration", "sign": 3, "time": 0.5},
+     {"day": "Tuesday", "at": 50, "action": "add", "sign": 4, "time": 2}],
+]
+
+
+@pytest.mark.parametrize("schedule", MID_DAY_CHANGES)
+def test_rotations_follow_mid_day_sign_changes(schedule, monkeypatch, build_system):
+    calls = []
+    rotate = SignRotation.rotate
+    monkeypatch.setattr(SignRotation, "rotate", lambda self: calls.append(1) or rotate(self))
+
+    counted = {}
+    for engine in ("walk", "timeline", "vectorized"):
+        instrumentation = Instrumentation()
+        system = build_system(engine, Student_Population.generate_population(200, seed=1), [5, 5, 5],
+                              rotation=SignRotation, instrumentation=instrumentation, sign_schedule=schedule)
+        if engine == "walk":
+            calls.clear()
+        system.process_students_for_week()
+        if engine == "walk":
+            walked = len(calls)
+        counted[engine] = instrumentation.counters["rotations"]
+    assert counted == {"walk": walked, "timeline": walked, "vectorized": walked}
+
+
+def test_phases_and_rows_written(tmp_path, build_system):
+    instrumentation = Instrumentation(profile_phase="sign_processing")
+    population = Student_Population.generate_population(200, seed=3)
+    system = build_system("walk", population, DURATIONS, instrumentation=instrumentation)
+    written = Database(str(tmp_path / "week.csv"), instrumentation=instrumentation).excel_stream(
+        system.iter_students_for_week())
+
+    report = instrumentation.report()
+    assert report["counters"]["rows_written"] == written == report["counters"]["students"]
+    assert list(report["phases"])[-1] == "csv_write"
+    assert report["phases"]["result_assembly"]["calls"] == written
+    assert sum(day["students"] for day in report["days"].values()) == written
+    assert instrumentation.profile_stats().total_calls > 0
+
+
+def test_unknown_profile_phase_is_refused():
+    with pytest.raises(ValueError):
+        Instrumentation(profile_phase="lunch")
+    with pytest.raises(ValueError):
+        Instrumentation().dump_profile("unused.prof")
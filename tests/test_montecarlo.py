@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from scrumdog_montecarlo import merge_summaries, run_monte_carlo, run_replicate
+
+CONFIG = {"num_students": 200, "num_signs": 4}
+
+
+def test_results_do_not_depend_on_the_number_of_workers():
+    in_process = run_monte_carlo(CONFIG, replicates=4, seed=11, workers=1)
+    pooled = run_monte_carlo(CONFIG, replicates=4, seed=11, workers=2)
+    assert pooled == in_process
+
+
+def test_results_are_reproducible_and_follow_the_seed():
+    first = run_monte_carlo(CONFIG, replicates=3, seed=5, workers=1)
+    assert run_monte_carlo(CONFIG, replicates=3, seed=5, workers=1) == first
+    assert run_monte_carlo(CONFIG, replicates=3, seed=6, workers=1) != first
+
+
+def test_replicates_draw_independent_weeks():
+    seeds = np.random.SeedSequence(3).spawn(2)
+    first, second = (run_replicate(CONFIG, seed) for seed in seeds)
+    assert sorted(first) == [1, 2, 3, 4]
+    assert first != second
+    assert run_replicate(CONFIG, seeds[0]) == first
+
+
+def test_merged_intervals():
+    summaries = [{1: {"mean_seconds": value, "reach": 0.5}} for value in (2.0, 4.0, 6.0, 8.0)]
+    report = merge_summaries(summaries, confidence=0.95)
+    seconds = report[1]["mean_seconds"]
+    error = np.std([2.0, 4.0, 6.0, 8.0], ddof=1) / 2
+    assert seconds["mean"] == pytest.approx(5.0)
+    assert seconds["std_error"] == pytest.approx(error)
+    assert seconds["ci_low"] == pytest.approx(5.0 - 1.959964 * error)
+    assert seconds["ci_high"] == pytest.approx(5.0 + 1.959964 * error)
+    assert seconds["replicates"] == 4
+    assert report[1]["reach"]["std_error"] == 0.0
@@ -0,0 +1,76 @@
+import random
+import numpy as np
+import pytest
+import scrumdog_queue
+from Student_Class import OneDayStudent, TwoDayStudent, ThreeDayStudent, FourDayStudent, FiveDayStudent
+from Student_Population import StudentPopulation
+
+
+def make_students(count, seed=2):
+    random.seed(seed)
+    classes = [OneDayStudent, TwoDayStudent, ThreeDayStudent, FourDayStudent, FiveDayStudent]
+    return [random.choice(classes)(i) for i in range(1, count + 1)]
+
+
+def make_signs(count=5):
+    signs = scrumdog_queue.CircularLinkedList()
+    for i in range(1, count + 1):
+        signs.append(i, 4)
+    return signs
+
+
+def test_from_students_keeps_every_attribute():
+    students = make_students(50)
+    population = StudentPopulation.from_students(students)
+    assert len(population) == 50
+    for student, view in zip(students, population):
+        assert view.identifier == student.identifier
+        assert view.speed == student.speed
+        assert view.time == student.time
+        assert view.attendance_days == student.attendance_days
+        assert view.attendance_schedule == student.attendance_schedule
+
+
+def test_day_index_lists_each_days_students_in_order():
+    students = make_students(80)
+    population = StudentPopulation.from_students(students)
+    for day in OneDayStudent.Days:
+        assert [view.identifier for view in population.day_index[day]] == \
+            [student.identifier for student in students if day in student.attendance_days]
+
+
+def test_viewership_rows_read_and_write_by_sign_index():
+    population = StudentPopulation.from_students(make_students(3), num_signs=4)
+    student = population[1]
+    student.viewership_stats = {2: 1.5, 4: 3.0}
+    student.viewership_stats.add_seconds({2: 1.0, 3: 0.5})
+    assert dict(student.viewership_stats.items()) == {1: 0.0, 2: 2.5, 3: 0.5, 4: 3.0}
+    assert population.sign_column(2).tolist() == [0.0, 2.5, 0.0]
+
+
+def test_population_gives_the_same_results_as_student_objects():
+    students = make_students(300)
+    population = StudentPopulation.from_students(students)
+    from_objects = scrumdog_queue.SignProcessingSystem(students, make_signs()).process_students_for_week()
+    from_arrays = scrumdog_queue.SignProcessingSystem(population, make_signs()).process_students_for_week()
+    assert len(from_arrays) == len(from_objects)
+    for array_row, object_row in zip(from_arrays, from_objects):
+        assert array_row.keys() == object_row.keys()
+        for name, value in object_row.items():
+            if name.startswith("sign"):
+                # The population keeps seconds in single precision, which can move a value across a rounding step
+                assert array_row[name] == pytest.approx(value, abs=0.01 + 1e-6)
+            else:
+                assert array_row[name] == value
+
+
+def test_population_takes_less_memory_than_student_objects():
+    population = StudentPopulation.from_students(make_students(1000), num_signs=20)
+    assert population.nbytes() < 1000 * 200  # Well under the size of a thousand objects with a stats dict each
+
+
+def test_reset_zeroes_every_student():
+    population = StudentPopulation.from_students(make_students(10), num_signs=3)
+    population.add_exposure(np.arange(10), np.array([0, 2]), np.ones((10, 2)))
+    population.reset_viewership()
+    assert not population.viewership.any()
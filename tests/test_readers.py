@@ -0,0 +1,64 @@
+import pytest
+from Database3 import Database, parse_days
+
+
+ROWS = [
+    {"student_id": 1, "speed": 12.5, "view_time": 8.25, "num_days_attended": 2,
+     "days_attended": ["Monday", "Friday"], "sign1": 3.5, "sign2": 4.75},
+    {"student_id": 2, "speed": 19.0, "view_time": 5.0, "num_days_attended": 1,
+     "days_attended": ["Tuesday"], "sign1": 0.0, "sign2": 5.0},
+    {"student_id": 3, "speed": 10.0, "view_time": 9.5, "num_days_attended": 5,
+     "days_attended": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"], "sign1": 9.5, "sign2": 0.0},
+]
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = Database(str(tmp_path / "rows.csv"))
+    database.excel(ROWS)
+    return database
+
+
+def test_parse_days_reads_the_written_list():
+    assert parse_days("['Monday', 'Friday']") == ["Monday", "Friday"]
+    assert parse_days("[]") == []
+
+
+def test_read_rows_types_every_column(database):
+    rows = list(database.read_rows())
+    assert [row["student_id"] for row in rows] == ["1", "2", "3"]
+    for row, expected in zip(rows, ROWS):
+        assert row["speed"] == expected["speed"]
+        assert row["view_time"] == expected["view_time"]
+        assert row["num_days_attended"] == expected["num_days_attended"]
+        assert row["days_attended"] == expected["days_attended"]
+        assert (row["sign1"], row["sign2"]) == (expected["sign1"], expected["sign2"])
+
+
+def test_read_rows_keeps_only_the_columns_asked_for(database):
+    rows = list(database.read_rows(["sign2", "view_time"]))
+    assert rows == [{"sign2": row["sign2"], "view_time": row["view_time"]} for row in ROWS]
+
+
+def test_read_rows_refuses_missing_columns(database):
+    with pytest.raises(KeyError):
+        list(database.read_rows(["sign9"]))
+
+
+def test_read_chunks_splits_the_rows(database):
+    chunks = list(database.read_chunks(2, ["student_id"]))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert [row for chunk in chunks for row in chunk] == list(database.read_rows(["student_id"]))
+
+
+def test_csv_to_dict_leaves_values_as_text(database):
+    rows = database.csv_to_dict()
+    assert rows[0]["speed"] == "12.5"
+    assert rows[0]["days_attended"] == "['Monday', 'Friday']"
+    assert len(rows) == len(ROWS)
+
+
+def test_an_empty_file_reads_no_rows(tmp_path):
+    path = tmp_path / "empty.csv"
+    path.write_text("")
+    assert list(Database(str(path)).read_rows()) == []
@@ -0,0 +1,93 @@
+from itertools import islice
+import pytest
+import scrumdog_queue
+import Student_Population
+from scrumdog_rotation import SignRotation
+
+DURATIONS = [3, 5, 2.5, 7, 4]
+
+SCHEDULE = [
+    {"day": "Tuesday", "at": 40, "action": "remove", "sign": 2},
+    {"day": "Wednesday", "at": 0, "action": "add", "sign": 9, "time": 6},
+    {"day": "Thursday", "at": 25, "action": "set_duration", "sign": 4, "time": 1.5},
+]
+
+
+def fill(signs):
+    for i, time in enumerate(DURATIONS, start=1):
+        signs.append(i, time)
+    return signs
+
+
+def walk_table(signs, offset, count):
+    """What slots_from should give, read off the full prefix table."""
+    starts = signs.cycle_starts()
+    items = list(signs.items)
+    lap, within = divmod(offset, starts[-1])
+    position = max(i for i in range(len(items)) if starts[i] <= within)
+    walked = []
+    for _ in range(count):
+        walked.append((items[position].index, lap * starts[-1] + starts[position]))
+        position += 1
+        if position == len(items):
+            position, lap = 0, lap + 1
+    return walked
+
+
+@pytest.mark.parametrize("make", [scrumdog_queue.CircularLinkedList, SignRotation])
+@pytest.mark.parametrize("offset", [0.0, 2.9, 3.0, 20.0, 21.4, 43.0])
+def test_slots_from_walks_the_prefix_table(make, offset):
+    signs = fill(make())
+    walked = [(sign.index, start) for sign, start in islice(signs.slots_from(offset), 12)]
+    assert walked == pytest.approx(walk_table(signs, offset, 12))
+
+
+def test_slots_from_skips_removed_signs():
+    signs = fill(SignRotation())
+    signs.remove(2)
+    signs.remove(4)
+    signs.set_duration(5, 1.0)
+    walked = [(sign.index, start) for sign, start in islice(signs.slots_from(4.0), 7)]
+    assert walked == pytest.approx(walk_table(signs, 4.0, 7))
+    assert len(signs) == 3
+
+
+def test_cached_table_follows_new_signs():
+    signs = fill(scrumdog_queue.CircularLinkedList())
+    assert signs.cycle_length() == sum(DURATIONS)
+    signs.append(6, 10)
+    assert signs.cycle_length() == sum(DURATIONS) + 10
+    assert len(signs) == 6
+
+
+def forbid_full_rebuilds(monkeypatch):
+    def refuse(self):
+        raise AssertionError("the engine rebuilt the whole rotation")
+    monkeypatch.setattr(SignRotation, "cycle_starts", refuse)
+    monkeypatch.setattr(SignRotation, "items", property(refuse))
+
+
+@pytest.fixture
+def build(build_system):
+    def build(engine):
+        # Clock engines only change signs at the start of a day
+        schedule = [dict(change, at=0) for change in SCHEDULE] if engine == "event" else SCHEDULE
+        return build_system(engine, Student_Population.generate_population(300, seed=19), DURATIONS,
+                            rotation=SignRotation, seed=2, sign_schedule=schedule)
+    return build
+
+
+@pytest.mark.parametrize("engine", ["walk", "timeline", "event"])
+def test_engines_query_the_rotation_without_rebuilding_it(build, engine, monkeypatch):
+    expected = build(engine).process_students_for_week()
+    system = build(engine)  # Reads the sign ids once, before rebuilds are refused
+    forbid_full_rebuilds(monkeypatch)
+    assert system.process_students_for_week() == expected
+
+
+def test_timeline_matches_walking_through_sign_changes(build):
+    walked = build("walk").process_students_for_week()
+    timeline = build("timeline").process_students_for_week()
+    assert len(timeline) == len(walked)
+    for row, expected in zip(timeline, walked):
+        assert row == pytest.approx(expected, abs=0.01 + 1e-9)
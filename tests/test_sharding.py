@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+import Student_Population
+from scrumdog_sharding import day_start_phases, process_students_for_week_sharded, simulate_week_sharded
+
+ENGINES = ["walk", "timeline", "vectorized"]
+
+
+@pytest.fixture
+def build(build_system):
+    def build(engine="walk", count=300, sparse=False):
+        population = Student_Population.generate_population(count, seed=18, num_signs=4, sparse=sparse)
+        return build_system(engine, population, [3, 5, 4, 2])
+    return build
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("workers", [1, 2])
+def test_carry_sharded_rows_equal_a_sequential_run(build, engine, workers):
+    sequential, sharded = build(engine), build(engine)
+    expected = sequential.process_students_for_week()
+    assert process_students_for_week_sharded(sharded, workers=workers) == expected
+    assert sharded.signs.get_phase() == pytest.approx(sequential.signs.get_phase())
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_carry_sharded_simulation_equals_a_sequential_run(build, sparse):
+    sequential, sharded = build("vectorized", sparse=sparse), build("vectorized", sparse=sparse)
+    sequential.simulate_week()
+    simulate_week_sharded(sharded, workers=2)
+    for index in (1, 2, 3, 4):
+        np.testing.assert_allclose(sharded.students.sign_column(index), sequential.students.sign_column(index),
+                                   rtol=1e-5, atol=1e-4)
+
+
+def test_reset_starts_every_day_in_the_same_place(build):
+    system = build()
+    phases = day_start_phases(system, system.DAYS_OF_WEEK, "reset")
+    assert phases == [system.signs.get_phase()] * 5
+    rows = process_students_for_week_sharded(system, policy="reset", workers=1)
+    assert len(rows) == sum(len(system.day_index[day]) for day in system.DAYS_OF_WEEK)
+
+
+def test_clock_engines_only_shard_with_reset(build_system):
+    system = build_system("event", Student_Population.generate_population(50, seed=1), [5], seed=1)
+    with pytest.raises(ValueError):
+        day_start_phases(system, system.DAYS_OF_WEEK, "carry")
+    rows = process_students_for_week_sharded(system, policy="reset", workers=1)
+    assert len(rows) == sum(len(system.day_index[day]) for day in system.DAYS_OF_WEEK)
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+import scrumdog_queue
+import Student_Population
+from Database3 import Database
+from scrumdog_sketch import ExposureSketches, KLLSketch
+from scrumdog_vectorized import VectorizedSignProcessingSystem
+
+QS = [0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def rank_errors(sketch, values):
+    """How far each estimated quantile's true rank is from the rank asked for, per stream."""
+    estimates = sketch.quantiles(QS)
+    errors = []
+    for stream in range(values.shape[1]):
+        column = np.sort(values[:, stream])
+        for row, q in enumerate(QS):
+            rank = np.searchsorted(column, estimates[row, stream], side="right") / len(column)
+            errors.append(abs(rank - q))
+    return np.array(errors)
+
+
+def test_rank_error_stays_small_at_the_default_k():
+    values = np.random.default_rng(4).exponential(3.0, size=(100_000, 3))
+    sketch = KLLSketch(3, k=200, seed=1)
+    for low in range(0, len(values), 7_000):
+        sketch.update(values[low:low + 7_000])
+    assert sketch.count == len(values)
+    assert rank_errors(sketch, values).max() < 0.02
+    assert sum(level.shape[1] for level in sketch.levels) < 4 * 200
+
+
+def test_merged_sketches_are_as_accurate_as_one():
+    values = np.random.default_rng(5).normal(10, 2, size=(60_000, 2))
+    parts = [KLLSketch(2, k=200, seed=seed) for seed in range(4)]
+    for part, chunk in zip(parts, np.array_split(values, 4)):
+        part.update(chunk)
+    for part in parts[1:]:
+        parts[0].merge(part)
+    assert parts[0].count == len(values)
+    assert rank_errors(parts[0], values).max() < 0.02
+
+
+def build():
+    signs = scrumdog_queue.CircularLinkedList()
+    for i, time in enumerate([5, 3, 7], start=1):
+        signs.append(i, time)
+    return VectorizedSignProcessingSystem(Student_Population.generate_population(5000, seed=22, num_signs=3), signs)
+
+
+def test_sketches_follow_the_simulated_exposure(tmp_path):
+    system = build()
+    exposure = {sign: [] for sign in system.sign_ids}
+    for day in system.DAYS_OF_WEEK:
+        for _, seen in system.iter_visits(system.day_index[day], day):
+            for sign in exposure:
+                exposure[sign].append(seen.get(sign, 0.0))
+
+    system = build()
+    sketches = ExposureSketches(system.sign_ids, per_day=True, seed=3)
+    system.simulate_week(collector=sketches)
+    for sign, values in sketches.quantiles(QS).items():
+        column = np.sort(exposure[sign])
+        for q, seconds in values.items():
+            rank = np.searchsorted(column, seconds, side="right") / len(column)
+            assert rank >= q - 0.02
+            assert np.searchsorted(column, seconds, side="left") / len(column) <= q + 0.02
+    assert sum(sketches.sketches[day].count for day in system.DAYS_OF_WEEK) == sketches.sketches[None].count
+
+    database = Database(str(tmp_path / "results.csv"))
+    database.save_sketches(sketches)
+    loaded = database.load_sketches()
+    assert loaded.quantiles(QS) == sketches.quantiles(QS)
+    assert loaded.quantiles(QS, "Tuesday") == sketches.quantiles(QS, "Tuesday")
+
+
+def test_sketches_of_different_shapes_do_not_merge():
+    with pytest.raises(ValueError):
+        ExposureSketches([1, 2]).merge(ExposureSketches([1, 2], k=100))
+    with pytest.raises(ValueError):
+        ExposureSketches([1, 2]).quantiles(day="Monday")
@@ -0,0 +1,87 @@
+import pytest
+import scrumdog_queue
+import Student_Population
+from Database3 import Database
+from Student_Population import SparseViewership
+
+NUM_SIGNS = 80  # Above dense_sign_limit, so stats and rows are sparse
+
+
+class DenseSystem(scrumdog_queue.SignProcessingSystem):
+    dense_sign_limit = 1000
+
+
+def make_signs():
+    signs = scrumdog_queue.CircularLinkedList()
+    for i in range(1, NUM_SIGNS + 1):
+        signs.append(i * 3, 1 + i % 4)  # Gaps in the numbering
+    return signs
+
+
+def build(system_class=scrumdog_queue.SignProcessingSystem, merge_policy="per_day", exposure_mode="timeline"):
+    population = Student_Population.generate_population(200, seed=20)
+    return system_class(population, make_signs(), exposure_mode=exposure_mode, merge_policy=merge_policy)
+
+
+def expand(row, sign_ids):
+    """A sparse row laid out like a dense one."""
+    dense = {name: value for name, value in row.items() if name != "signs_seen"}
+    dense.update((f"sign{i}", row["signs_seen"].get(i, 0.0)) for i in sign_ids)
+    return dense
+
+
+@pytest.mark.parametrize("merge_policy", ["per_day", "sum"])
+@pytest.mark.parametrize("exposure_mode", ["walk", "timeline"])
+def test_sparse_rows_hold_only_the_signs_seen(merge_policy, exposure_mode):
+    sparse = build(merge_policy=merge_policy, exposure_mode=exposure_mode)
+    dense = build(DenseSystem, merge_policy=merge_policy, exposure_mode=exposure_mode)
+    assert sparse.sparse_stats and not dense.sparse_stats
+    sparse_rows, dense_rows = sparse.process_students_for_week(), dense.process_students_for_week()
+    assert len(sparse_rows) == len(dense_rows)
+    for row, expected in zip(sparse_rows, dense_rows):
+        assert not any(name.startswith("sign") and name != "signs_seen" for name in row)
+        assert list(row["signs_seen"]) == sorted(row["signs_seen"])
+        assert all(row["signs_seen"].values())
+        assert len(row["signs_seen"]) < NUM_SIGNS
+        row = expand(row, sparse.sign_ids)
+        assert row.pop("days_attended") == expected.pop("days_attended")
+        assert row == pytest.approx(expected, abs=0.01 + 1e-9)  # The sparse store sums in another order
+
+
+def test_each_visit_reads_the_sparse_row_once(monkeypatch):
+    system = build()
+    reads = []
+    row = SparseViewership.row
+    monkeypatch.setattr(SparseViewership, "row", lambda self, position: reads.append(position) or row(self, position))
+    results = system.process_students_for_week()
+    assert len(reads) == len(results)
+
+
+def test_cancelled_changes_leave_no_entry():
+    store = SparseViewership(3, 5)
+    store.add_row(1, {2: 1.5, 4: 2.0})
+    store.add_row(1, {2: -1.5})
+    assert store.row(1) == {4: 2.0}
+
+
+@pytest.mark.parametrize("extension", ["csv", "db"])
+def test_sparse_files_read_and_aggregate_like_dense_ones(tmp_path, extension):
+    sparse = build(merge_policy="sum")
+    rows = sparse.process_students_for_week()
+    dense_rows = [expand(row, sparse.sign_ids) for row in rows]
+    sparse_file = Database(str(tmp_path / f"sparse.{extension}"))
+    dense_file = Database(str(tmp_path / f"dense.{extension}"))
+    sparse_file.excel_stream(rows)
+    dense_file.excel_stream(dense_rows)
+
+    assert [row["signs_seen"] for row in sparse_file.read_rows()] == [row["signs_seen"] for row in rows]
+    for group_by in (None, "num_days_attended", "day"):
+        expected = dense_file.aggregate(group_by)
+        result = sparse_file.aggregate(group_by)
+        assert result.keys() == expected.keys()
+        for key, signs in result.items():
+            seen_somewhere = {sign: stats for sign, stats in expected[key].items()
+                              if any(sign in row["signs_seen"] for row in rows)}
+            assert signs.keys() == seen_somewhere.keys()
+            for sign, stats in signs.items():
+                assert stats == pytest.approx(seen_somewhere[sign])
@@ -0,0 +1,63 @@
+import pytest
+import scrumdog_queue
+import Student_Population
+from Database3 import Database, SqliteStore
+
+
+def make_system(count=200, seed=10):
+    signs = scrumdog_queue.CircularLinkedList()
+    for i in range(1, 6):
+        signs.append(i, 3)
+    return scrumdog_queue.SignProcessingSystem(Student_Population.generate_population(count, seed=seed), signs)
+
+
+def test_write_then_read_returns_the_same_rows(tmp_path):
+    rows = list(make_system().iter_students_for_week())
+    database = Database(str(tmp_path / "week.db"))
+    assert database.excel_stream(rows) == len(rows)
+
+    read = list(database.read_rows())
+    assert len(read) == len(rows)
+    for back, row in zip(read, rows):
+        assert back == {**row, "student_id": str(row["student_id"])}
+
+
+def test_every_visit_records_its_day(tmp_path):
+    rows = list(make_system().iter_students_for_week())
+    store = SqliteStore(str(tmp_path / "week.db"), batch_size=50)
+    store.write(rows)
+    counts = dict(store.query("SELECT day, COUNT(*) FROM visits GROUP BY day"))
+    assert None not in counts
+    for day in scrumdog_queue.SignProcessingSystem.DAYS_OF_WEEK:
+        assert counts[day] == sum(row["day"] == day for row in rows)
+
+
+def test_days_attended_text_round_trips(tmp_path):
+    csv_path = str(tmp_path / "week.csv")
+    Database(csv_path).excel([{"student_id": 1, "speed": 15.0, "view_time": 4.0, "num_days_attended": 2,
+                               "days_attended": ["Monday", "Friday"], "sign1": 1.5}])
+    as_text = Database(csv_path).csv_to_dict()
+    assert as_text[0]["days_attended"] == "['Monday', 'Friday']"
+
+    database = Database(str(tmp_path / "week.db"))
+    database.excel(as_text)
+    assert next(database.read_rows(["days_attended"]))["days_attended"] == ["Monday", "Friday"]
+    assert database.csv_to_dict()[0]["days_attended"] == "['Monday', 'Friday']"
+
+
+def test_indexed_query_matches_a_scan(tmp_path):
+    rows = list(make_system().iter_students_for_week())
+    store = SqliteStore(str(tmp_path / "week.db"))
+    store.write(rows)
+    found = store.query("""SELECT v.student_id FROM exposures e JOIN visits v USING (visit_id)
+                           WHERE e.sign = 3 AND e.seconds > ? AND v.day = 'Tuesday' ORDER BY v.visit_id""", (1.0,))
+    expected = [str(row["student_id"]) for row in rows if row["day"] == "Tuesday" and row["sign3"] > 1.0]
+    assert [student_id for (student_id,) in found] == expected
+    indexes = {name for (name,) in store.query("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"visits_student", "visits_day", "exposures_sign", "exposures_visit"} <= indexes
+
+
+def test_rows_outside_the_schema_are_refused(tmp_path):
+    rows = [{"student_id": 1, "sign1": 2.0}, {"student_id": 2, "sign1": 1.0, "sign2": 3.0}]
+    with pytest.raises(ValueError):
+        Database(str(tmp_path / "rows.db")).excel_stream(rows)
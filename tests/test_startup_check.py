@@ -0,0 +1,49 @@
+import pytest
+import gui_startup_check
+
+# Stands in for tkinter in the probe's interpreter, so the probe runs without a display
+FAKE_TKINTER = """
+class Tk:
+    def __init__(self):
+        self.idle = []
+
+    def after_idle(self, callback, *args):
+        self.idle.append((callback, args))
+
+    def update(self):
+        while self.idle:
+            callback, args = self.idle.pop(0)
+            callback(*args)
+
+    def destroy(self):
+        pass
+"""
+
+SLOW_GUI = """
+import time
+
+
+class SlowBackground:
+    def __init__(self, window):
+        window.after_idle(self.load_background)
+
+    def load_background(self):
+        time.sleep(0.3)
+"""
+
+
+def test_first_frame_is_timed_before_deferred_work(tmp_path, monkeypatch):
+    (tmp_path / "tkinter.py").write_text(FAKE_TKINTER)
+    (tmp_path / "slow_gui.py").write_text(SLOW_GUI)
+    monkeypatch.setenv("PYTHONPATH", str(tmp_path))
+    result = gui_startup_check.measure("slow_gui", "SlowBackground", runs=1)
+    assert result["first_frame"] < 0.3 <= result["settled"]
+    assert result["heavy_modules"] == []
+
+
+def test_a_gui_that_cannot_start_is_reported(tmp_path, monkeypatch):
+    (tmp_path / "tkinter.py").write_text("raise ImportError('no display here')\n")
+    monkeypatch.setenv("PYTHONPATH", str(tmp_path))
+    with pytest.raises(gui_startup_check.StartupCheckUnavailable):
+        gui_startup_check.measure("Gui", "ScrumGui", runs=1)
+    assert gui_startup_check.check_startup(runs=1) is None
@@ -0,0 +1,49 @@
+import pytest
+import scrumdog_queue
+import Student_Population
+from Database3 import Database
+
+
+def make_system(count=300, seed=7):
+    signs = scrumdog_queue.CircularLinkedList()
+    for i in range(1, 5):
+        signs.append(i, 4)
+    return scrumdog_queue.SignProcessingSystem(Student_Population.generate_population(count, seed=seed), signs)
+
+
+def test_streamed_week_matches_the_collected_week():
+    collected = make_system().process_students_for_week()
+    streamed = list(make_system().iter_students_for_week(include_day=False))
+    assert streamed == collected
+
+
+@pytest.mark.parametrize("extension", ["csv", "db"])
+def test_streamed_rows_read_back_the_same(tmp_path, extension):
+    rows = make_system().process_students_for_week()
+    database = Database(str(tmp_path / f"week.{extension}"))
+    written = database.excel_stream(make_system().iter_students_for_week(), chunk_size=64)
+    assert written == len(rows)
+
+    read = list(database.read_rows())
+    assert [row["student_id"] for row in read] == [str(row["student_id"]) for row in rows]
+    for back, row in zip(read, rows):
+        assert back["view_time"] == pytest.approx(row["view_time"])
+        assert back["days_attended"] == row["days_attended"]
+        for i in range(1, 5):
+            assert back[f"sign{i}"] == pytest.approx(row[f"sign{i}"])
+
+
+@pytest.mark.parametrize("extension", ["csv", "db"])
+def test_no_rows_leaves_an_existing_file_alone(tmp_path, extension):
+    database = Database(str(tmp_path / f"week.{extension}"))
+    database.excel_stream(make_system(50).iter_students_for_week())
+    before = list(database.read_rows())
+
+    assert database.excel_stream(iter([])) == 0
+    assert list(database.read_rows()) == before
+
+
+def test_rows_outside_the_schema_are_refused(tmp_path):
+    rows = [{"student_id": 1, "view_time": 2.0}, {"student_id": 2, "view_time": 3.0, "extra": 1}]
+    with pytest.raises(ValueError):
+        Database(str(tmp_path / "rows.csv")).excel_stream(rows)
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from scrumdog_montecarlo import run_monte_carlo
+from scrumdog_sweep import SweepCache, cache_key, expand_grid, run_sweep
+
+BASE = {"num_students": 150}
+
+
+def test_grid_covers_every_combination():
+    configs = expand_grid({"sign_time": [2, 3], "num_signs": [4, 5, 6]}, BASE)
+    assert len(configs) == 6
+    assert {(config["sign_time"], config["num_signs"]) for config in configs} == {
+        (time, signs) for time in (2, 3) for signs in (4, 5, 6)}
+    assert all(config["num_students"] == 150 for config in configs)
+    with pytest.raises(ValueError):
+        expand_grid({"colour": [1]})
+
+
+def test_numpy_grids_share_keys_with_python_numbers():
+    for numpy_config, python_config in zip(expand_grid({"sign_time": np.arange(2, 5)}),
+                                           expand_grid({"sign_time": range(2, 5)})):
+        assert cache_key(numpy_config, 0, 2) == cache_key(python_config, 0, 2)
+    spaced = expand_grid({"sign_time": np.linspace(2.0, 3.0, 3)})
+    assert cache_key(spaced[1], np.int64(0), 2) == cache_key({**spaced[1], "sign_time": 2.5}, 0, 2)
+    assert cache_key(spaced[0], 0, 2) != cache_key(spaced[1], 0, 2)
+
+
+def test_cells_match_monte_carlo_and_come_back_from_the_cache(tmp_path):
+    cache = SweepCache(str(tmp_path))
+    ranges = {"num_signs": np.arange(3, 5)}
+    cells = run_sweep(ranges, BASE, seed=4, replicates=2, workers=1, cache=cache)
+    assert [cell["cached"] for cell in cells] == [False, False]
+    for cell in cells:
+        assert cell["result"] == run_monte_carlo(cell["config"], replicates=2, seed=4, workers=1)
+
+    again = run_sweep(ranges, BASE, seed=4, replicates=2, workers=1, cache=cache)
+    assert [cell["cached"] for cell in again] == [True, True]
+    assert [cell["result"] for cell in again] == [cell["result"] for cell in cells]
+
+
+def test_unhashable_settings_are_refused():
+    with pytest.raises(TypeError):
+        cache_key({"sign_time": object()}, 0, 1)
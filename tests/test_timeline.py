@@ -0,0 +1,49 @@
+import random
+import pytest
+import scrumdog_queue
+from Student_Class import OneDayStudent, FiveDayStudent
+
+
+def make_signs(durations):
+    signs = scrumdog_queue.CircularLinkedList()
+    for i, duration in enumerate(durations, start=1):
+        signs.append(i, duration)
+    return signs
+
+
+def visits(exposure_mode, durations, seed=1, count=300):
+    random.seed(seed)
+    students = [(OneDayStudent if i % 2 else FiveDayStudent)(i) for i in range(1, count + 1)]
+    system = scrumdog_queue.SignProcessingSystem(students, make_signs(durations), exposure_mode=exposure_mode)
+    seen = [visit for _, visit in system.iter_student_results(students, build_rows=False)]
+    return seen, system.signs.get_phase()
+
+
+@pytest.mark.parametrize("durations", [
+    [5, 5, 5, 5, 5, 5],  # Views shorter than a cycle, some wrapping round its end
+    [0.25, 0.5, 0.75, 1.0],  # Views spanning many whole cycles
+    [7.5, 0.125, 3, 11],  # Uneven slots
+])
+def test_timeline_matches_walking_the_signs(durations):
+    walked, walk_phase = visits("walk", durations)
+    looked_up, timeline_phase = visits("timeline", durations)
+
+    assert timeline_phase == pytest.approx(walk_phase, abs=1e-6)
+    for walk, timeline in zip(walked, looked_up):
+        assert timeline.keys() == walk.keys()
+        for index, seconds in walk.items():
+            assert timeline[index] == pytest.approx(seconds, abs=1e-6)
+
+
+def test_timeline_credits_every_second_of_view_time():
+    seen, _ = visits("timeline", [0.3, 2.2, 1.1])
+    random.seed(1)
+    students = [(OneDayStudent if i % 2 else FiveDayStudent)(i) for i in range(1, 301)]
+    for student, visit in zip(students, seen):
+        assert sum(visit.values()) == pytest.approx(student.time, abs=1e-6)
+
+
+def test_timeline_needs_a_positive_cycle():
+    system = scrumdog_queue.SignProcessingSystem([OneDayStudent(1)], make_signs([0, 0]), exposure_mode="timeline")
+    with pytest.raises(ValueError):
+        system.process_students_for_week()
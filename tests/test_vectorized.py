@@ -0,0 +1,60 @@
+import random
+import numpy as np
+import pytest
+import scrumdog_queue
+import Student_Population
+from Student_Class import OneDayStudent, TwoDayStudent, ThreeDayStudent, FourDayStudent, FiveDayStudent
+from scrumdog_vectorized import VectorizedSignProcessingSystem, round_hundredths
+
+
+def make_signs(count=6):
+    signs = scrumdog_queue.CircularLinkedList()
+    for i in range(1, count + 1):
+        signs.append(i, 5)
+    return signs
+
+
+def make_students(count, seed):
+    random.seed(seed)
+    classes = [OneDayStudent, TwoDayStudent, ThreeDayStudent, FourDayStudent, FiveDayStudent]
+    return [random.choice(classes)(i) for i in range(1, count + 1)]
+
+
+def sign_columns(row):
+    return [name for name in row if name.startswith("sign")]
+
+
+@pytest.mark.parametrize("durations", [None, [1.5, 9, 3.25, 0.5, 7, 2]])
+def test_walk_timeline_and_vectorized_rows_agree(durations, build_system):
+    runs = []
+    for engine in ("walk", "timeline", "vectorized"):
+        system = build_system(engine, make_students(400, seed=3), durations or [5] * 6)
+        runs.append((system.process_students_for_week(), system.signs.get_phase()))
+
+    (walk_rows, walk_phase), others = runs[0], runs[1:]
+    for rows, phase in others:
+        assert len(rows) == len(walk_rows)
+        assert phase == pytest.approx(walk_phase, abs=1e-6)
+        for walk_row, row in zip(walk_rows, rows):
+            assert {name: value for name, value in row.items() if name not in sign_columns(row)} == \
+                {name: value for name, value in walk_row.items() if name not in sign_columns(walk_row)}
+            # Exposure is summed in a different order, so a value can land on the other side of a rounding step
+            for name in sign_columns(walk_row):
+                assert row[name] == pytest.approx(walk_row[name], abs=0.01 + 1e-9)
+
+
+def test_population_rows_match_rows_built_one_student_at_a_time():
+    batched = VectorizedSignProcessingSystem(Student_Population.generate_population(3000, seed=4), make_signs(8))
+    single = VectorizedSignProcessingSystem(Student_Population.generate_population(3000, seed=4), make_signs(8))
+    single.day_index = {day: list(students) for day, students in single.day_index.items()}  # No positions to batch on
+
+    assert batched.process_students_for_week() == single.process_students_for_week()
+    np.testing.assert_array_equal(batched.students.viewership, single.students.viewership)
+
+
+def test_round_hundredths_matches_round():
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.random(20000) * 1000,
+                             (rng.integers(0, 10 ** 6, 20000) + 0.5) / 100,  # Halfway between two hundredths
+                             rng.random(20000).astype(np.float32) * 50])
+    assert round_hundredths(values).tolist() == [round(value, 2) for value in values.tolist()]
@@ -0,0 +1,134 @@
+import os
+import threading
+import pytest
+import scrumdog_queue
+import Student_Population
+from Database3 import Database
+from scrumdog_worker import SimulationCancelled, SimulationWorker, WorkerControls, report_every
+
+
+def finish(worker):
+    worker.start()
+    worker.join(timeout=10)
+    return worker.poll()
+
+
+def test_worker_reports_progress_then_the_result():
+    def job(progress):
+        progress(0.5, "half")
+        return 42
+    assert finish(SimulationWorker(job)) == [("progress", 0.5, "half"), ("done", 42)]
+
+
+def test_worker_reports_errors():
+    def job(progress):
+        raise RuntimeError("boom")
+    events = finish(SimulationWorker(job))
+    assert events[0][0] == "error" and str(events[0][1]) == "boom"
+
+
+def test_cancel_stops_the_job_at_its_next_report():
+    started = threading.Event()
+    release = threading.Event()
+
+    def job(progress):
+        started.set()
+        release.wait(10)
+        progress(0.5)
+        return "finished"
+    worker = SimulationWorker(job)
+    worker.start()
+    started.wait(10)
+    worker.cancel()
+    release.set()
+    worker.join(timeout=10)
+    assert worker.poll() == [("cancelled",)]
+
+
+def test_report_every_passes_rows_through():
+    reports = []
+    rows = list(report_every(range(10), 10, lambda fraction, message: reports.append(fraction), step=4))
+    assert rows == list(range(10))
+    assert reports == [0.4, 0.8]
+
+
+def test_a_cancelled_stream_leaves_the_previous_file(tmp_path):
+    path = str(tmp_path / "test.csv")
+    signs = scrumdog_queue.CircularLinkedList()
+    for i in range(1, 4):
+        signs.append(i, 5)
+    database = Database(path)
+    database.excel_stream(scrumdog_queue.SignProcessingSystem(
+        Student_Population.generate_population(40, seed=1), signs).iter_students_for_week())
+    before = open(path, encoding="utf-8").read()
+
+    def progress(fraction, message):
+        raise SimulationCancelled()
+    rows = scrumdog_queue.SignProcessingSystem(
+        Student_Population.generate_population(400, seed=2), signs).iter_students_for_week()
+    with pytest.raises(SimulationCancelled):
+        database.excel_stream(report_every(rows, 2000, progress, step=100))
+    assert open(path, encoding="utf-8").read() == before
+    assert os.listdir(tmp_path) == ["test.csv"]
+
+
+class FakeWidget(dict):
+    def config(self, **options):
+        self.update(options)
+
+
+class FakeWindow:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, delay, callback):
+        self.scheduled.append(callback)
+
+
+class FakeGui(WorkerControls):
+    """WorkerControls with stand-ins for the Tk widgets, so it runs without a display."""
+    def __init__(self):
+        self.window = FakeWindow()
+        self.progress_bar = FakeWidget()
+        self.submit_button = FakeWidget()
+        self.cancel_button = FakeWidget()
+        self.messages = []
+        self.results = []
+
+    def display_message(self, message):
+        self.messages.append(message)
+
+
+def run_until_idle(gui):
+    gui.worker.join(timeout=10)
+    while gui.window.scheduled:
+        gui.window.scheduled.pop(0)()
+
+
+def test_controls_follow_the_worker_to_the_result():
+    gui = FakeGui()
+    gui.run_in_background(lambda progress: progress(0.3) or "done", gui.results.append)
+    assert (gui.submit_button["state"], gui.cancel_button["state"]) == ("disabled", "normal")
+    run_until_idle(gui)
+    assert gui.results == ["done"]
+    assert gui.progress_bar["value"] == 100
+    assert (gui.submit_button["state"], gui.cancel_button["state"]) == ("normal", "disabled")
+    assert gui.worker is None
+
+
+def test_controls_report_a_cancelled_calculation():
+    gui = FakeGui()
+    release = threading.Event()
+
+    def job(progress):
+        release.wait(10)
+        progress(0.5)
+    gui.run_in_background(job, gui.results.append)
+    gui.cancel()
+    worker = gui.worker
+    release.set()
+    worker.join(timeout=10)
+    run_until_idle(gui)
+    assert gui.results == []
+    assert gui.messages[-1] == "Calculation cancelled."
+    assert gui.submit_button["state"] == "normal"